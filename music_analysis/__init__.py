@@ -0,0 +1,99 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# This package includes:
+# - Normal-form and prime-form generator.
+# - Interval-class-vector calculator.
+# - Maximal-evenness analyzer.
+# - Scalar complexity analyzer.
+# - Voice-leading- and Euclidean-distance calculator.
+# - Pitch-class-set type stored as a 12-bit mask.
+# - Set-class lookup table shared by the above functions.
+# - Batch IC-vector and prime-form calculator (NumPy).
+# - Streaming MIDI reader, slicer and slice analyzer.
+# - Parallel corpus analyzer.
+# - Nearest-reference-scale search.
+# - Exact voice-leading calculator.
+# - Corpus clustering on a memory-mapped distance matrix.
+# - Two-tier result cache (in memory and SQLite).
+# - Benchmark suite with JSON baselines and fast-path checks.
+# - Opt-in instrumentation of calls, latencies and phases.
+# - Maximal-evenness engine for any chromatic universe.
+# - Interval spectrum shared by the evenness and complexity tests.
+# - Inclusion and Z-relation index over corpora.
+# - Incremental sliding-window analyzer.
+# - Asyncio JSON-lines analysis server with micro-batching.
+# - Memory-mapped binary store of analyzed slices.
+# - DFT of pc sets: evenness, similarity and distance bounds.
+# - Linear-time normal and prime forms for any chromatic universe.
+# - Streaming set-class catalogue for any universe, on disk.
+# - Optimal voice-leading paths through progressions.
+# - Set-class similarity (cosine, angle, REL) as matrix operations.
+
+# Importing the package only defines the functions: the
+# set-class table and the other precomputed tables are built
+# on first use, NumPy is imported only by the batch
+# functions, and SQLite only by a cache with a file.
+
+from .batch import batch_masks, ic_vector_batch, prime_form_batch
+from .cache import FUNCTION_VERSIONS, AnalysisCache
+from .catalogue import (
+    CatalogueEntry, SetClassCatalogue, set_class_catalogue, write_catalogue)
+from .clustering import (
+    build_distance_file, cluster_labels, condensed_index, distance_row,
+    k_medoids, linkage, open_distance_file)
+from .complexity import (
+    ComplexityResult, complexity_batch, detect_complexity)
+from .corpus import analyze_corpus
+from .corpus_index import CorpusIndex
+from .dft import (
+    dft, dft_batch, dft_evenness, dft_evenness_batch, dft_lower_bounds,
+    dft_prefilter, dft_similarity, set_class_dft_table)
+from .distance import distance_vl_gm, optimal_order, ref_dict
+from .evenness import (
+    enumerate_maximal_even, interval_matrix, j_function, maximal_even,
+    maximal_even_edo, maximal_even_sets)
+from .instrument import (
+    disable_instrumentation, enable_instrumentation, instrumentation_json,
+    instrumentation_snapshot, reset_instrumentation)
+from .midi import analyze_midi, analyze_slices, read_midi, slice_notes
+from .nearest import nearest_scales, register_scale, scale_registry
+from .pcset import PCSet, pc_mask
+from .progression import (
+    ProgressionPath, voice_leading_path, voice_leading_paths)
+from .set_class import ic_vector, normal_prime_form, normal_prime_form_edo
+from .similarity import (
+    MEASURES, most_similar, set_class_ids, set_similarity, similarity_chunks,
+    similarity_matrix)
+from .spectrum import IntervalSpectrum, spectrum_batch
+from .store import SliceReader, SliceWriter, reanalyze_store
+from .table import (
+    SetClassEntry, build_set_class_table, set_class_entry, set_class_table)
+from .voice_leading import (
+    even_distance, voice_leading_distance, voice_leading_distances)
+from .window import PitchClassWindow, slide_window, window_sweep
+
+__all__ = [
+    'AnalysisCache', 'CatalogueEntry', 'ComplexityResult', 'CorpusIndex',
+    'FUNCTION_VERSIONS', 'IntervalSpectrum', 'MEASURES', 'PCSet',
+    'PitchClassWindow', 'ProgressionPath', 'SetClassCatalogue',
+    'SetClassEntry', 'SliceReader', 'SliceWriter', 'analyze_corpus',
+    'analyze_midi', 'analyze_slices', 'batch_masks', 'build_distance_file',
+    'build_set_class_table', 'cluster_labels', 'complexity_batch',
+    'condensed_index', 'detect_complexity', 'dft', 'dft_batch',
+    'dft_evenness', 'dft_evenness_batch', 'dft_lower_bounds', 'dft_prefilter',
+    'dft_similarity', 'disable_instrumentation', 'distance_row',
+    'distance_vl_gm', 'enable_instrumentation', 'enumerate_maximal_even',
+    'even_distance', 'ic_vector', 'ic_vector_batch', 'instrumentation_json',
+    'instrumentation_snapshot', 'interval_matrix', 'j_function', 'k_medoids',
+    'linkage', 'maximal_even', 'maximal_even_edo', 'maximal_even_sets',
+    'most_similar', 'nearest_scales', 'normal_prime_form',
+    'normal_prime_form_edo', 'open_distance_file', 'optimal_order', 'pc_mask',
+    'prime_form_batch', 'read_midi', 'reanalyze_store', 'ref_dict',
+    'register_scale', 'reset_instrumentation', 'scale_registry',
+    'set_class_catalogue', 'set_class_dft_table', 'set_class_entry',
+    'set_class_ids', 'set_class_table', 'set_similarity', 'similarity_chunks',
+    'similarity_matrix', 'slice_notes', 'slide_window', 'spectrum_batch',
+    'voice_leading_distance', 'voice_leading_distances', 'voice_leading_path',
+    'voice_leading_paths', 'window_sweep', 'write_catalogue']
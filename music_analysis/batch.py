@@ -0,0 +1,89 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# This module includes the batch IC-vector and prime-form calculator (NumPy).
+
+from .instrument import instrumented
+from .pcset import pc_mask
+from .table import set_class_table
+
+
+                ### Batch IC-vector and prime-form calculator ###
+
+# Analyse large arrays of pitch-class sets at once with NumPy
+# (imported only when these functions are called). A set is
+# identified by its 12-bit mask; the id of a set class is the
+# mask of its prime form, so PCSet.from_mask(id) recovers it.
+
+# Input for both functions: (1) a 1-D array of 12-bit masks,
+# or a 2-D array of pitch sets in pitch-class or MIDI-pitch
+# numbers, one set per row, padded with "fill"; (2) the
+# padding value of a 2-D array.
+
+_batch_table = None
+
+
+# Return the per-mask arrays of IC vectors (4096 x 6) and
+# prime-form ids (4096), building them on first use.
+
+def _batch_tables ():
+    
+    global _batch_table
+    if _batch_table is None:
+        import numpy as np
+        
+        # Count the intervals of each class k by intersecting
+        # every mask with its own rotation by k semitones; the
+        # tritone is counted twice, once from each end.
+        masks = np.arange(4096)
+        bits = (masks[:, None] >> np.arange(12)) & 1
+        vectors = np.empty((4096, 6), dtype=np.uint8)
+        for k in range(1, 7):
+            vectors[:, k-1] = (bits & np.roll(bits, -k, axis=1)).sum(axis=1)
+        vectors[:, 5] //= 2
+        
+        prime_ids = np.zeros(4096, dtype=np.uint16)
+        for mask, entry in enumerate(set_class_table()):
+            if entry is not None:
+                prime_ids[mask] = pc_mask(entry.prime)
+        _batch_table = vectors, prime_ids
+    
+    return _batch_table
+
+
+# Convert either input layout into a 1-D array of masks.
+
+def batch_masks (masks, fill=-1):
+    
+    import numpy as np
+    
+    masks = np.asarray(masks)
+    if masks.size == 0:
+        masks = masks.astype(np.int64)
+    if masks.ndim == 2:
+        bits = np.left_shift(1, masks % 12, dtype=np.int64)
+        bits[masks == fill] = 0
+        return np.bitwise_or.reduce(bits, axis=1)
+    if masks.ndim != 1:
+        raise ValueError('Expected a 1-D mask array or a 2-D pitch array')
+    if masks.size > 0 and (masks.min() < 0 or masks.max() > 4095):
+        raise ValueError('Masks must lie between 0 and 4095')
+    
+    return masks
+
+
+# Output: an N x 6 array of interval-class vectors.
+
+@instrumented(size=len)
+def ic_vector_batch (masks, fill=-1):
+    
+    return _batch_tables()[0][batch_masks(masks, fill)]
+
+
+# Output: an array of N prime-form ids (0 for an empty set).
+
+@instrumented(size=len)
+def prime_form_batch (masks, fill=-1):
+    
+    return _batch_tables()[1][batch_masks(masks, fill)]
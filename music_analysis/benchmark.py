@@ -0,0 +1,820 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# This module includes the benchmark suite.
+
+
+                        ### Benchmark suite ###
+
+# Time the analysis functions over every cardinality (1-12),
+# four input styles and several batch sizes, save the timings
+# as a JSON baseline, and compare later runs against it. It
+# also verifies that every fast path (lookup tables, PCSet
+# input, batch functions, the result cache, ...) returns
+# exactly what the reference procedures return.
+
+# Input styles: 'pcs' (pitch classes), 'midi' (MIDI pitches
+# in several octaves), and both with repeated pitches or pitch
+# classes ('pcs_dup', 'midi_dup').
+
+# Usage:
+#     python -m music_analysis.benchmark run --output base.json
+#     python -m music_analysis.benchmark run --sizes 1,1000000
+#     python -m music_analysis.benchmark compare base.json
+#     python -m music_analysis.benchmark compare base.json new.json
+#     python -m music_analysis.benchmark verify
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import platform
+import random
+import sys
+import time
+
+from .complexity import detect_complexity
+from .distance import distance_vl_gm, optimal_order
+from .evenness import interval_matrix, maximal_even
+from .pcset import PCSet
+from .set_class import ic_vector, normal_prime_form
+
+STYLES = ('pcs', 'midi', 'pcs_dup', 'midi_dup')
+
+
+# Make "count" random pitch sets of one cardinality and style.
+
+def make_sets (cardinality, style, count, seed=0):
+
+    generator = random.Random(seed)
+    sets = []
+    for _ in range(count):
+        pc_set = generator.sample(range(12), cardinality)
+        if style.endswith('_dup'):
+            pc_set += generator.choices(pc_set, k=generator.randint(1, 4))
+            generator.shuffle(pc_set)
+        if style.startswith('midi'):
+            pc_set = [pc + 12*generator.randint(3, 7) for pc in pc_set]
+        sets.append(pc_set)
+    
+    return sets
+
+
+# A reference for optimal_order for each set: as many pitch
+# classes, ascending.
+
+def _make_references (sets, seed=0):
+
+    generator = random.Random(seed)
+    return [sorted(generator.choices(range(12), k=len(s))) for s in sets]
+
+
+# Timed calls: name -> (function of one set and its reference,
+# smallest cardinality). The arguments follow the case tests.
+def _timed_calls ():
+
+    calls = {
+        'normal_prime_form': (lambda s, r: normal_prime_form(s), 1),
+        'ic_vector': (lambda s, r: ic_vector(s), 1),
+        'interval_matrix': (lambda s, r: interval_matrix(s), 1),
+        'maximal_even': (lambda s, r: maximal_even(s), 1),
+        'detect_complexity': (lambda s, r: detect_complexity(s, True), 1),
+        'detect_complexity_counts': (
+            lambda s, r: detect_complexity(s, True, counts_only=True), 1),
+        'optimal_order': (lambda s, r: optimal_order(s, r, True), 1),
+        'distance_vl_gm': (lambda s, r: distance_vl_gm(s, True, None), 2),
+        }
+    return calls
+
+
+# Batch functions: name -> function of a list of sets.
+def _timed_batches ():
+
+    from .batch import ic_vector_batch, prime_form_batch
+    from .complexity import complexity_batch
+    from .pcset import pc_mask
+    
+    return {
+        'ic_vector_batch': lambda sets: ic_vector_batch(
+            [pc_mask(s) for s in sets]),
+        'prime_form_batch': lambda sets: prime_form_batch(
+            [pc_mask(s) for s in sets]),
+        'complexity_batch': lambda sets: complexity_batch(
+            [pc_mask(s) for s in sets]),
+        }
+
+
+# Time one case: the best of "repeat" runs over the sets.
+
+def _time_case (run, sets, references, repeat, batch):
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        if batch:
+            run(sets)
+        else:
+            for s, r in zip(sets, references):
+                run(s, r)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    
+    return best
+
+
+# Run the benchmarks.
+
+# Input: (1) the functions to time (all by default). (2) The
+# cardinalities. (3) The input styles. (4) The batch sizes.
+# (5) The number of runs per case, of which the best counts.
+# (6) A function receiving a line of progress, or None.
+
+# Output: {'meta': {...}, 'results': {case: {'seconds': ...,
+# 'per_set': ..., 'size': ...}}}, a case being named
+# 'function/style/cardinality/size'.
+
+def run_benchmarks (functions=None, cardinalities=range(1, 13),
+                    styles=STYLES, sizes=(1, 100, 10000), repeat=3,
+                    report=None):
+    
+    calls = _timed_calls()
+    try:
+        batches = _timed_batches()
+    except ImportError:
+        batches = {}
+    if functions is None:
+        functions = list(calls) + list(batches)
+    
+    results = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for name in functions:
+            batch = name in batches
+            if batch:
+                run, smallest = batches[name], 1
+            else:
+                run, smallest = calls[name]
+            for cardinality in cardinalities:
+                if cardinality < smallest:
+                    continue
+                for style in styles:
+                    for size in sizes:
+                        sets = make_sets(cardinality, style, size, seed=size)
+                        references = _make_references(sets, seed=size)
+                        seconds = _time_case(
+                            run, sets, references, repeat, batch)
+                        case = '/'.join(
+                            [name, style, str(cardinality), str(size)])
+                        results[case] = {'seconds': seconds,
+                                         'per_set': seconds/size,
+                                         'size': size}
+                        if report is not None:
+                            report(case + '\t' + format(seconds/size, '.3e'))
+    
+    meta = {'python': platform.python_version(),
+            'platform': platform.platform(),
+            'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'repeat': repeat}
+    try:
+        import numpy
+        meta['numpy'] = numpy.__version__
+    except ImportError:
+        meta['numpy'] = None
+    
+    return {'meta': meta, 'results': results}
+
+
+# Compare a run with a baseline, by time per set.
+
+# Input: (1) the baseline and (2) the new run, as returned by
+# run_benchmarks. (3) The tolerated slowdown: 0.1 flags cases
+# more than 10% slower.
+
+# Output: a list of (case, baseline, new, ratio) for every
+# shared case, slowest ratio first, and the list of regressions.
+
+def compare_results (baseline, current, threshold=0.1):
+
+    rows = []
+    for case, old in baseline['results'].items():
+        new = current['results'].get(case)
+        if new is None or old['per_set'] == 0:
+            continue
+        rows.append((case, old['per_set'], new['per_set'],
+                     new['per_set']/old['per_set']))
+    rows.sort(key=lambda row: -row[3])
+    regressions = [row for row in rows if row[3] > 1 + threshold]
+    
+    return rows, regressions
+
+
+                    ### Verification of fast paths ###
+
+# Each check receives a list of pitch sets and returns the
+# first set (or case) whose fast result differs from the
+# reference result, or None. Later fast paths add their checks
+# to VERIFICATIONS.
+
+# The reference procedures are the original ones, copied from
+# the script before the set-class table, the interval spectrum
+# and the other fast paths, so that the checks never compare
+# new code with itself. Only their names, the copy of the input
+# and the default normalization are changed; keep them so.
+
+def _reference_normal_prime_form (pitch_set):
+
+    # The original works in place; it is given a copy.
+    pitch_set = list(pitch_set)
+    
+    # Extract pitch classes, eliminate redundancy,
+    # and arrange the result in ascending order.
+    num = len(pitch_set)
+    for i in range(num):
+        pitch_set[i] = pitch_set[i]%12
+    pc_set = list(set(pitch_set))
+    pc_set.sort()
+    
+    # If the pitch-class set has only one item,
+    # return the result and end the function.
+    if len(pc_set) == 1:
+        return [pc_set[0]], [0]
+    
+    # Find and store the most compact permutation(s).
+    cardinality = len(pc_set)
+    gap_list = []
+    n = 0
+    while n < cardinality:
+        gap_list.append(
+            (pc_set[n]-pc_set[n-1])%12)
+        n += 1
+    gap_max = max(gap_list)
+    index = []
+    for i, j in enumerate(gap_list):
+        if j == gap_max:
+            index.append(i)
+    tight = []
+    for i in index:
+        tight.append(pc_set[i:]+pc_set[:i])
+    
+    # Check each of above permutations. 
+    # If smaller intervals occur towards the upper
+    # extreme, reverse the order of the permutation.
+    for item in tight:
+        for i in range(cardinality-1):
+            head = (item[i+1]-item[i])%12
+            tail = (item[-(i+1)]-item[-(i+2)])%12
+            if head < tail:
+                break
+            elif tail < head:
+                item.reverse()
+                break
+            else:
+                continue
+    
+    # Among above permutations, compare their intervals at 
+    # corresponding positions. The first one(s) featuring
+    # a smaller interval win(s).
+    # If several permutations win, pick up the first one.
+    for m in range(cardinality-1):
+        gap_list = []
+        for n in range(len(tight)):
+            gap = min([
+                (tight[n][m+1]-tight[n][m])%12, (
+                    tight[n][m]-tight[n][m+1])%12])
+            gap_list.append(gap)
+        gap_min = min(gap_list)
+        if gap_list.count(gap_min) == 1:
+            normal = tight[gap_list.index(gap_min)]
+            break
+        elif gap_min == max(gap_list):
+            normal = tight
+            continue
+        else:
+            remain = []
+            for i, j in enumerate(gap_list):
+                if j == gap_min:
+                    remain.append(tight[i])
+            tight = remain
+    if type(normal[0]) == list:
+        normal = normal[0]
+    result_normal = []
+    
+    # Check if the winner is in descending order; if so,
+    # reverse it into ascent. The normal form is found.
+    for pc in normal:
+        result_normal.append(pc)
+    pci = (result_normal[1]-result_normal[0])%12
+    if pci > 6:
+        result_normal.reverse()
+    
+    # Transpose the winner, making it start with PC-0.
+    # If it is in descending order, reverse it around
+    # the axis PC=0. The prime form is found.
+    count = normal[0]
+    for i in range(len(normal)):
+        normal[i] = (normal[i]-count)%12
+    if normal[1] > 6:
+        for i in range(1,len(normal)):
+            normal[i] = (0-normal[i])%12
+    result_prime = normal
+    
+    return result_normal, result_prime
+
+
+def _reference_ic_vector (pitch_set):
+    
+    # Find the prime form of the input; and
+    # create a null vector for later use.
+    prime = _reference_normal_prime_form(pitch_set)[1]
+    vector = [0,0,0,0,0,0]
+    count = len(prime)
+    
+    # Calculate and record the interval classes of 
+    # all intervals in the prime form.
+    for i in range(len(prime)-1):
+        for j in range(1, count):
+            upci = prime[-j]-prime[i]
+            if upci > 6:
+                upci = 12-upci
+            vector[upci-1] += 1
+        count -= 1
+    
+    return prime, vector
+
+
+def _reference_interval_matrix (pitch_set):
+    
+    # Create a matrix showing all intervals among the 
+    # set members; calculated in semitones.
+    cdt = len(pitch_set)
+    matrix = [[0]*cdt for _ in range(cdt)]
+    for i in range(cdt):
+        pre = pitch_set[i]
+        for j in range(cdt):
+            post = pitch_set[j]
+            interval = (post-pre)%12
+            matrix[i][j] = interval
+    
+    # Extract and store the intervals between all pairs
+    # of different set members. The results are organized 
+    # according to generic intervals; in each low-level
+    # list, the indices indicate starting set members.
+    chrom_matrix = []
+    for i in range(1, cdt):
+        chrom = []
+        for j in range(cdt):
+            interval = matrix[j][(i+j)%(cdt)]
+            chrom.append(interval)
+        chrom_matrix.append(chrom)
+        
+    return chrom_matrix
+
+
+def _reference_maximal_even (pitch_set):
+    
+    # Get the prime form of the given set.
+    prime = _reference_normal_prime_form(pitch_set)[1]
+    
+    # Get the matrix indicating the intervals between all
+    # pairs of different prime-form members.
+    chrom_matrix = _reference_interval_matrix(prime)
+    
+    # Test the evenness using Clough and Douthett's theorem;
+    # simultaneously, check the Myhill's property.
+    maximal_even = True
+    myhill = True
+    cdt = len(prime)
+    for i in range(cdt-1):
+        chrom = chrom_matrix[i]
+        j = min(chrom)
+        k = max(chrom)
+        if j == k-1:
+            continue
+        elif j == k:
+            myhill = False
+            continue
+        elif j < k-1:
+            maximal_even = False
+            myhill = False
+            break
+    
+    return maximal_even, myhill
+
+
+def _reference_detect_complexity (pitch_set, normalize=True):
+    
+    # If normalize is True, transform the input set into 
+    # the normal form; if not, use the given set directly.
+    if normalize == True:
+        normal = _reference_normal_prime_form(pitch_set)[0]
+    else:
+        normal = pitch_set
+    
+    # Get the matrix indicating chromatic intervals between
+    # all pairs of different set members.
+    chrom_matrix = _reference_interval_matrix(normal)
+    
+    # Use above matrix to find ambiguity and contradiction;
+    # record their generic intervals and locations.
+    cdt = len(normal)
+    ambiguity = False
+    ambgt_case = {}
+    ambgt_count = 0
+    contradiction = False
+    contd_case = {}
+    contd_count = 0
+    # In each pair of consecutive generic intervals:
+    for i in range(cdt-2):
+        pre = chrom_matrix[i]
+        pre_max = max(pre)
+        post = chrom_matrix[i+1]
+        post_min = min(post)
+        
+        # The condition means the existence of complexity.
+        if pre_max >= post_min:
+            label = str(i+1)+'/'+str(i+2)
+            loc_con = []
+            loc_con_pre = []
+            loc_con_post = []
+            loc_amb = []
+            loc_amb_pre = []
+            loc_amb_post = []
+            # Check every case of the smaller generic interval.
+            # If it chromatically equals/is larger than the
+            # minimum of the larger generic interval, a case of
+            # ambiguity/complexity is recorded.
+            for m, n in enumerate(pre):
+                if n > post_min:
+                    loc_con_pre.append(m)
+                    contd_count += 1
+                elif n == post_min:
+                    loc_amb_pre.append(m)
+                    ambgt_count += 1
+            if len(loc_con_pre) > 0:
+                contradiction = True
+                loc_con.append(loc_con_pre)
+            if len(loc_amb_pre) > 0:
+                ambiguity = True
+                loc_amb.append(loc_amb_pre)
+            # Check every case of the larger generic interval.
+            # If it chromatically equals/is smaller than the
+            # maximum of the smaller generic interval, a case of
+            # ambiguity/complexity is recorded.
+            for m, n in enumerate(post):
+                if n < pre_max:
+                    loc_con_post.append(m)
+                    contd_count += 1
+                elif n == pre_max:
+                    loc_amb_post.append(m)
+                    ambgt_count += 1
+            if len(loc_con_post) > 0:
+                contradiction = True
+                loc_con.append(loc_con_post)
+            if len(loc_amb_post) > 0:
+                ambiguity = True
+                loc_amb.append(loc_amb_post)
+                
+            # Collect all recorded cases of complexity.
+            if len(loc_con) > 0:
+                contd_case.update({label:loc_con})
+            if len(loc_amb) > 0:
+                ambgt_case.update({label:loc_amb})
+        
+    return normal, [ambiguity, ambgt_count], ambgt_case, [
+        contradiction, contd_count], contd_case
+
+
+def _check_tables (sets):
+
+    for s in sets:
+        normal = _reference_normal_prime_form(s)[0]
+        if (normal_prime_form(list(s)) != _reference_normal_prime_form(s)
+                or ic_vector(list(s)) != _reference_ic_vector(s)
+                or maximal_even(list(s)) != _reference_maximal_even(s)
+                or interval_matrix(normal)
+                != _reference_interval_matrix(normal)
+                or detect_complexity(list(s), True)
+                != _reference_detect_complexity(s)
+                or detect_complexity(list(s), False)
+                != _reference_detect_complexity(list(s), False)):
+            return s
+    return None
+
+
+def _check_edo_forms (sets):
+
+    from .set_class import normal_prime_form_edo
+    
+    for s in sets:
+        if normal_prime_form_edo(s) != _reference_normal_prime_form(s):
+            return s
+    return None
+
+
+def _check_pcset_input (sets):
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for s in sets:
+            pc_set = PCSet(s)
+            pcs = sorted(set(pitch%12 for pitch in s))
+            ref = sorted(random.Random(len(s)).sample(range(12), len(pcs)))
+            if (normal_prime_form(pc_set) != normal_prime_form(list(s))
+                    or ic_vector(pc_set) != ic_vector(list(s))
+                    or maximal_even(pc_set) != maximal_even(list(s))
+                    or interval_matrix(pc_set) != interval_matrix(pcs)
+                    or detect_complexity(pc_set, True)
+                    != detect_complexity(list(s), True)
+                    or optimal_order(pc_set, ref, True)
+                    != optimal_order(list(pcs), ref, True)
+                    or distance_vl_gm(pc_set, True, None)
+                    != distance_vl_gm(list(s), True, None)):
+                return s
+    return None
+
+
+# Every way of passing a set read-only: a tuple, an array, a
+# memoryview, and NumPy arrays and strided views if available.
+
+def _read_only_forms (pitch_set):
+
+    from array import array
+    
+    forms = [tuple(pitch_set), array('b', pitch_set),
+             memoryview(array('b', pitch_set))]
+    try:
+        import numpy as np
+    except ImportError:
+        return forms
+    forms.append(np.array(pitch_set, dtype=np.uint8))
+    forms.append(np.repeat(np.array(pitch_set, dtype=np.int16), 2)[::2])
+    for form in forms[-2:]:
+        form.flags.writeable = False
+    
+    return forms
+
+
+def _check_read_only (sets):
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for s in sets:
+            pcs = sorted(set(pitch%12 for pitch in s))
+            ref = sorted(random.Random(len(s)).sample(range(12), len(pcs)))
+            expected = (normal_prime_form(list(s)), ic_vector(list(s)),
+                        maximal_even(list(s)), interval_matrix(pcs),
+                        detect_complexity(list(s), True),
+                        optimal_order(list(pcs), list(ref), True),
+                        distance_vl_gm(list(s), True, None),
+                        distance_vl_gm(list(s), False, list(ref)))
+            for form, pc_form, ref_form in zip(_read_only_forms(s),
+                                               _read_only_forms(pcs),
+                                               _read_only_forms(ref)):
+                if (normal_prime_form(form), ic_vector(form),
+                        maximal_even(form), interval_matrix(pc_form),
+                        detect_complexity(form, True),
+                        optimal_order(pc_form, ref_form, True),
+                        distance_vl_gm(form, True, None),
+                        distance_vl_gm(form, False, ref_form)) != expected:
+                    return s
+                if (list(form) != list(s) or list(pc_form) != pcs
+                        or list(ref_form) != ref):
+                    return s
+    return None
+
+
+def _check_batch (sets):
+
+    try:
+        from .batch import ic_vector_batch, prime_form_batch
+    except ImportError:
+        return None
+    from .pcset import pc_mask
+    
+    masks = [pc_mask(s) for s in sets]
+    vectors = ic_vector_batch(masks)
+    primes = prime_form_batch(masks)
+    for i, s in enumerate(sets):
+        prime, vector = _reference_ic_vector(s)
+        if list(vectors[i]) != vector or int(primes[i]) != pc_mask(prime):
+            return s
+    return None
+
+
+def _check_cache (sets):
+
+    from .cache import AnalysisCache
+    
+    cache = AnalysisCache(maxsize=64)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(2):
+            for s in sets:
+                if (cache.normal_prime_form(list(s))
+                        != normal_prime_form(list(s))
+                        or cache.detect_complexity(list(s), True)
+                        != detect_complexity(list(s), True)
+                        or cache.distance_vl_gm(list(s), False, 'diatonic')
+                        != distance_vl_gm(list(s), False, 'diatonic')):
+                    return s
+    return None
+
+
+def _check_spectrum (sets):
+
+    try:
+        from .spectrum import spectrum_batch
+    except ImportError:
+        return None
+    from .pcset import pc_mask
+    
+    masks = [pc_mask(s) for s in sets]
+    measures = spectrum_batch(masks)
+    for i, s in enumerate(sets):
+        complexity = _reference_detect_complexity(s)
+        if ((bool(measures['maximal_even'][i]),
+             bool(measures['myhill'][i])) != _reference_maximal_even(s)
+                or int(measures['ambiguity'][i]) != complexity[1][1]
+                or int(measures['contradiction'][i]) != complexity[3][1]):
+            return s
+    return None
+
+
+def _check_complexity_counts (sets):
+
+    from .complexity import complexity_batch
+    from .pcset import pc_mask
+    
+    ambiguity, contradiction = complexity_batch([pc_mask(s) for s in sets])
+    for i, s in enumerate(sets):
+        complexity = _reference_detect_complexity(s)
+        counts = detect_complexity(list(s), True, counts_only=True)
+        if (counts.as_tuple() != complexity
+                or int(ambiguity[i]) != complexity[1][1]
+                or int(contradiction[i]) != complexity[3][1]):
+            return s
+    return None
+
+
+def _check_similarity (sets):
+
+    from .pcset import pc_mask
+    from .similarity import set_similarity
+    
+    diatonic = [0, 2, 4, 5, 7, 9, 11]
+    reference = _reference_ic_vector(diatonic)[1]
+    masks = [pc_mask(s) for s in sets]
+    cosine = set_similarity(diatonic, masks, 'cosine')
+    rel = set_similarity(diatonic, masks, 'rel')
+    for i, s in enumerate(sets):
+        vector = _reference_ic_vector(s)[1]
+        norms = (math.sqrt(sum(x*x for x in vector))
+                 * math.sqrt(sum(x*x for x in reference)))
+        totals = sum(vector)*sum(reference)
+        pairs = list(zip(vector, reference))
+        expected_cosine = 0.0 if norms == 0 else sum(
+            x*y for x, y in pairs)/norms
+        expected_rel = 0.0 if totals == 0 else sum(
+            math.sqrt(x*y) for x, y in pairs)/math.sqrt(totals)
+        if (abs(cosine[i] - expected_cosine) > 1e-9
+                or abs(rel[i] - expected_rel) > 1e-9):
+            return s
+    return None
+
+
+def _check_dft (sets):
+
+    try:
+        from .dft import dft, dft_batch
+    except ImportError:
+        return None
+    from .pcset import pc_mask
+    
+    masks = [pc_mask(s) for s in sets]
+    magnitudes, phases = dft_batch(masks)
+    for i, s in enumerate(sets):
+        expected = dft(s)
+        if any(abs(a-b) > 1e-9 for a, b in zip(expected[0], magnitudes[i])):
+            return s
+        if any(abs(a-b) > 1e-9 for a, b in zip(expected[1], phases[i])):
+            return s
+    return None
+
+
+VERIFICATIONS = {
+    'set-class table': _check_tables,
+    'PCSet input': _check_pcset_input,
+    'read-only input': _check_read_only,
+    'batch functions': _check_batch,
+    'result cache': _check_cache,
+    'interval spectrum': _check_spectrum,
+    'DFT batch': _check_dft,
+    'complexity counts': _check_complexity_counts,
+    'similarity measures': _check_similarity,
+    'normal forms in any universe': _check_edo_forms,
+    }
+
+
+# Run every check on all 4095 non-empty pc sets and on random
+# sets of every style.
+
+# Output: {check name: None if identical, or the first
+# differing set}.
+
+def verify_fast_paths (count=200, seed=0):
+
+    sets = [[pc for pc in range(12) if mask >> pc & 1]
+            for mask in range(1, 4096)]
+    for cardinality in range(1, 13):
+        for style in STYLES:
+            sets += make_sets(cardinality, style, count, seed)
+    
+    return {name: check(sets) for name, check in VERIFICATIONS.items()}
+
+
+def _parse_range (text):
+
+    values = []
+    for part in text.split(','):
+        if '-' in part:
+            first, last = part.split('-')
+            values.extend(range(int(first), int(last)+1))
+        else:
+            values.append(int(part))
+    return values
+
+
+def main (argv=None):
+
+    parser = argparse.ArgumentParser(
+        prog='python -m music_analysis.benchmark',
+        description='Benchmark and verify the analysis functions.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    run = commands.add_parser('run', help='time the functions')
+    compare = commands.add_parser(
+        'compare', help='compare a run with a baseline')
+    for command in (run, compare):
+        command.add_argument('--functions', help='comma-separated names')
+        command.add_argument('--cardinalities', default='1-12',
+                             help='e.g. 1-12 or 3,7')
+        command.add_argument('--styles', default=','.join(STYLES))
+        command.add_argument('--sizes', default='1,100,10000',
+                             help='batch sizes, e.g. 1,1000,1000000')
+        command.add_argument('--repeat', type=int, default=3)
+    run.add_argument('--output', help='save the results as JSON')
+    compare.add_argument('baseline')
+    compare.add_argument('current', nargs='?',
+                         help='a saved run; run now when omitted')
+    compare.add_argument('--threshold', type=float, default=0.1,
+                         help='tolerated slowdown (default 0.1 = 10%%)')
+    verify = commands.add_parser(
+        'verify', help='check fast paths against the reference code')
+    verify.add_argument('--count', type=int, default=200)
+    args = parser.parse_args(argv)
+    
+    if args.command == 'verify':
+        failures = 0
+        for name, result in verify_fast_paths(args.count).items():
+            if result is None:
+                print(name + ': identical')
+            else:
+                print(name + ': DIFFERS for ' + str(result))
+                failures += 1
+        return 1 if failures else 0
+    
+    def benchmark ():
+        return run_benchmarks(
+            args.functions.split(',') if args.functions else None,
+            _parse_range(args.cardinalities), args.styles.split(','),
+            _parse_range(args.sizes), args.repeat,
+            report=lambda line: print(line, file=sys.stderr))
+    
+    if args.command == 'run':
+        results = benchmark()
+        text = json.dumps(results, indent=1)
+        if args.output:
+            with open(args.output, 'w') as output:
+                output.write(text)
+        else:
+            print(text)
+        return 0
+    
+    with open(args.baseline) as baseline_file:
+        baseline = json.load(baseline_file)
+    if args.current:
+        with open(args.current) as current_file:
+            current = json.load(current_file)
+    else:
+        current = benchmark()
+    rows, regressions = compare_results(baseline, current, args.threshold)
+    for case, old, new, ratio in rows:
+        flag = '  REGRESSION' if ratio > 1 + args.threshold else ''
+        print(case + '\t' + format(old, '.3e') + '\t' + format(new, '.3e')
+              + '\t' + format(ratio, '.2f') + flag)
+    print(str(len(regressions)) + ' regression(s) in ' + str(len(rows))
+          + ' case(s)')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
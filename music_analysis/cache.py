@@ -0,0 +1,307 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# This module includes the two-tier result cache.
+
+
+                    ### Two-tier result cache ###
+
+# Memoize the analysis functions in two tiers: a bounded
+# in-process LRU cache, in front of an optional SQLite file
+# that is shared across runs and processes. A result is stored
+# under the function's name and a key made of its arguments
+# in canonical form: the pc mask wherever a function only uses
+# the pitch-class content, the pitch classes in order where the
+# order matters, the pitches themselves where the function
+# returns them, and the input itself (type included, so that a
+# list and a tuple are kept apart) where the function returns
+# it as it was given. Each stored result carries the version of
+# its function in FUNCTION_VERSIONS; results of an older
+# version count as misses and are replaced.
+
+# Results are kept pickled, so every call returns a fresh copy
+# that the caller may change freely. A hit skips the function
+# entirely, including what it prints.
+
+# New results reach the file "batch" at a time, on flush() and
+# on close(). Whatever is still pending is also written when the
+# cache is garbage-collected and when its process exits,
+# including a worker process of a multiprocessing or
+# concurrent.futures pool at shutdown.
+
+# The versions are not derived from the code: whoever changes
+# the results of a function, or of a module it relies on (listed
+# next to its version), must raise its version by hand.
+
+# SQLite and multiprocessing are imported only when a cache
+# opens its file.
+
+# Usage:
+#     cache = AnalysisCache(path='results.sqlite')
+#     cache.distance_vl_gm([9,11,12,4,5], False, 'pentatonic')
+#     cache.stats()
+
+import os
+import pickle
+from collections import OrderedDict
+
+from .complexity import detect_complexity
+from .distance import distance_vl_gm, optimal_order, ref_dict
+from .evenness import interval_matrix, maximal_even
+from .pcset import pc_mask
+from .set_class import ic_vector, normal_prime_form
+from .voice_leading import even_distance, voice_leading_distance
+
+# Raise a function's version whenever its results change; the
+# modules its results depend on are noted next to it.
+FUNCTION_VERSIONS = {
+    'normal_prime_form': 1,       # set_class, table
+    'ic_vector': 1,               # set_class, table
+    'interval_matrix': 1,         # evenness, spectrum
+    'maximal_even': 1,            # evenness, spectrum, table
+    'detect_complexity': 1,       # complexity, spectrum, table
+    'optimal_order': 1,           # distance
+    'distance_vl_gm': 1,          # distance (and ref_dict)
+    'voice_leading_distance': 1,  # voice_leading
+    'even_distance': 1,           # voice_leading
+    }
+
+
+def _pitches (pitch_set):
+
+    return tuple(int(pitch) for pitch in pitch_set)
+
+
+def _pcs (pitch_set):
+
+    return tuple(int(pitch)%12 for pitch in pitch_set)
+
+
+# The key of a reference of distance_vl_gm: a named scale is
+# keyed by its content too, since ref_dict may change.
+
+def _reference_key (reference):
+
+    if reference is None or isinstance(reference, str):
+        if reference in ref_dict:
+            return reference, tuple(ref_dict[reference][0])
+        return reference
+    return tuple(sorted(_pitches(reference)))
+
+
+# Write results left pending by a cache that is collected or
+# whose process exits; the file and table already exist.
+
+def _write_pending (path, pending):
+
+    import sqlite3
+    
+    if not pending:
+        return
+    connection = sqlite3.connect(path, timeout=60)
+    try:
+        with connection:
+            connection.executemany(
+                'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)',
+                pending)
+    finally:
+        connection.close()
+    pending.clear()
+
+
+# For each function: the function and the key of its arguments.
+_CACHED_FUNCTIONS = {
+    'normal_prime_form': (
+        normal_prime_form, lambda pitch_set: pc_mask(pitch_set)),
+    'ic_vector': (
+        ic_vector, lambda pitch_set: pc_mask(pitch_set)),
+    'interval_matrix': (
+        interval_matrix, lambda pitch_set: _pcs(pitch_set)),
+    'maximal_even': (
+        maximal_even, lambda pitch_set: pc_mask(pitch_set)),
+    'detect_complexity': (
+        detect_complexity,
+        lambda pitch_set, normalize, counts_only=False: (
+            (True, pc_mask(pitch_set)) if normalize == True
+            else (False, pitch_set))
+        + (('counts',) if counts_only else ())),
+    'optimal_order': (
+        optimal_order,
+        lambda lst_ps, lst_ref, eucld: (
+            tuple(sorted(_pitches(lst_ps))), _pitches(lst_ref),
+            eucld == True)),
+    'distance_vl_gm': (
+        distance_vl_gm,
+        lambda pitch_set, perft_even, reference: (
+            pc_mask(pitch_set), perft_even == True,
+            None if perft_even == True else _reference_key(reference))),
+    'voice_leading_distance': (
+        voice_leading_distance,
+        lambda pitch_set, target, metric='vl', transpose=True: (
+            pc_mask(pitch_set), pc_mask(target), metric, bool(transpose))),
+    'even_distance': (
+        even_distance,
+        lambda pitch_set, metric='vl': (pc_mask(pitch_set), metric)),
+    }
+
+
+class AnalysisCache:
+
+    # Input: (1) the number of results kept in memory. (2) The
+    # path of the SQLite file, or None for memory only. (3) The
+    # number of new results written to the file at once.
+    def __init__ (self, maxsize=65536, path=None, batch=256):
+        self.maxsize = maxsize
+        self.path = path
+        self.batch = batch
+        self._memory = OrderedDict()
+        self._pending = []
+        self._connection = None
+        self._pid = None
+        self._counts = {'hits': 0, 'disk_hits': 0, 'misses': 0,
+                        'evictions': 0}
+    
+    # Open the file once per process; connections do not
+    # survive a fork.
+    def _database (self):
+        if self.path is None:
+            return None
+        if self._connection is None or self._pid != os.getpid():
+            import sqlite3
+            from multiprocessing.util import Finalize
+            self._connection = sqlite3.connect(self.path, timeout=60)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS results (function TEXT, '
+                'key BLOB, version INTEGER, value BLOB, '
+                'PRIMARY KEY (function, key))')
+            # Pending results belong to the process that made
+            # them; a new process starts its own list, written
+            # at the latest when it exits.
+            if self._pid != os.getpid():
+                self._pending = []
+                Finalize(self, _write_pending,
+                         args=(self.path, self._pending), exitpriority=0)
+            self._pid = os.getpid()
+        return self._connection
+    
+    def _remember (self, memory_key, value):
+        self._memory[memory_key] = value
+        self._memory.move_to_end(memory_key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+            self._counts['evictions'] += 1
+    
+    # Call a cached function by name.
+    def call (self, name, *args, **kwargs):
+        function, make_key = _CACHED_FUNCTIONS[name]
+        version = FUNCTION_VERSIONS[name]
+        key = pickle.dumps(make_key(*args, **kwargs))
+        memory_key = (name, key)
+        
+        value = self._memory.get(memory_key)
+        if value is not None:
+            self._memory.move_to_end(memory_key)
+            self._counts['hits'] += 1
+            return pickle.loads(value)
+        
+        database = self._database()
+        if database is not None:
+            row = database.execute(
+                'SELECT version, value FROM results WHERE function=? '
+                'AND key=?', (name, key)).fetchone()
+            if row is not None and row[0] == version:
+                self._counts['disk_hits'] += 1
+                self._remember(memory_key, row[1])
+                return pickle.loads(row[1])
+        
+        self._counts['misses'] += 1
+        result = function(*args, **kwargs)
+        value = pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+        self._remember(memory_key, value)
+        if database is not None:
+            self._pending.append((name, key, version, value))
+            if len(self._pending) >= self.batch:
+                self.flush()
+        return result
+    
+    # Write the pending results to the file.
+    def flush (self):
+        database = self._database()
+        if database is None or not self._pending:
+            return
+        with database:
+            database.executemany(
+                'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)',
+                self._pending)
+        self._pending.clear()
+    
+    # Delete the results of older function versions from the file.
+    def purge_stale (self):
+        database = self._database()
+        if database is None:
+            return 0
+        removed = 0
+        with database:
+            for name, version in FUNCTION_VERSIONS.items():
+                removed += database.execute(
+                    'DELETE FROM results WHERE function=? AND version!=?',
+                    (name, version)).rowcount
+        return removed
+    
+    def clear_memory (self):
+        self._memory.clear()
+    
+    def close (self):
+        self.flush()
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+    
+    def __enter__ (self):
+        return self
+    
+    def __exit__ (self, *exc_info):
+        self.close()
+    
+    # Output: the numbers of memory hits, file hits, misses and
+    # evictions, the hit rate, and the number of results in memory.
+    def stats (self):
+        stats = dict(self._counts)
+        calls = stats['hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = (calls - stats['misses'])/calls if calls else 0.0
+        stats['size'] = len(self._memory)
+        stats['maxsize'] = self.maxsize
+        return stats
+    
+    def normal_prime_form (self, pitch_set):
+        return self.call('normal_prime_form', pitch_set)
+    
+    def ic_vector (self, pitch_set):
+        return self.call('ic_vector', pitch_set)
+    
+    def interval_matrix (self, pitch_set):
+        return self.call('interval_matrix', pitch_set)
+    
+    def maximal_even (self, pitch_set):
+        return self.call('maximal_even', pitch_set)
+    
+    def detect_complexity (self, pitch_set, normalize, counts_only=False):
+        return self.call('detect_complexity', pitch_set, normalize,
+                         counts_only)
+    
+    def optimal_order (self, lst_ps, lst_ref, eucld):
+        return self.call('optimal_order', lst_ps, lst_ref, eucld)
+    
+    def distance_vl_gm (self, pitch_set, perft_even, reference):
+        return self.call('distance_vl_gm', pitch_set, perft_even, reference)
+    
+    def voice_leading_distance (self, pitch_set, target, metric='vl',
+                                transpose=True):
+        return self.call('voice_leading_distance', pitch_set, target,
+                         metric, transpose)
+    
+    def even_distance (self, pitch_set, metric='vl'):
+        return self.call('even_distance', pitch_set, metric)
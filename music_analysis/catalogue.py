@@ -0,0 +1,349 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# This module includes the set-class catalogue.
+
+
+                    ### Set-class catalogue ###
+
+# List the set classes of one cardinality d in c-tone equal
+# temperament without looking at the 2^c subsets. A set class
+# is a bracelet: the cyclic sequence of its d steps (adding up
+# to c), up to rotation and reversal. Its prime form, as
+# normal_prime_form_edo gives it, reads the steps from just
+# after a largest step, the smallest way round (see
+# set_class.py).
+
+# The steps are chosen one by one, for every largest step M in
+# turn. As in set_class.py, a marker smaller than every step is
+# written after each step M; the steps are canonical read upwards
+# exactly when the marked sequence is a necklace (no rotation of
+# it is smaller), so a prefix is abandoned as soon as it can no
+# longer begin a necklace (the test of the Fredricksen-Kessler-
+# Maiorana algorithm). A finished necklace is kept unless
+# reading its steps downwards gives a smaller prime form. Every
+# set class is thus produced once, and for each M in increasing
+# order of prime form.
+
+# Each entry holds the prime form, the interval-class vector
+# (the number of intervals of each class from 1 to c/2), maximal
+# evenness and Myhill's property, and the numbers of ambiguities
+# and contradictions (see spectrum.py).
+
+# A catalogue may be written to a directory of raw column files
+# with a JSON header (header.json), as in store.py, together
+# with an index: the row numbers in increasing order of prime
+# form, so that a prime form is found by binary search.
+
+# Usage:
+#     for entry in set_class_catalogue(31, 7):
+#         ...
+#     write_catalogue('31-7.catalogue', 31, 7)
+#     with SetClassCatalogue('31-7.catalogue') as catalogue:
+#         catalogue.find([0, 4, 9, 13, 18, 22, 27])
+
+import heapq
+import mmap
+import os
+from array import array
+from collections import namedtuple
+
+from .evenness import maximal_even_edo
+from .set_class import _least_rotation, _marked_steps, normal_prime_form_edo
+from .spectrum import IntervalSpectrum
+from .store import _append_columns, _map_columns, _read_header, _unmap_columns
+from .store import _write_header
+
+FORMAT = 'music-analysis-catalogue'
+VERSION = 1
+
+CatalogueEntry = namedtuple('CatalogueEntry', [
+    'prime', 'vector', 'maximal_even', 'myhill', 'ambiguity',
+    'contradiction'])
+
+
+# Add a symbol to a marked prefix, keeping the length of its
+# longest Lyndon prefix in "periods"; return False if the
+# prefix could no longer begin a necklace.
+
+def _extend_prefix (marked, periods, symbol):
+
+    length = len(marked)
+    period = periods[-1]
+    previous = marked[length-period]
+    if symbol < previous:
+        return False
+    marked.append(symbol)
+    periods.append(period if symbol == previous else length+1)
+    return True
+
+
+def _retract_prefix (marked, periods, count):
+
+    del marked[len(marked)-count:]
+    del periods[len(periods)-count:]
+
+
+# Generate the canonical step sequences whose largest step,
+# closing the cycle, is "largest": the first d-1 steps of
+# every prime form, in increasing order.
+
+def _canonical_steps (c, d, largest):
+
+    marked = [-1]
+    periods = [1]
+    steps = []
+    added = []
+    # The next value to try at each position.
+    values = [1]
+    total = 0
+    while values:
+        position = len(steps)
+        value = values[-1]
+        remaining = d-2-position
+        if value > largest or total+value+remaining > c-largest:
+            # This position is exhausted: go back one step.
+            values.pop()
+            if steps:
+                total -= steps.pop()
+                _retract_prefix(marked, periods, added.pop())
+            continue
+        if total+value+remaining*largest < c-largest:
+            values[-1] += 1
+            continue
+        values[-1] += 1
+        count = len(marked)
+        if not _extend_prefix(marked, periods, value):
+            continue
+        if value == largest and not _extend_prefix(marked, periods, -1):
+            _retract_prefix(marked, periods, len(marked)-count)
+            continue
+        steps.append(value)
+        added.append(len(marked)-count)
+        total += value
+        
+        if remaining > 0:
+            values.append(1)
+            continue
+        
+        # A full sequence: close the cycle with the largest step
+        # and keep it if it is a necklace and no smaller read
+        # downwards.
+        if _extend_prefix(marked, periods, largest):
+            necklace = len(marked) % periods[-1] == 0
+            _retract_prefix(marked, periods, 1)
+            if necklace:
+                cycle = steps + [largest]
+                down_marked, starts = _marked_steps(
+                    cycle, range(d-1, -1, -1), largest)
+                down = starts[_least_rotation(down_marked)]
+                down_steps = [cycle[(down-2-k)%d] for k in range(d-1)]
+                if steps <= down_steps:
+                    yield tuple(steps)
+        total -= steps.pop()
+        _retract_prefix(marked, periods, added.pop())
+
+
+def _prime_forms (c, d):
+
+    if d == 1:
+        yield (0,)
+        return
+    for largest in range(-(-c//d), c-d+2):
+        for steps in _canonical_steps(c, d, largest):
+            prime = [0]
+            for step in steps:
+                prime.append(prime[-1]+step)
+            yield tuple(prime)
+
+
+def _catalogue_entry (prime, c):
+
+    vector = [0]*(c//2)
+    for i in range(len(prime)-1):
+        for j in range(i+1, len(prime)):
+            interval = prime[j]-prime[i]
+            vector[min(interval, c-interval)-1] += 1
+    spectrum = IntervalSpectrum(prime, c)
+    return CatalogueEntry(
+        prime, tuple(vector), *maximal_even_edo(prime, c),
+        *spectrum.complexity_counts())
+
+
+# List the set classes of one cardinality.
+
+# Input: (1) the size c of the universe. (2) The cardinality d,
+# from 1 to c.
+
+# Output: a generator of CatalogueEntry, one per set class:
+# by largest step (the most compact set classes last), then in
+# increasing order of prime form.
+
+def set_class_catalogue (c, d):
+
+    if not 1 <= d <= c:
+        raise ValueError('The cardinality must lie between 1 and c')
+    for prime in _prime_forms(c, d):
+        yield _catalogue_entry(prime, c)
+
+
+# name -> (array type code, NumPy dtype, values per entry)
+
+def _columns (c, d):
+
+    return {
+        'prime': ('H', '<u2', d),
+        'vector': ('I', '<u4', c//2),
+        'flags': ('B', 'u1', 1),
+        'ambiguity': ('I', '<u4', 1),
+        'contradiction': ('I', '<u4', 1),
+        }
+
+
+# Write the catalogue of one cardinality to a directory.
+
+# Input: (1) the directory; it is created if missing, and an
+# earlier catalogue in it is replaced. (2) The size c of the
+# universe and (3) the cardinality d. (4) The number of entries
+# kept in memory between writes.
+
+# Output: the number of set classes.
+
+def write_catalogue (path, c, d, buffer_rows=65536):
+
+    if not 1 <= d <= c:
+        raise ValueError('The cardinality must lie between 1 and c')
+    if c > 65535:
+        raise ValueError('The universe must have at most 65535 tones')
+    os.makedirs(path, exist_ok=True)
+    if os.path.exists(os.path.join(path, 'header.json')):
+        os.remove(os.path.join(path, 'header.json'))
+    columns = _columns(c, d)
+    for name in list(columns) + ['index']:
+        open(os.path.join(path, name + '.bin'), 'wb').close()
+    
+    # The entries, in the order generated; each largest step
+    # starts a run sorted by prime form.
+    buffers = {name: array(code) for name, (code, dtype, width)
+               in columns.items()}
+    rows = 0
+    runs = []
+    last = None
+    for entry in set_class_catalogue(c, d):
+        largest = c - entry.prime[-1]
+        if largest != last:
+            runs.append(rows)
+            last = largest
+        buffers['prime'].extend(entry.prime)
+        buffers['vector'].extend(entry.vector)
+        buffers['flags'].append(entry.maximal_even + 2*entry.myhill)
+        buffers['ambiguity'].append(entry.ambiguity)
+        buffers['contradiction'].append(entry.contradiction)
+        rows += 1
+        if rows % buffer_rows == 0:
+            _append_columns(path, buffers)
+    _append_columns(path, buffers)
+    runs.append(rows)
+    
+    # Merge the sorted runs into the index, reading the prime
+    # forms back from the mapped file.
+    index = array('I')
+    if rows > 0:
+        with open(os.path.join(path, 'prime.bin'), 'rb') as prime_file:
+            mapped = mmap.mmap(prime_file.fileno(), 0, access=mmap.ACCESS_READ)
+        primes = memoryview(mapped).cast('H')
+        
+        def run (first, stop):
+            for row in range(first, stop):
+                yield primes[row*d:(row+1)*d].tolist(), row
+        
+        merged = heapq.merge(*[run(runs[k], runs[k+1])
+                               for k in range(len(runs)-1)])
+        for prime, row in merged:
+            index.append(row)
+            if len(index) >= buffer_rows:
+                _append_columns(path, {'index': index})
+        _append_columns(path, {'index': index})
+        primes.release()
+        mapped.close()
+    
+    _write_header(path, {
+        'format': FORMAT, 'version': VERSION, 'universe': c,
+        'cardinality': d, 'rows': rows,
+        'columns': {name: [dtype, width] for name, (code, dtype, width)
+                    in columns.items()}})
+    return rows
+
+
+# Map a catalogue for reading. Each column is an attribute: a
+# NumPy memmap (with "numpy" True; prime and vector are N x d
+# and N x c/2), or otherwise a read-only memoryview of the
+# mapped file, flat, in the machine's byte order (so on
+# little-endian machines only). The index is an attribute too.
+
+class SetClassCatalogue:
+
+    def __init__ (self, path, numpy=True):
+        header = _read_header(path, FORMAT, VERSION, 'set-class catalogue')
+        self.path = path
+        self.c = header['universe']
+        self.d = header['cardinality']
+        self.rows = header['rows']
+        self.numpy = numpy
+        self._columns = _columns(self.c, self.d)
+        self._columns['index'] = ('I', '<u4', 1)
+        self._maps = _map_columns(self, self._columns, ('prime', 'vector'))
+    
+    def __len__ (self):
+        return self.rows
+    
+    def close (self):
+        _unmap_columns(self, self._columns, self._maps)
+        self._maps = []
+    
+    def __enter__ (self):
+        return self
+    
+    def __exit__ (self, *exc_info):
+        self.close()
+    
+    def _values (self, name, row):
+        column = getattr(self, name)
+        if self.numpy:
+            return column[row].tolist()
+        if name not in ('prime', 'vector'):
+            return column[row]
+        width = self._columns[name][2]
+        return column[row*width:(row+1)*width].tolist()
+    
+    # Output: the CatalogueEntry of a row.
+    def entry (self, row):
+        flags = self._values('flags', row)
+        return CatalogueEntry(
+            tuple(self._values('prime', row)),
+            tuple(self._values('vector', row)), bool(flags & 1),
+            bool(flags & 2), self._values('ambiguity', row),
+            self._values('contradiction', row))
+    
+    # Output: the row of the set class of a given set (in
+    # pitch numbers of the catalogue's universe), or None if it
+    # has another cardinality.
+    def find (self, pitch_set):
+        prime = normal_prime_form_edo(pitch_set, self.c)[1]
+        if len(prime) != self.d:
+            return None
+        low = 0
+        high = self.rows
+        while low < high:
+            middle = (low+high)//2
+            row = self._values('index', middle)
+            if self._values('prime', row) < prime:
+                low = middle+1
+            else:
+                high = middle
+        if low < self.rows:
+            row = self._values('index', low)
+            if self._values('prime', row) == prime:
+                return row
+        return None
@@ -0,0 +1,123 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# This module includes the command-line interface.
+
+
+                    ### Command-line interface ###
+
+# Analyze pitch sets given on the command line, or read from
+# standard input (one set per line) when none is given. A set
+# is written as pitch-class or MIDI-pitch numbers separated by
+# commas and/or spaces, e.g. "0,4,7" or "60 64 67".
+
+# Output: one line per set, with the tab-separated input, normal
+# form, prime form, interval-class vector, maximal evenness,
+# Myhill's property, and numbers of ambiguities and
+# contradictions; with --reference, also the voice-leading and
+# Euclidean distances to the reference (None when undefined).
+# With --json, one JSON object per line instead.
+
+import argparse
+import json
+import re
+import sys
+
+from .distance import distance_vl_gm, ref_dict
+from .table import set_class_entry
+
+
+# Turn a written set into a list of integers.
+
+def _parse_set (text):
+    
+    return [int(token) for token in text.replace(',', ' ').split()]
+
+
+# argparse takes an argument beginning with a minus sign and a
+# digit, such as "-1,0", for an option; a leading space marks it
+# as a set, and _parse_set ignores it.
+
+def _mark_sets (argv):
+    
+    return [' ' + arg if re.match(r'-\d', arg) else arg for arg in argv]
+
+
+# Analyze one set; return the output fields by name.
+
+def _analyze (pitch_set, reference):
+    
+    entry = set_class_entry(pitch_set)
+    result = {
+        'set': pitch_set,
+        'normal': list(entry.normal),
+        'prime': list(entry.prime),
+        'vector': list(entry.vector),
+        'maximal_even': entry.maximal_even,
+        'myhill': entry.myhill,
+        'ambiguity': entry.ambiguity,
+        'contradiction': entry.contradiction}
+    
+    # distance_vl_gm reports undefined distances by printing;
+    # check the cardinality first instead.
+    if reference is not None:
+        cdt = len(entry.normal)
+        perft_even = reference == 'even'
+        distance = [None, None]
+        if cdt > 1 and (perft_even or cdt == len(ref_dict[reference][0])):
+            distance = distance_vl_gm(
+                list(entry.normal), perft_even, reference)[2:]
+        result['distance_vl'], result['distance_gm'] = distance
+    
+    return result
+
+
+def _format (result, as_json):
+    
+    if as_json:
+        return json.dumps(result)
+    return '\t'.join(str(value) for value in result.values())
+
+
+def main (argv=None):
+    
+    parser = argparse.ArgumentParser(
+        prog='music-analysis',
+        description='Analyze pitch-class sets: normal and prime forms, '
+                    'interval-class vector, maximal evenness and '
+                    'scalar complexity.')
+    parser.add_argument(
+        'sets', nargs='*', metavar='SET',
+        help='a pitch set such as 0,4,7; read from standard input '
+             'when omitted')
+    parser.add_argument(
+        '--reference', choices=['even'] + list(ref_dict),
+        help="also measure the distances to a scale in ref_dict, or to "
+             "the perfectly even scale ('even')")
+    parser.add_argument(
+        '--json', action='store_true',
+        help='print one JSON object per set')
+    if argv is None:
+        argv = sys.argv[1:]
+    args = parser.parse_args(_mark_sets(argv))
+    
+    if args.sets:
+        lines = args.sets
+    else:
+        lines = sys.stdin
+    
+    status = 0
+    for number, line in enumerate(lines, 1):
+        try:
+            pitch_set = _parse_set(line)
+        except ValueError:
+            print('music-analysis: set ' + str(number) + ': cannot read '
+                  + repr(line.strip()), file=sys.stderr)
+            status = 1
+            continue
+        if not pitch_set:
+            continue
+        print(_format(_analyze(pitch_set, args.reference), args.json))
+    
+    return status
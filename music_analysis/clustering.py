@@ -0,0 +1,428 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# This module includes the corpus clustering tools.
+
+
+                    ### Corpus clustering ###
+
+# Cluster N pitch sets by their exact voice-leading or
+# Euclidean distances (see voice_leading.py). The distances
+# are stored on disk as a condensed matrix: the upper triangle
+# of the N x N matrix, row by row, as in SciPy, so the pair
+# (i, j) with i < j is found at
+#     N*i - i*(i+1)/2 + (j-i-1).
+# The file is memory-mapped and filled in blocks of rows, so it
+# may be larger than the memory. After each block, the number
+# of finished rows is saved in a JSON file next to it (path +
+# '.json'), so that an interrupted run resumes where it stopped.
+
+# Distances only depend on pc content, so the distances of each
+# distinct pc set to all others are computed once and reused
+# for every set sharing its pitch classes.
+
+# NumPy is imported only when these functions are called.
+
+import hashlib
+import json
+import os
+
+from .pcset import pc_mask
+from .voice_leading import _group_targets, _grouped_distances
+
+
+# Position of the pair (i, j), i < j, in a condensed matrix.
+
+def condensed_index (n, i, j):
+
+    if i > j:
+        i, j = j, i
+    return n*i - i*(i+1)//2 + (j-i-1)
+
+
+# Read the description saved next to a distance file.
+
+def _read_header (path):
+
+    with open(path + '.json') as header_file:
+        return json.load(header_file)
+
+
+def _write_header (path, header):
+
+    temporary = path + '.json.tmp'
+    with open(temporary, 'w') as header_file:
+        json.dump(header, header_file)
+    os.replace(temporary, path + '.json')
+
+
+# Compute the condensed distance matrix of a corpus into a
+# memory-mapped file, resuming an unfinished file built from
+# the same sets and options.
+
+# Input: (1) a sequence of pitch sets in pitch-class or
+# MIDI-pitch numbers (or PCSets). (2) The path of the file.
+# (3) 'vl' or 'euclidean'. (4) Whether sets may be transposed
+# (comparing structures, as distance_vl_gm does) or not. (5) The
+# number of rows computed between two saves.
+
+# Output: the condensed matrix, as a read-only NumPy memmap.
+
+def build_distance_file (pitch_sets, path, metric='vl', transpose=True,
+                         block_rows=256):
+    
+    import numpy as np
+    
+    if metric not in ('vl', 'euclidean'):
+        raise ValueError("metric must be 'vl' or 'euclidean'")
+    euclidean = metric == 'euclidean'
+    masks = np.array([pc_mask(pitch_set) for pitch_set in pitch_sets],
+                     dtype=np.uint16)
+    if (masks == 0).any():
+        raise ValueError('The corpus contains an empty set')
+    n = len(masks)
+    size = n*(n-1)//2
+    header = {
+        'n': n, 'metric': metric, 'transpose': transpose,
+        'dtype': 'float32',
+        'sets': hashlib.sha1(masks.tobytes()).hexdigest(),
+        'rows': 0}
+    
+    # Resume only a file built from the same corpus and options.
+    if os.path.exists(path) and os.path.exists(path + '.json'):
+        saved = _read_header(path)
+        if all(saved[key] == header[key] for key in header if key != 'rows'):
+            header['rows'] = saved['rows']
+    if header['rows'] == 0:
+        matrix = np.memmap(path, dtype=np.float32, mode='w+',
+                           shape=(max(size, 1),))
+        _write_header(path, header)
+    else:
+        matrix = np.memmap(path, dtype=np.float32, mode='r+',
+                           shape=(max(size, 1),))
+    
+    # Distances between distinct pc sets, computed on demand.
+    distinct, inverse = np.unique(masks, return_inverse=True)
+    groups = _group_targets(np, [[pc for pc in range(12) if mask >> pc & 1]
+                                 for mask in distinct.tolist()])
+    if transpose:
+        transpositions = list(range(12))
+    else:
+        transpositions = [0]
+    rows = {}
+    
+    def distinct_row (u):
+        if u not in rows:
+            mask = int(distinct[u])
+            row = _grouped_distances(
+                np, [pc for pc in range(12) if mask >> pc & 1], groups,
+                len(distinct), transpositions, euclidean)
+            if euclidean:
+                row = np.sqrt(row)
+            rows[u] = row.astype(np.float32)
+        return rows[u]
+    
+    for first in range(header['rows'], n-1, block_rows):
+        last = min(first+block_rows, n-1)
+        for i in range(first, last):
+            start = condensed_index(n, i, i+1)
+            matrix[start:start+n-i-1] = distinct_row(inverse[i])[inverse[i+1:]]
+        matrix.flush()
+        header['rows'] = last
+        _write_header(path, header)
+    
+    return open_distance_file(path)[0]
+
+
+# Open a finished distance file.
+
+# Output: (1) the condensed matrix, as a read-only NumPy
+# memmap. (2) The number of sets N.
+
+def open_distance_file (path):
+
+    import numpy as np
+    
+    header = _read_header(path)
+    n = header['n']
+    if header['rows'] < n-1:
+        raise ValueError('The distance file is unfinished: ' + str(path))
+    matrix = np.memmap(path, dtype=header['dtype'], mode='r',
+                       shape=(max(n*(n-1)//2, 1),))
+    
+    return matrix, n
+
+
+# Return the distances from set i to all N sets (0 at i).
+
+def distance_row (matrix, n, i):
+
+    import numpy as np
+    
+    row = np.zeros(n, dtype=np.float64)
+    before = np.arange(i)
+    row[:i] = matrix[n*before - before*(before+1)//2 + (i-before-1)]
+    start = condensed_index(n, i, i+1) if i < n-1 else 0
+    row[i+1:] = matrix[start:start+n-i-1]
+    
+    return row
+
+
+# Hierarchical clustering by the nearest-neighbour-chain
+# algorithm, with the Lance-Williams update of the merged
+# cluster's distances. The merges change the distances, so
+# they are made on a memory-mapped working copy of the file.
+
+# Single linkage needs no working copy: it is found from the
+# minimum spanning tree, grown one set at a time (Prim's
+# algorithm), reading one row of the file per set.
+
+# Ties are broken as in SciPy's linkage, so that the result is
+# the same even when distances are equal (as the integer
+# voice-leading distances often are). In the chain, a cluster's
+# nearest neighbour is the previous link if it is among the
+# nearest, else the nearest of lowest index; the chain starts
+# at the first active cluster, and the merged cluster takes the
+# place of the higher of the two indices. The tree grows from
+# set 0, each time to the nearest set of lowest index. Merges of
+# equal distance keep the order in which they were made.
+
+# Input: (1) the path of a finished distance file. (2) The
+# linkage: 'single', 'complete' or 'average'. (3) The path of
+# the working copy; the distance file's path + '.work' by
+# default. It is removed afterwards.
+
+# Output: the linkage matrix in SciPy's format: one row per
+# merge, in order of distance, holding the ids of both clusters
+# (0 to N-1 for single sets, N+k for the cluster made by merge
+# k), the distance and the size of the new cluster.
+
+def linkage (path, method='average', work_path=None):
+
+    import numpy as np
+    
+    if method not in ('single', 'complete', 'average'):
+        raise ValueError("method must be 'single', 'complete' or 'average'")
+    matrix, n = open_distance_file(path)
+    if work_path is None:
+        work_path = path + '.work'
+    if method == 'single':
+        merges = _spanning_tree(np, matrix, n)
+    else:
+        try:
+            merges = _merge_clusters(np, matrix, n, method, work_path)
+        finally:
+            if os.path.exists(work_path):
+                os.remove(work_path)
+    
+    return _label_merges(np, merges, n)
+
+
+# The edges of the minimum spanning tree, as (a, b, distance),
+# in the order they are added.
+
+def _spanning_tree (np, matrix, n):
+
+    in_tree = np.zeros(n, dtype=bool)
+    nearest = np.full(n, np.inf)
+    merges = []
+    x = 0
+    for step in range(n-1):
+        in_tree[x] = True
+        nearest = np.where(in_tree, np.inf,
+                           np.minimum(nearest, distance_row(matrix, n, x)))
+        y = int(np.argmin(nearest))
+        merges.append((x, y, float(nearest[y])))
+        x = y
+    
+    return merges
+
+
+# The merges of linkage, unsorted, as (a, b, distance). The
+# working copy is closed when this returns.
+
+def _merge_clusters (np, matrix, n, method, work_path):
+
+    work = np.memmap(work_path, dtype=np.float64, mode='w+',
+                     shape=matrix.shape)
+    block = 2**20
+    for start in range(0, len(matrix), block):
+        work[start:start+block] = matrix[start:start+block]
+    
+    size = np.ones(n, dtype=np.int64)
+    active = np.ones(n, dtype=bool)
+    before_all = np.arange(n)
+    
+    # The row of cluster i: its distances to all active clusters.
+    def row (i):
+        distances = distance_row(work, n, i)
+        distances[~active] = np.inf
+        distances[i] = np.inf
+        return distances
+    
+    def write_row (i, distances):
+        before = before_all[:i]
+        keep = active[:i]
+        positions = n*before - before*(before+1)//2 + (i-before-1)
+        work[positions[keep]] = distances[:i][keep]
+        start = condensed_index(n, i, i+1) if i < n-1 else 0
+        after = distances[i+1:]
+        current = np.asarray(work[start:start+n-i-1])
+        work[start:start+n-i-1] = np.where(active[i+1:], after, current)
+    
+    merges = []
+    chain = []
+    remaining = n
+    while remaining > 1:
+        if not chain:
+            chain.append(int(np.flatnonzero(active)[0]))
+        
+        # Follow nearest neighbours until two clusters are each
+        # other's nearest; ties prefer the previous link.
+        while True:
+            top = chain[-1]
+            distances = row(top)
+            nearest = int(np.argmin(distances))
+            if len(chain) > 1 and distances[chain[-2]] <= distances[nearest]:
+                nearest = chain[-2]
+            if len(chain) > 1 and nearest == chain[-2]:
+                break
+            chain.append(nearest)
+        a = chain.pop()
+        b = chain.pop()
+        distance = float(distances[b])
+        if a > b:
+            a, b = b, a
+        
+        # Merge a into b with the Lance-Williams formula.
+        row_a = row(a)
+        row_b = row(b)
+        if method == 'single':
+            merged = np.minimum(row_a, row_b)
+        elif method == 'complete':
+            merged = np.maximum(row_a, row_b)
+        else:
+            merged = (size[a]*row_a + size[b]*row_b) / (size[a]+size[b])
+        merges.append((a, b, distance))
+        active[a] = False
+        size[b] += size[a]
+        write_row(b, merged)
+        remaining -= 1
+    
+    return merges
+
+
+# Sort the merges by distance and give each new cluster its
+# id, as SciPy does.
+
+def _label_merges (np, merges, n):
+
+    order = sorted(range(len(merges)), key=lambda k: merges[k][2])
+    parent = list(range(2*n))
+    cluster_id = list(range(n))
+    
+    def find (x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+    
+    size = [1]*n
+    result = np.zeros((len(merges), 4))
+    for k, index in enumerate(order):
+        a, b, distance = merges[index]
+        root_a = find(a)
+        root_b = find(b)
+        first, second = sorted((cluster_id[root_a], cluster_id[root_b]))
+        size[root_a] += size[root_b]
+        result[k] = (first, second, distance, size[root_a])
+        parent[root_b] = root_a
+        cluster_id[root_a] = n+k
+    
+    return result
+
+
+# Cut a linkage matrix into (at most) k clusters.
+
+# Output: the cluster label (0 to k-1) of each of the N sets.
+
+def cluster_labels (linkage_matrix, k):
+
+    import numpy as np
+    
+    n = len(linkage_matrix)+1
+    parent = list(range(2*n-1))
+    for step in range(n-max(k, 1)):
+        parent[int(linkage_matrix[step][0])] = n+step
+        parent[int(linkage_matrix[step][1])] = n+step
+    
+    def find (x):
+        while parent[x] != x:
+            x = parent[x]
+        return x
+    
+    labels = np.zeros(n, dtype=np.int64)
+    roots = {}
+    for i in range(n):
+        root = find(i)
+        labels[i] = roots.setdefault(root, len(roots))
+    
+    return labels
+
+
+# k-medoids clustering on a finished distance file: alternate
+# between assigning every set to its nearest medoid and moving
+# each medoid to the member of its cluster with the smallest
+# total distance to the others. The first medoids are drawn as
+# in k-means++ (each set chosen with probability proportional
+# to its distance to the nearest medoid so far).
+
+# Input: (1) the path of a finished distance file. (2) The
+# number of clusters. (3) The maximal number of iterations.
+# (4) The seed of the random draws.
+
+# Output: (1) the indices of the medoids. (2) The cluster
+# label (index into the medoids) of each set. (3) The total
+# distance from the sets to their medoids.
+
+def k_medoids (path, k, max_iter=100, seed=0):
+
+    import numpy as np
+    
+    matrix, n = open_distance_file(path)
+    if not 1 <= k <= n:
+        raise ValueError('k must lie between 1 and the number of sets')
+    generator = np.random.default_rng(seed)
+    
+    medoids = [int(generator.integers(n))]
+    nearest = distance_row(matrix, n, medoids[0])
+    while len(medoids) < k:
+        total = nearest.sum()
+        if total > 0:
+            choice = int(generator.choice(n, p=nearest/total))
+        else:
+            choice = int(np.flatnonzero(~np.isin(np.arange(n), medoids))[0])
+        medoids.append(choice)
+        nearest = np.minimum(nearest, distance_row(matrix, n, choice))
+    
+    for iteration in range(max_iter):
+        rows = np.array([distance_row(matrix, n, m) for m in medoids])
+        labels = rows.argmin(axis=0)
+        updated = []
+        for c in range(k):
+            members = np.flatnonzero(labels == c)
+            if len(members) == 0:
+                updated.append(medoids[c])
+                continue
+            costs = [distance_row(matrix, n, member)[members].sum()
+                     for member in members]
+            updated.append(int(members[int(np.argmin(costs))]))
+        if updated == medoids:
+            break
+        medoids = updated
+    
+    rows = np.array([distance_row(matrix, n, m) for m in medoids])
+    labels = rows.argmin(axis=0)
+    
+    return medoids, labels, float(rows.min(axis=0).sum())
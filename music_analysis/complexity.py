@@ -0,0 +1,246 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# This module includes the scalar complexity analyzer.
+
+from .instrument import instrumented
+from .set_class import normal_prime_form
+from .spectrum import IntervalSpectrum
+from .table import set_class_entry
+
+
+                    ### Scalar complexity analyzer ###
+
+# (Helper function.) Find every case of ambiguity and
+# contradiction in the spectrum of a set.
+
+# Output: (1) the number of ambiguities and (2) their cases, in
+# the format of {generic interval: locations}; (3) the number of
+# contradictions and (4) their cases, likewise.
+
+def _complexity_cases (spectrum):
+    
+    chrom_matrix = spectrum.rows()
+    
+    # Use above matrix to find ambiguity and contradiction;
+    # record their generic intervals and locations.
+    cdt = spectrum.cdt
+    ambgt_case = {}
+    ambgt_count = 0
+    contd_case = {}
+    contd_count = 0
+    # In each pair of consecutive generic intervals:
+    for i in range(cdt-2):
+        pre = chrom_matrix[i]
+        pre_max = spectrum.high[i]
+        post = chrom_matrix[i+1]
+        post_min = spectrum.low[i+1]
+        
+        # The condition means the existence of complexity.
+        if pre_max >= post_min:
+            label = str(i+1)+'/'+str(i+2)
+            loc_con = []
+            loc_con_pre = []
+            loc_con_post = []
+            loc_amb = []
+            loc_amb_pre = []
+            loc_amb_post = []
+            # Check every case of the smaller generic interval.
+            # If it chromatically equals/is larger than the
+            # minimum of the larger generic interval, a case of
+            # ambiguity/complexity is recorded.
+            for m, n in enumerate(pre):
+                if n > post_min:
+                    loc_con_pre.append(m)
+                    contd_count += 1
+                elif n == post_min:
+                    loc_amb_pre.append(m)
+                    ambgt_count += 1
+            if len(loc_con_pre) > 0:
+                loc_con.append(loc_con_pre)
+            if len(loc_amb_pre) > 0:
+                loc_amb.append(loc_amb_pre)
+            # Check every case of the larger generic interval.
+            # If it chromatically equals/is smaller than the
+            # maximum of the smaller generic interval, a case of
+            # ambiguity/complexity is recorded.
+            for m, n in enumerate(post):
+                if n < pre_max:
+                    loc_con_post.append(m)
+                    contd_count += 1
+                elif n == pre_max:
+                    loc_amb_post.append(m)
+                    ambgt_count += 1
+            if len(loc_con_post) > 0:
+                loc_con.append(loc_con_post)
+            if len(loc_amb_post) > 0:
+                loc_amb.append(loc_amb_post)
+                
+            # Collect all recorded cases of complexity.
+            if len(loc_con) > 0:
+                contd_case.update({label:loc_con})
+            if len(loc_amb) > 0:
+                ambgt_case.update({label:loc_amb})
+        
+    return ambgt_count, ambgt_case, contd_count, contd_case
+
+
+# The result of detect_complexity in counts-only mode: the
+# normal form (or the input set) and the two counts. The cases
+# and their locations are found only when they are read, and
+# then kept. as_tuple() gives the output of detect_complexity.
+
+class ComplexityResult:
+
+    __slots__ = ('normal', 'ambiguity_count', 'contradiction_count',
+                 '_spectrum', '_cases')
+    
+    def __init__ (self, normal, ambiguity_count, contradiction_count,
+                  spectrum=None):
+        self.normal = normal
+        self.ambiguity_count = ambiguity_count
+        self.contradiction_count = contradiction_count
+        self._spectrum = spectrum
+        self._cases = None
+    
+    # Pickled without the spectrum and the cases, which are
+    # found again when read.
+    def __reduce__ (self):
+        return (ComplexityResult, (self.normal, self.ambiguity_count,
+                                   self.contradiction_count))
+    
+    def __repr__ (self):
+        return ('ComplexityResult(' + str(list(self.normal)) + ', '
+                + str(self.ambiguity_count) + ', '
+                + str(self.contradiction_count) + ')')
+    
+    @property
+    def ambiguity (self):
+        return self.ambiguity_count > 0
+    
+    @property
+    def contradiction (self):
+        return self.contradiction_count > 0
+    
+    def _complexity_cases (self):
+        if self._cases is None:
+            spectrum = self._spectrum
+            if spectrum is None:
+                spectrum = IntervalSpectrum(self.normal)
+            self._cases = _complexity_cases(spectrum)
+            self._spectrum = None
+        return self._cases
+    
+    # {generic interval: locations}, as detect_complexity gives
+    # them.
+    @property
+    def ambiguity_cases (self):
+        return self._complexity_cases()[1]
+    
+    @property
+    def contradiction_cases (self):
+        return self._complexity_cases()[3]
+    
+    def as_tuple (self):
+        return (self.normal, [self.ambiguity, self.ambiguity_count],
+                self.ambiguity_cases,
+                [self.contradiction, self.contradiction_count],
+                self.contradiction_cases)
+
+
+# Detect two types of scalar complexity:
+# (1) Ambiguity: two intervals with consecutive generic 
+# (diatonic) intervals have the same chromatic distance.
+# (2) Contradiction: between two pc pairs with consecutive
+# generic (diatonic) intervals, the diatonically smaller one 
+# has larger specific interval.
+
+# Input: (1) a pitch set in pitch-class or MIDI-pitch
+# numbers; it allows repetition of pitches or pitch classes.
+# (2) Whether it is transformed into normal form firstly.
+# (3) Whether only the counts are needed.
+
+# Output: (1) the normal form, if asked to transform; or 
+# the input set itself. (2) Whether ambiguity is 
+# observed; and the number of cases. (3) All cases of 
+# ambiguity, in the format of {generic interval: locations}.
+# (4) Whether contradiction is observed; and the number of 
+# cases. (5) All cases of contradiction, in the format of 
+# {generic interval: locations}. If "counts_only" is True, a
+# ComplexityResult is returned instead; in normal form, its
+# counts are read from the set-class table.
+
+@instrumented
+def detect_complexity (pitch_set, normalize, counts_only=False):
+    
+    # If normalize is True, transform the input set into 
+    # the normal form; if not, use the given set directly.
+    entry = None
+    if normalize == True:
+        entry = set_class_entry(pitch_set)
+        if entry is None:
+            normal = normal_prime_form(pitch_set)[0]
+        else:
+            normal = list(entry.normal)
+    else:
+        normal = pitch_set
+    
+    # The counts of a normal form are read from the table; no
+    # location is recorded until it is asked for.
+    if counts_only:
+        if entry is not None:
+            return ComplexityResult(
+                normal, entry.ambiguity, entry.contradiction)
+        spectrum = IntervalSpectrum(normal)
+        return ComplexityResult(
+            normal, *spectrum.complexity_counts(), spectrum)
+    
+    ambgt_count, ambgt_case, contd_count, contd_case = _complexity_cases(
+        IntervalSpectrum(normal))
+    
+    return normal, [ambgt_count > 0, ambgt_count], ambgt_case, [
+        contd_count > 0, contd_count], contd_case
+
+
+_complexity_table = None
+
+
+# Return the 4096 x 2 array of counts (ambiguities and
+# contradictions in normal form) by mask, building it on first
+# use.
+
+def _complexity_counts ():
+
+    global _complexity_table
+    if _complexity_table is None:
+        import numpy as np
+        
+        from .table import set_class_table
+        
+        counts = [(0, 0) if entry is None
+                  else (entry.ambiguity, entry.contradiction)
+                  for entry in set_class_table()]
+        _complexity_table = np.array(counts, dtype=np.int64)
+    
+    return _complexity_table
+
+
+# The counts of many sets at once, in normal form, as
+# detect_complexity(..., True, counts_only=True) gives them.
+
+# Input: (1) either a 1-D array of 12-bit masks, or a 2-D
+# array of pitch-class or MIDI-pitch numbers, one set per row,
+# padded with "fill"; (2) the padding value of a 2-D array.
+
+# Output: (1) the numbers of ambiguities and (2) the numbers of
+# contradictions, one per set; the empty set gives 0 and 0.
+
+@instrumented(size=len)
+def complexity_batch (masks, fill=-1):
+
+    from .batch import batch_masks
+    
+    counts = _complexity_counts()[batch_masks(masks, fill)]
+    
+    return counts[:, 0], counts[:, 1]
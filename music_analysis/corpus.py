@@ -0,0 +1,221 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# This module includes the parallel corpus analyzer.
+
+import os
+from collections import Counter, deque
+from itertools import islice
+
+from .distance import distance_vl_gm, ref_dict
+from .midi import read_midi, slice_notes
+from .pcset import pc_mask
+from .table import set_class_table
+
+
+                    ### Parallel corpus analyzer ###
+
+# Analyze a corpus on all cores: the work is cut into chunks
+# (or single MIDI files) and handed to a process pool, whose
+# workers build the set-class table once at startup. The input
+# is read a chunk at a time, and at most two chunks per worker
+# are in flight, so that the whole corpus is never held in
+# pending work.
+
+# Each set is summarized as (1) its normal form; (2) its prime
+# form; (3) its interval-class vector; (4) its number of
+# ambiguities and (5) contradictions (as counted by
+# detect_complexity in normal form); (6) its voice-leading and
+# (7) Euclidean distances to the reference (distance_vl_gm),
+# or None when the distance is undefined. An empty set is
+# summarized as None.
+
+# The aggregate counts are a dictionary of: 'sets', the number
+# of sets analyzed; 'set_classes', a Counter of prime forms
+# (as tuples); 'ambiguity' and 'contradiction', the totals of
+# both cases; and 'distance_vl', a Counter of voice-leading
+# distances.
+
+
+# Create empty aggregate counts.
+
+def _corpus_counts ():
+    
+    return {'sets': 0, 'set_classes': Counter(), 'ambiguity': 0,
+            'contradiction': 0, 'distance_vl': Counter()}
+
+
+# Add the aggregate counts "part" into "total".
+
+def _merge_corpus_counts (total, part):
+    
+    for key in ('sets', 'ambiguity', 'contradiction'):
+        total[key] += part[key]
+    total['set_classes'].update(part['set_classes'])
+    total['distance_vl'].update(part['distance_vl'])
+
+
+# Build the tables in each worker before any work arrives.
+
+def _init_corpus_worker ():
+    
+    set_class_table()
+
+
+# Summarize pitch sets; return the summaries and the counts.
+
+def _analyze_chunk (pitch_sets, perft_even, reference):
+    
+    table = set_class_table()
+    if perft_even:
+        ref_cdt = None
+    elif reference is None or isinstance(reference, str):
+        ref_cdt = len(ref_dict[reference][0])
+    else:
+        ref_cdt = len(reference)
+    
+    results = []
+    counts = _corpus_counts()
+    distances = {}
+    for pitch_set in pitch_sets:
+        mask = pc_mask(pitch_set)
+        entry = table[mask]
+        if entry is None:
+            results.append(None)
+            continue
+        
+        # distance_vl_gm only depends on the pc content.
+        cdt = len(entry.prime)
+        if mask not in distances:
+            if cdt > 1 and (perft_even or cdt == ref_cdt):
+                if perft_even or isinstance(reference, str):
+                    ref = reference
+                else:
+                    ref = list(reference)
+                distances[mask] = tuple(distance_vl_gm(
+                    list(entry.normal), perft_even, ref)[2:])
+            else:
+                distances[mask] = (None, None)
+        distance = distances[mask]
+        
+        results.append((list(entry.normal), list(entry.prime),
+                        list(entry.vector), entry.ambiguity,
+                        entry.contradiction) + distance)
+        counts['sets'] += 1
+        counts['set_classes'][entry.prime] += 1
+        counts['ambiguity'] += entry.ambiguity
+        counts['contradiction'] += entry.contradiction
+        if distance[0] is not None:
+            counts['distance_vl'][distance[0]] += 1
+    
+    return results, counts
+
+
+# Summarize the slices of one MIDI file, a chunk of slices at
+# a time; the summaries are None if not kept.
+
+def _analyze_midi_file (path, step, skip_channels, chunk_size,
+                        keep_results, perft_even, reference):
+    
+    slices = slice_notes(read_midi(path, skip_channels), step)
+    results = [] if keep_results else None
+    counts = _corpus_counts()
+    while True:
+        chunk = list(islice(slices, chunk_size))
+        if not chunk:
+            break
+        part_results, part_counts = _analyze_chunk(
+            [pitches for time, pitches in chunk], perft_even, reference)
+        _merge_corpus_counts(counts, part_counts)
+        if keep_results:
+            results.extend(zip([time for time, pitches in chunk],
+                               part_results))
+    
+    return results, counts
+
+
+# Cut a sequence of pitch sets into chunks, lazily.
+
+def _chunks (source, chunk_size):
+    
+    source = iter(source)
+    while True:
+        chunk = list(islice(source, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# Input: (1) either a directory of MIDI files (.mid, .midi),
+# analyzed slice by slice, or a sequence of pitch sets in
+# pitch-class or MIDI-pitch numbers (or PCSets). (2) Whether
+# distances are measured to the perfectly even scale; if not,
+# (3) the reference, as in distance_vl_gm. (4) The number of
+# worker processes; the number of CPUs by default. (5) The
+# number of pitch sets per chunk. (6) The slice length in
+# beats for MIDI files, as in slice_notes. (7) Whether the
+# per-set summaries are returned, or only the counts. (8) The
+# MIDI channels to ignore, as in read_midi.
+
+# Output: (1) the per-set summaries, in input order; for a
+# directory, a list of (path, [(time, summary), ...]) in
+# file-name order; None if not kept. (2) The aggregate counts.
+
+def analyze_corpus (source, perft_even=True, reference=None,
+                    workers=None, chunk_size=4096, step=None,
+                    keep_results=True, skip_channels=(9,)):
+    
+    from concurrent.futures import ProcessPoolExecutor
+    
+    # Check the reference before any worker needs it.
+    if not perft_even and (reference is None or isinstance(reference, str)):
+        if reference not in ref_dict:
+            raise ValueError('Can not find the reference: ' + str(reference))
+    
+    # Build the table before the pool is created, so that
+    # forked workers inherit it.
+    set_class_table()
+    if workers is None:
+        workers = os.cpu_count() or 1
+    
+    if isinstance(source, (str, os.PathLike)):
+        paths = sorted(
+            os.path.join(source, name) for name in os.listdir(source)
+            if name.lower().endswith(('.mid', '.midi')))
+        jobs = ((path, step, tuple(skip_channels), chunk_size, keep_results)
+                for path in paths)
+        task = _analyze_midi_file
+    else:
+        paths = None
+        jobs = ((chunk,) for chunk in _chunks(source, chunk_size))
+        task = _analyze_chunk
+    
+    results = [] if keep_results else None
+    counts = _corpus_counts()
+    with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_corpus_worker) as pool:
+        
+        # Keep at most two jobs per worker submitted; collect
+        # them in input order.
+        pending = deque()
+        jobs = iter(jobs)
+        index = 0
+        while True:
+            while len(pending) < 2*workers:
+                job = next(jobs, None)
+                if job is None:
+                    break
+                pending.append(pool.submit(task, *job, perft_even, reference))
+            if not pending:
+                break
+            part_results, part_counts = pending.popleft().result()
+            _merge_corpus_counts(counts, part_counts)
+            if keep_results:
+                if paths is None:
+                    results.extend(part_results)
+                else:
+                    results.append((paths[index], part_results))
+            index += 1
+    
+    return results, counts
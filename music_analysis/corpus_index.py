@@ -0,0 +1,167 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# This module includes the inclusion and Z-relation index.
+
+
+                ### Inclusion and Z-relation index ###
+
+# Index the slices of a corpus (any sequence of pitch sets) by
+# their 12-bit pc masks, so that inclusion and Z-relation
+# queries never re-run normal_prime_form over the corpus. The
+# index keeps (1) the mask of every slice, numbered from 0 in
+# the order added; (2) a posting list for every distinct mask:
+# the ascending numbers of the slices with that pc content; and
+# (3) for every set class found, the distinct masks belonging
+# to it. A query tests the (at most 4095) distinct masks with
+# bit operations, then merges their posting lists.
+
+# A slice contains a set class when some Tn or TnI form of it
+# is a subset of the slice. Two set classes are Z-related when
+# they share the interval-class vector but not the prime form.
+
+from array import array
+from itertools import chain
+
+from .pcset import pc_mask
+from .table import set_class_table
+
+# prime mask -> masks of all its Tn/TnI forms
+_set_class_forms = None
+# IC vector -> prime masks sharing it
+_vector_classes = None
+
+
+def _class_tables ():
+
+    global _set_class_forms, _vector_classes
+    if _set_class_forms is None:
+        forms = {0: [0]}
+        vectors = {}
+        for mask, entry in enumerate(set_class_table()):
+            if entry is None:
+                continue
+            prime = pc_mask(entry.prime)
+            forms.setdefault(prime, []).append(mask)
+            if prime == mask:
+                vectors.setdefault(entry.vector, []).append(prime)
+        _set_class_forms = forms
+        _vector_classes = vectors
+    
+    return _set_class_forms, _vector_classes
+
+
+def _prime_mask (mask):
+
+    entry = set_class_table()[mask]
+    if entry is None:
+        return 0
+    return pc_mask(entry.prime)
+
+
+def _prime_list (prime):
+
+    return [pc for pc in range(12) if prime >> pc & 1]
+
+
+class CorpusIndex:
+
+    # Input: a sequence of pitch sets in pitch-class or
+    # MIDI-pitch numbers (or PCSets); more may be added later.
+    def __init__ (self, pitch_sets=()):
+        self.masks = array('H')
+        self._postings = {}
+        self._classes = {}
+        for pitch_set in pitch_sets:
+            self.add(pitch_set)
+    
+    def __len__ (self):
+        return len(self.masks)
+    
+    # Add a slice; return its number.
+    def add (self, pitch_set):
+        mask = pc_mask(pitch_set)
+        number = len(self.masks)
+        self.masks.append(mask)
+        postings = self._postings.get(mask)
+        if postings is None:
+            postings = self._postings[mask] = array('L')
+            self._classes.setdefault(_prime_mask(mask), []).append(mask)
+        postings.append(number)
+        return number
+    
+    def _merge (self, masks):
+        return sorted(chain.from_iterable(
+            self._postings[mask] for mask in masks))
+    
+    # The slices with exactly the pc content of a given set.
+    def slices (self, pitch_set):
+        return list(self._postings.get(pc_mask(pitch_set), []))
+    
+    # The slices of the same set class as a given set.
+    def slices_of_class (self, pitch_set):
+        prime = _prime_mask(pc_mask(pitch_set))
+        return self._merge(self._classes.get(prime, []))
+    
+    # The slices containing the set class of a given set under
+    # any Tn or TnI.
+    def containing (self, pitch_set):
+        forms = _class_tables()[0][_prime_mask(pc_mask(pitch_set))]
+        return self._merge(
+            mask for mask in self._postings
+            if any(form & ~mask == 0 for form in forms))
+    
+    # The slices whose pc content includes a given set (all
+    # its pitch classes); if "proper", strictly.
+    def supersets (self, pitch_set, proper=False):
+        query = pc_mask(pitch_set)
+        return self._merge(
+            mask for mask in self._postings
+            if query & ~mask == 0 and not (proper and mask == query))
+    
+    # The slices whose pc content is included in a given set;
+    # if "proper", strictly.
+    def subsets (self, pitch_set, proper=False):
+        query = pc_mask(pitch_set)
+        return self._merge(
+            mask for mask in self._postings
+            if mask & ~query == 0 and not (proper and mask == query))
+    
+    # Output: {prime form (as a tuple): number of slices}, in
+    # order of first appearance.
+    def set_classes (self):
+        return {tuple(_prime_list(prime)):
+                sum(len(self._postings[mask]) for mask in masks)
+                for prime, masks in self._classes.items()}
+    
+    # The set classes Z-related to a given set: in the corpus
+    # only, or among all set classes if "in_corpus" is False.
+    
+    # Output: a list of prime forms.
+    def z_related (self, pitch_set, in_corpus=True):
+        vectors = _class_tables()[1]
+        entry = set_class_table()[pc_mask(pitch_set)]
+        if entry is None:
+            return []
+        prime = pc_mask(entry.prime)
+        return [_prime_list(other) for other in vectors[entry.vector]
+                if other != prime
+                and (not in_corpus or other in self._classes)]
+    
+    # Output: the groups of Z-related set classes found in the
+    # corpus (at least two per group), each a list of prime
+    # forms, ordered by cardinality and prime form.
+    def z_groups (self):
+        vectors = _class_tables()[1]
+        groups = {}
+        for prime in self._classes:
+            if prime == 0:
+                continue
+            vector = set_class_table()[prime].vector
+            if len(vectors[vector]) > 1:
+                groups.setdefault(vector, []).append(prime)
+        return sorted(
+            [sorted(_prime_list(prime) for prime in group)
+             for group in groups.values() if len(group) > 1],
+            key=lambda group: (len(group[0]), group))
@@ -0,0 +1,239 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# This module includes the DFT calculator.
+
+
+                    ### DFT calculator ###
+
+# The k-th Fourier coefficient of a pc set A is
+#     f_k(A) = sum of exp(-2*pi*i*k*p/12) over the members p,
+# for k = 0 to 6 (f_k for k > 6 is the conjugate of f_(12-k)).
+# Its magnitude |f_k| is invariant under transposition and
+# inversion; its phase turns by -2*pi*k*t/12 under T(t).
+
+# Evenness: |f_d| of a d-note set is largest for the maximally
+# even sets, reaching d for the perfectly even ones, so it
+# grades the evenness that maximal_even only tests.
+
+# Similarity: two sets of equal cardinality are compared by
+# the cosine of their magnitude vectors (k = 1 to 6). Moving a
+# voice by x semitones changes f_k by at most (pi*k/6)*|x|, so
+# the voice-leading distance between two sets of equal
+# cardinality, under any transposition and any one-to-one
+# voice leading, is at least
+#     max over k of 6/(pi*k) * | |f_k(A)| - |f_k(B)| |,
+# and the Euclidean distance at least that divided by the square
+# root of the cardinality. These bounds discard candidates
+# before distance_vl_gm or voice_leading_distances is run.
+
+# The coefficients of all 4096 masks are computed once, with
+# NumPy, on first use; dft() itself needs no NumPy.
+
+import cmath
+import math
+
+from .instrument import instrumented
+from .pcset import pc_mask
+from .table import set_class_table
+
+_dft_table = None
+_set_class_dft_table = None
+
+
+# Return the 4096 x 7 array of coefficients, building it on
+# first use.
+
+def _dft_coefficients ():
+
+    global _dft_table
+    if _dft_table is None:
+        import numpy as np
+        
+        masks = np.arange(4096)
+        bits = ((masks[:, None] >> np.arange(12)) & 1).astype(np.float64)
+        roots = np.exp(-2j*np.pi*np.outer(np.arange(12), np.arange(7))/12)
+        _dft_table = bits @ roots
+    
+    return _dft_table
+
+
+# Calculate the DFT of a given set.
+
+# Input: a pitch set in pitch-class or MIDI-pitch numbers (or
+# a PCSet); it allows repetition of pitches or pitch classes.
+
+# Output: (1) the magnitudes and (2) the phases (in radians,
+# above -pi and up to pi; 0 where the magnitude is 0) of f_0 to
+# f_6.
+
+def dft (pitch_set):
+
+    mask = pc_mask(pitch_set)
+    magnitudes = []
+    phases = []
+    for k in range(7):
+        coefficient = sum(cmath.exp(-2j*math.pi*k*pc/12)
+                          for pc in range(12) if mask >> pc & 1)
+        magnitude = abs(coefficient)
+        if magnitude < 1e-9:
+            magnitude = 0.0
+            phase = 0.0
+        else:
+            phase = cmath.phase(coefficient)
+            if phase < 1e-9 - math.pi:
+                phase = math.pi
+        magnitudes.append(magnitude)
+        phases.append(phase)
+    
+    return magnitudes, phases
+
+
+# The DFT of many sets at once.
+
+# Input: (1) either a 1-D array of 12-bit masks, or a 2-D
+# array of pitch-class or MIDI-pitch numbers, one set per row,
+# padded with "fill"; (2) the padding value of a 2-D array.
+
+# Output: (1) the N x 7 magnitudes and (2) the N x 7 phases.
+
+@instrumented(size=len)
+def dft_batch (masks, fill=-1):
+
+    import numpy as np
+    
+    from .batch import batch_masks
+    
+    coefficients = _dft_coefficients()[batch_masks(masks, fill)]
+    magnitudes = np.abs(coefficients)
+    phases = np.angle(coefficients)
+    zero = magnitudes < 1e-9
+    magnitudes[zero] = 0.0
+    phases[zero] = 0.0
+    phases[phases < 1e-9 - np.pi] = np.pi
+    
+    return magnitudes, phases
+
+
+def _evenness_index (cdt):
+
+    return cdt if cdt <= 6 else 12-cdt
+
+
+# The evenness of a d-note set: |f_d|, or |f_d|/d (from 0 to 1)
+# if "normalize" is True. The empty set gives 0.
+
+def dft_evenness (pitch_set, normalize=False):
+
+    mask = pc_mask(pitch_set)
+    cdt = bin(mask).count('1')
+    if cdt == 0:
+        return 0.0
+    magnitude = dft(pitch_set)[0][_evenness_index(cdt)]
+    if normalize:
+        return magnitude/cdt
+    return magnitude
+
+
+# The evenness of many sets; input as for dft_batch.
+
+@instrumented(size=len)
+def dft_evenness_batch (masks, fill=-1, normalize=False):
+
+    import numpy as np
+    
+    from .batch import batch_masks
+    
+    masks = np.asarray(batch_masks(masks, fill), dtype=np.int64)
+    cdt = ((masks[:, None] >> np.arange(12)) & 1).sum(axis=1)
+    index = np.where(cdt <= 6, cdt, 12-cdt)
+    values = np.abs(_dft_coefficients()[masks, index])
+    if normalize:
+        values = np.divide(values, cdt, out=np.zeros(len(masks)),
+                           where=cdt > 0)
+    
+    return values
+
+
+# Cosine similarity of the magnitude vectors (f_1 to f_6) of a
+# tested set and many sets; input as for dft_batch. Sets whose
+# magnitudes are all 0 (the empty and the full set) give 0.
+
+@instrumented(size=len)
+def dft_similarity (pitch_set, masks, fill=-1):
+
+    import numpy as np
+    
+    from .batch import batch_masks
+    
+    table = np.abs(_dft_coefficients()[:, 1:])
+    query = table[pc_mask(pitch_set)]
+    others = table[batch_masks(masks, fill)]
+    norms = np.linalg.norm(others, axis=1) * np.linalg.norm(query)
+    
+    return np.divide(others @ query, norms, out=np.zeros(len(others)),
+                     where=norms > 1e-9)
+
+
+# Lower bounds of the distances from a tested set to many
+# sets, as described above; input as for dft_batch. Sets of
+# another cardinality get infinity.
+
+# Input: (1) the tested set. (2) The other sets. (3) 'vl' or
+# 'euclidean'. (4) The padding value of a 2-D array.
+
+# Output: an array of lower bounds.
+
+@instrumented(size=len)
+def dft_lower_bounds (pitch_set, masks, metric='vl', fill=-1):
+
+    import numpy as np
+    
+    from .batch import batch_masks
+    
+    if metric not in ('vl', 'euclidean'):
+        raise ValueError("metric must be 'vl' or 'euclidean'")
+    table = np.abs(_dft_coefficients())
+    mask = pc_mask(pitch_set)
+    others = np.asarray(batch_masks(masks, fill), dtype=np.int64)
+    gaps = np.abs(table[others, 1:] - table[mask, 1:])
+    bounds = (gaps * (6/(np.pi*np.arange(1, 7)))).max(axis=1)
+    cdt = bin(mask).count('1')
+    if metric == 'euclidean' and cdt > 0:
+        bounds = bounds / cdt**0.5
+    bounds[table[others, 0].round() != cdt] = np.inf
+    
+    return bounds
+
+
+# The indices of the sets whose distance to a tested set may
+# not exceed "max_distance"; the others are certainly farther.
+
+def dft_prefilter (pitch_set, masks, max_distance, metric='vl', fill=-1):
+
+    import numpy as np
+    
+    bounds = dft_lower_bounds(pitch_set, masks, metric, fill)
+    
+    return np.flatnonzero(bounds <= max_distance + 1e-9)
+
+
+# The DFT of every set class, built on first use and shared by
+# all callers.
+
+# Output: {prime form (as a tuple): (magnitudes, phases) of
+# f_0 to f_6}, for every set class.
+
+def set_class_dft_table ():
+
+    global _set_class_dft_table
+    if _set_class_dft_table is None:
+        table = {}
+        for entry in set_class_table():
+            if entry is not None and entry.prime not in table:
+                magnitudes, phases = dft(entry.prime)
+                table[entry.prime] = (tuple(magnitudes), tuple(phases))
+        _set_class_dft_table = table
+    
+    return _set_class_dft_table
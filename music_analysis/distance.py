@@ -0,0 +1,230 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# This module includes the voice-leading- and Euclidean-distance calculator.
+
+from . import instrument
+from .instrument import instrumented
+from .pcset import PCSet, _python_numbers
+
+
+            ### Voice-leading- and Euclidean-distance calculator ###
+
+# (May be a helper function.) Find out the optimal ascending
+# ordering of a given set, which yields the smallest difference
+# (voice-leading distance) between it and the referential set.
+# When "eucld" is True, the function may also provide the 
+# Euclidean distance between the optimal choice and the reference.
+
+# Input: (1) the tested pc set; a sorted copy of it is used.
+# (2) The referential set, which will not be sorted. (3) Whether
+# the Euclidean distance is calculated. Neither set is changed.
+
+# Output: (1) the optimal order. (2) Its voice-leading 
+# distance to the reference. (3) Its Euclidean distance to the
+# reference; if "eucld" is False, None is returned.
+
+@instrumented
+def optimal_order (lst_ps, lst_ref, eucld):
+    
+    lst_ps = sorted(_python_numbers(lst_ps))
+    lst_ref = _python_numbers(lst_ref)
+    cdt = len(lst_ps)
+    order_list = []
+    order_vl_dist = []
+    
+    # Check all ascending orderings to find the one yielding
+    # smallest voice-leading distance to the reference.
+    started = instrument.clock() if instrument.enabled else None
+    count = 0
+    while count < cdt:
+        reorder = []
+        reorder.extend(lst_ps[-count:])
+        reorder.extend(lst_ps[:-count])
+        vl_distance = 0
+        for i in range(cdt):
+            j = reorder[i]
+            k = lst_ref[i]
+            gap = min([(k-j)%12,(j-k)%12])
+            vl_distance += gap
+        order_list.append(reorder)
+        order_vl_dist.append(vl_distance)
+        count += 1
+    optimal_dist = min(order_vl_dist)
+    optimal_index = order_vl_dist.index(optimal_dist)
+    optimal_order = order_list[optimal_index]
+    optimal_dist = round(optimal_dist, 3)
+    if started is not None:
+        instrument.record_phase('optimal_order.rotations', started, cdt)
+    
+    # If asked, calculate the Euclidean distance between the
+    # selected optimal ordering and the reference.
+    if eucld == True:
+        eucld_count = 0
+        for i in range(cdt):
+            j = optimal_order[i]
+            k = lst_ref[i]
+            gap = min([(k-j)%12,(j-k)%12])
+            eucld_count += gap**2
+        optimal_eucld = round(eucld_count**0.5, 3)
+    else:
+        optimal_eucld = None
+    
+    return optimal_order, optimal_dist, optimal_eucld
+
+
+
+# The referential scales available to distance_vl_gm by name.
+# Each value includes the pc set and its sum class.
+
+ref_dict = {
+    'pentatonic':[[0,2,5,7,10],0],
+    'hexatonic':[[1,2,5,6,9,10],9],
+    'mystic-6':[[0,3,4,6,8,10],7],
+    'diatonic':[[0,2,3,5,7,9,10],0],
+    'minor_har':[[0,2,3,5,7,8,11],0],
+    'mystic-7':[[0,2,4,5,7,8,10],0],
+    'Shost_b4':[[0,2,4,5,6,9,10],0],
+    'Shost_b24':[[0,1,4,5,7,9,10],0],
+    'Shost_b245':[[0,2,4,5,7,8,10],0],
+    'Shost_b248':[[0,2,3,4,5,7,8,11],4],
+    'Shost_b2458':[[1,2,3,4,6,7,9,11],7],
+    'octatonic':[[0,1,3,4,6,7,9,10],4],
+    'enneatonic':[[0,1,3,4,5,7,8,9,11],0],
+    'Shost_mode':[[0,1,2,4,5,7,8,9,11],11]
+    }
+
+
+# Calculate two types of distance between a tested structure
+# and a referential structure. The tested "pitch_set" allows
+# transpositional and permutational transformation, but not
+# inversional transformation. Thus, the function compares the
+# two abstract "structures," rather than specific pc content.
+# The two distance types are (1) Voice-leading distance, which
+# means how many semitones it needs to move from one set to
+# another; and (2) Euclidean distance, which means the geometric
+# distance between two points representing the two sets in 
+# a space in dimensions of the cardinality of the two sets.
+
+# Input: (1) a pitch set in pitch-class or MIDI-pitch
+# numbers; it allows repetition of pitches or pitc classes.
+# (2) Whether a perfectly even scale is used as the
+# referential structure; it may lead to microtonal positions;
+# if this variable is set to True, 'reference' should be None.
+# (3) If perft_even is set to False, a scalar structure
+# is assigned as the reference, either a manually created
+# sequence (list, tuple, array, PCSet, ...) or a string calling
+# a reference in "ref_dict" dictionary. Neither the pitch set
+# nor the reference is changed.
+
+# Output: (1) The voice-leading distance between the tested
+# structure and the reference. (2) The Euclidean distance
+# between the two structure.
+
+@instrumented
+def distance_vl_gm (pitch_set, perft_even, reference):
+    
+    # Extract pitch classes, eliminate redundancy,
+    # and arrange the result in ascending order.
+    pc_set = PCSet(pitch_set).to_list()
+    cdt = len(pc_set)
+    if cdt == 1:
+        print('Trivial case: single pitch class.')
+        return None
+    
+    # Create the referential scale. If perft_even is True,
+    # the octave is devided equally (and microtonally, when
+    # necessary) according to the cardinality of the pc set.
+    if perft_even == True:
+        unit = 12/cdt
+        ref = []
+        for i in range(cdt):
+            ref.append(round(unit*i, 4))
+        if cdt % 2 == 0:
+            sum_class_ref = 6
+        else:
+            sum_class_ref = 0
+    # If perft_even is False, the 'reference' variable is
+    # checked. If it's a string, corresponding value in ref_dict
+    # is selected as the reference; otherwise, a sorted copy of
+    # it is taken as the reference.
+    else:
+        if reference is None or isinstance(reference, str):
+            ref_info = ref_dict.get(reference)
+            if ref_info is None:
+                print('Can not find the reference')
+                return None
+            ref = list(ref_info[0])
+            sum_class_ref = ref_info[1]
+        else:
+            ref = sorted(_python_numbers(reference))
+            sum_class_ref = sum(ref)%12
+        if len(ref) != cdt:
+            print('Cardinality Error')
+            return None
+        
+    # Generate all possible sum-class differences between
+    # set transpositions and the referential structure.
+    started = instrument.clock() if instrument.enabled else None
+    distance_list = []
+    sum_class = sum(pc_set) % 12
+    distance_list.append(
+        abs(sum_class_ref - sum_class))
+    new_sum = (sum_class + cdt) % 12
+    while new_sum != sum_class:
+        distance_list.append(
+            abs(sum_class_ref - new_sum))
+        new_sum = (new_sum + cdt) % 12
+    
+    # Then, generate the set transpositions whose sum classes
+    # are closest to the sum class of the referential scale.
+    # If the smallest difference is zero, two more choices
+    # are generated, "surrounding" the first one in terms of 
+    # sum class; if not, two are created, surrounding the
+    # sum class of the reference.
+    min_index = []
+    distance_min = min(distance_list)
+    pick = distance_list.index(distance_min)
+    min_index.append(pick)
+    if distance_min == 0:
+        count = 2
+    else:
+        count = 1
+    while count > 0:
+        distance_list[pick] = 12
+        distance_min = min(distance_list)
+        pick = distance_list.index(distance_min)
+        min_index.append(pick)
+        count -= 1
+    set_list = []
+    for i in min_index: 
+        set_optimal = [(
+            x + i) % 12 for x in pc_set]
+        set_optimal.sort()
+        set_list.append(set_optimal)
+    if started is not None:
+        instrument.record_phase(
+            'distance_vl_gm.transpositions', started, cdt)
+    
+    # Find among above sets the one featuring smallest 
+    # possible voice-leading distance to the reference;
+    # Return the voice-leading and Euclidean distances.
+    distance_vl = []
+    distance_gm = []
+    order = optimal_order(set_list[0], ref, False)
+    for i in range(1, len(set_list)):
+        order_new = optimal_order(set_list[i], ref, False)
+        if order_new[1] < order[1]:
+            order = order_new
+    pc_set = order[0]
+    distance_vl = round(order[1], 3)      
+    count_gm = 0
+    for i in range(cdt):
+        j = pc_set[i]
+        k = ref[i]
+        gap = min([(k-j)%12,(j-k)%12])
+        count_gm += gap**2
+    distance_gm = round(count_gm**0.5, 3)
+    
+    return pc_set, ref, distance_vl, distance_gm
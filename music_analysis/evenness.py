@@ -0,0 +1,190 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# This module includes the maximal-evenness analyzer.
+
+from math import gcd
+
+from .instrument import instrumented
+from .pcset import _python_numbers
+from .set_class import normal_prime_form
+from .spectrum import IntervalSpectrum
+from .table import set_class_entry
+
+
+                    ### Maximal-evenness analyzer ###
+
+# This is a helper function to calculate and store all
+# intervals among members of the given set.
+
+# Input: a pitch-class set, expected to be an ascending 
+# normal or prime form. The function does not change the
+# input in anyway (reordering, normal/prime forms, etc.).
+
+# Output: the matrix indicating the intervals between 
+# all pairs of different set members.
+
+@instrumented
+def interval_matrix (pitch_set):
+    
+    # The intervals between all pairs of different set
+    # members, calculated in semitones, are read from the
+    # interval spectrum. The results are organized according
+    # to generic intervals; in each low-level list, the
+    # indices indicate starting set members.
+    return IntervalSpectrum(pitch_set).rows()
+
+
+
+# Use Clough-Douthett theorem to check if the given set is
+# maximally even in the total chromatic. The theorem states
+# that a pc set is maximally even if and only if every generic
+# interval is realized either in a single specific interval
+# or in two specific intervals in consecutive sizes.
+# Moreover, it checks if the set fulfills Myhill's property,
+# which means that each diatonic interval is realized in two
+# specific intervals in consecutive sizes.
+
+# Input: a pitch set in pitch-class or MIDI-pitch
+# numbers; it allows repetition of pitches or pitch classes.
+
+# Output: Two boolean results indicating whether the input set
+# is maximally even and fulfills Myhill's property.
+
+@instrumented
+def maximal_even (pitch_set):
+    
+    # Look up both properties in the precomputed
+    # set-class table.
+    entry = set_class_entry(pitch_set)
+    if entry is None:
+        return _maximal_even(normal_prime_form(pitch_set)[1])
+    
+    return entry.maximal_even, entry.myhill
+
+
+# The test behind maximal_even, used to build the
+# set-class table. Input: a prime form. Output as above.
+
+def _maximal_even (prime):
+    
+    # Test the evenness using Clough and Douthett's theorem
+    # on the smallest and largest width of every generic
+    # interval; simultaneously, check the Myhill's property.
+    return IntervalSpectrum(prime).maximal_even()
+
+
+
+            ### Maximal evenness in any chromatic universe ###
+
+# Clough and Douthett's J-function gives the maximally even
+# sets of d pitch classes in a universe of c pitch classes
+# (c-tone equal temperament) in closed form:
+#     J(k) = floor((c*k + m)/d),  k = 0, 1, ..., d-1,
+# every m from 0 to c-1 yielding one of them, and every one
+# of them being yielded so. Started from any of its members
+# and transposed to 0, a maximally even set is again such a
+# J-set with some m between 0 and d-1. Hence an ascending set
+# p(0) < ... < p(d-1) is maximally even if and only if the
+# values d*(p(k)-p(0)) - c*k all lie within a range smaller
+# than d, which takes one pass over the set. A maximally even
+# set has Myhill's property exactly when c and d are coprime
+# (and d > 1), since the generic interval k then always comes
+# in the two sizes floor(c*k/d) and ceil(c*k/d).
+
+# Generate a maximally even set with the J-function.
+
+# Input: (1) the size c of the universe. (2) The cardinality d,
+# from 1 to c. (3) The parameter m, from 0 to c-1.
+
+# Output: the set, in ascending order.
+
+def j_function (c, d, m=0):
+
+    if not 1 <= d <= c:
+        raise ValueError('The cardinality must lie between 1 and c')
+    
+    return [(c*k + m)//d for k in range(d)]
+
+
+# Generate all the maximally even sets of a given (c, d).
+
+# Output: the c/gcd(c, d) distinct sets, each in ascending
+# order, ordered by their parameter m.
+
+def maximal_even_sets (c, d):
+
+    sets = []
+    seen = set()
+    for m in range(c):
+        me_set = j_function(c, d, m)
+        if tuple(me_set) not in seen:
+            seen.add(tuple(me_set))
+            sets.append(me_set)
+    
+    return sets
+
+
+# Check if a given set is maximally even in a universe of c
+# pitch classes, and if it fulfills Myhill's property; for
+# c = 12, the results equal those of maximal_even.
+
+# Input: (1) a set of pitch numbers in c-tone equal
+# temperament; it allows repetition of pitches or pitch
+# classes. An ascending set of distinct pitch classes is
+# checked in linear time; any other set is reduced and sorted
+# first. (2) The size c of the universe.
+
+# Output: Two boolean results indicating whether the input set
+# is maximally even and fulfills Myhill's property.
+
+def maximal_even_edo (pitch_set, c=12):
+
+    pc_set = [pitch%c for pitch in _python_numbers(pitch_set)]
+    for i in range(1, len(pc_set)):
+        if pc_set[i] <= pc_set[i-1]:
+            pc_set = sorted(set(pc_set))
+            break
+    d = len(pc_set)
+    if d == 0:
+        return False, False
+    
+    # The spread of d*(p(k)-p(0)) - c*k must stay below d.
+    first = pc_set[0]
+    low = high = 0
+    for k in range(1, d):
+        value = d*(pc_set[k]-first) - c*k
+        if value < low:
+            low = value
+        elif value > high:
+            high = value
+    maximal_even = high - low < d
+    
+    return maximal_even, maximal_even and (d == 1 or gcd(c, d) == 1)
+
+
+# Enumerate the maximally even sets of many universes.
+
+# Input: (1) the sizes c of the universes, e.g. range(5, 54).
+# (2) The cardinalities d; all from 1 to c if None (those
+# larger than c are skipped). (3) Whether every set is given,
+# or only one per (c, d): the J-set with m = 0, which is the
+# prime form for c = 12.
+
+# Output: a generator of (c, d, set), by c, then d.
+
+def enumerate_maximal_even (universes, cardinalities=None,
+                            transpositions=False):
+    
+    for c in universes:
+        if cardinalities is None:
+            sizes = range(1, c+1)
+        else:
+            sizes = [d for d in cardinalities if 1 <= d <= c]
+        for d in sizes:
+            if transpositions:
+                for me_set in maximal_even_sets(c, d):
+                    yield c, d, me_set
+            else:
+                yield c, d, j_function(c, d)
@@ -0,0 +1,207 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# This module includes the opt-in instrumentation.
+
+
+                    ### Opt-in instrumentation ###
+
+# Record, for every public analysis function, the number of
+# calls, the total, smallest and largest latency, latency
+# percentiles and a histogram of input cardinalities (of the
+# input sizes, for batch functions). Internal phases, such as
+# the set-class table lookup of normal_prime_form or the
+# rotation search of optimal_order, are recorded the same way
+# under names like 'normal_prime_form.lookup'.
+
+# Recording is off by default. While it is off, an instrumented
+# function costs one extra call and one test of a flag. It is
+# switched on with enable_instrumentation() or by setting the
+# environment variable MUSIC_ANALYSIS_INSTRUMENT=1 before the
+# package is imported. Times include nested calls: the time of
+# distance_vl_gm includes that of the optimal_order calls made
+# by it. Each process keeps its own records.
+
+# Latencies are kept in a histogram of logarithmic buckets,
+# eight per doubling, so the percentiles are exact to about 9%
+# while the memory used stays constant.
+
+# Usage:
+#     enable_instrumentation()
+#     ... analysis ...
+#     instrumentation_json(indent=1)
+
+import functools
+import json
+import math
+import os
+import threading
+from time import perf_counter as clock
+
+from .pcset import pc_mask
+
+enabled = os.environ.get('MUSIC_ANALYSIS_INSTRUMENT', '') not in (
+    '', '0')
+
+_BUCKETS_PER_DOUBLING = 8
+
+# name -> [calls, total seconds, min, max, {latency bucket:
+# count}, {cardinality: count}]
+_records = {}
+_lock = threading.Lock()
+
+
+def enable_instrumentation ():
+
+    global enabled
+    enabled = True
+
+
+def disable_instrumentation ():
+
+    global enabled
+    enabled = False
+
+
+def reset_instrumentation ():
+
+    with _lock:
+        _records.clear()
+
+
+# Add one measurement; "size" may be None. The measurement goes
+# into the records of this module, or into "records", a dict of
+# the caller's own that latency_summary reads.
+
+def record (name, seconds, size=None, records=None):
+
+    if records is None:
+        records = _records
+    if seconds > 0:
+        bucket = int(math.log2(seconds*1e9)*_BUCKETS_PER_DOUBLING)
+    else:
+        bucket = 0
+    with _lock:
+        entry = records.get(name)
+        if entry is None:
+            entry = records[name] = [0, 0.0, seconds, seconds, {}, {}]
+        entry[0] += 1
+        entry[1] += seconds
+        if seconds < entry[2]:
+            entry[2] = seconds
+        if seconds > entry[3]:
+            entry[3] = seconds
+        entry[4][bucket] = entry[4].get(bucket, 0) + 1
+        if size is not None:
+            entry[5][size] = entry[5].get(size, 0) + 1
+
+
+# Record an internal phase begun at "started", a value of
+# clock() taken while recording was on (None otherwise):
+#     started = clock() if instrument.enabled else None
+#     ...
+#     if started is not None:
+#         instrument.record_phase('function.phase', started)
+
+def record_phase (name, started, size=None):
+
+    record(name, clock()-started, size)
+
+
+def _cardinality (pitch_set):
+
+    try:
+        return bin(pc_mask(pitch_set)).count('1')
+    except (TypeError, ValueError):
+        return None
+
+
+# Make a function record its calls under its own name. "size"
+# gives the size of the first argument: its cardinality by
+# default.
+
+def instrumented (function=None, size=_cardinality):
+
+    if function is None:
+        return functools.partial(instrumented, size=size)
+    name = function.__name__
+    
+    @functools.wraps(function)
+    def wrapper (*args, **kwargs):
+        if not enabled:
+            return function(*args, **kwargs)
+        input_size = size(args[0]) if args else None
+        started = clock()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            record(name, clock()-started, input_size)
+    
+    return wrapper
+
+
+def _percentile (buckets, calls, fraction):
+
+    rank = fraction*calls
+    seen = 0
+    for bucket in sorted(buckets):
+        seen += buckets[bucket]
+        if seen >= rank:
+            return 2**((bucket+0.5)/_BUCKETS_PER_DOUBLING)/1e9
+    return None
+
+
+# Output: {name: record} for the given records (those of this
+# module by default), where each record holds the calls, the
+# total, mean, smallest and largest latency and the 50th, 90th
+# and 99th percentiles in seconds, and the cardinality
+# histogram {cardinality: calls}.
+
+def latency_summary (records=None):
+
+    if records is None:
+        records = _records
+    summaries = {}
+    with _lock:
+        for name, entry in records.items():
+            calls, total, smallest, largest, buckets, sizes = entry
+            summaries[name] = {
+                'calls': calls,
+                'total_seconds': total,
+                'mean_seconds': total/calls,
+                'min_seconds': smallest,
+                'max_seconds': largest,
+                'p50_seconds': min(max(_percentile(buckets, calls, 0.5),
+                                       smallest), largest),
+                'p90_seconds': min(max(_percentile(buckets, calls, 0.9),
+                                       smallest), largest),
+                'p99_seconds': min(max(_percentile(buckets, calls, 0.99),
+                                       smallest), largest),
+                'cardinality': dict(sorted(sizes.items())),
+                }
+    
+    return summaries
+
+
+# Output: {'enabled': ..., 'functions': {name: {...}},
+# 'phases': {name: {...}}}, with the records as above.
+
+def instrumentation_snapshot ():
+
+    functions = {}
+    phases = {}
+    for name, summary in latency_summary().items():
+        if '.' in name:
+            phases[name] = summary
+        else:
+            functions[name] = summary
+    
+    return {'enabled': enabled, 'functions': functions, 'phases': phases}
+
+
+# The snapshot as JSON; histogram keys become strings.
+
+def instrumentation_json (indent=None):
+
+    return json.dumps(instrumentation_snapshot(), indent=indent)
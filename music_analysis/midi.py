@@ -0,0 +1,247 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# This module includes the streaming MIDI reader, slicer and slice analyzer.
+
+import heapq
+import struct
+
+from .complexity import detect_complexity
+from .pcset import PCSet
+from .set_class import ic_vector, normal_prime_form
+
+
+            ### Streaming MIDI reader, slicer and slice analyzer ###
+
+# A pipeline of three generators turning a standard MIDI file
+# into set-class analyses slice by slice. Every stage holds
+# only the notes currently sounding, so memory use does not
+# grow with the length of the file.
+
+# read_midi -> note events: (time in beats, MIDI pitch, True
+#     for a note-on or False for a note-off).
+# slice_notes -> slices: (time in beats, sounding pitches).
+# analyze_slices -> (time, pitches, normal and prime forms,
+#     IC vector, result of detect_complexity).
+
+
+# Read one byte from a binary file; a file ending too early is
+# reported with its name and the offset.
+
+def _read_byte (midi_file):
+    
+    data = midi_file.read(1)
+    if not data:
+        raise ValueError('Truncated MIDI file: ' + str(midi_file.name)
+                         + ' ends at offset ' + str(midi_file.tell()))
+    return data[0]
+
+
+# Read a variable-length quantity from a binary file.
+
+def _read_varlen (midi_file):
+    
+    value = 0
+    while True:
+        byte = _read_byte(midi_file)
+        value = (value << 7) | (byte & 0x7F)
+        if byte < 0x80:
+            return value
+
+
+# Yield the note events of one track as (tick, pitch, on),
+# reading the track from "start" to "end" of the file.
+
+def _read_track (path, start, end, skip_channels):
+    
+    with open(path, 'rb') as midi_file:
+        midi_file.seek(start)
+        tick = 0
+        status = 0
+        while midi_file.tell() < end:
+            tick += _read_varlen(midi_file)
+            byte = _read_byte(midi_file)
+            
+            # Meta and system-exclusive events carry their
+            # length; skip their data.
+            if byte == 0xFF:
+                _read_byte(midi_file)
+                midi_file.seek(_read_varlen(midi_file), 1)
+                continue
+            if byte in (0xF0, 0xF7):
+                midi_file.seek(_read_varlen(midi_file), 1)
+                continue
+            
+            # Channel events; a data byte means running status.
+            if byte & 0x80:
+                status = byte
+                data = _read_byte(midi_file)
+            else:
+                data = byte
+            kind = status & 0xF0
+            if kind in (0xC0, 0xD0):
+                continue
+            value = _read_byte(midi_file)
+            if kind not in (0x80, 0x90):
+                continue
+            if status & 0x0F in skip_channels:
+                continue
+            yield tick, data, kind == 0x90 and value > 0
+
+
+# Reorder the events of one track so that, at every tick, its
+# note-offs come before its note-ons (each in the order read);
+# the tracks are then sorted as the merge below expects.
+
+def _tick_order (events):
+    
+    tick = None
+    offs = []
+    ons = []
+    for event in events:
+        if event[0] != tick:
+            yield from offs
+            yield from ons
+            tick = event[0]
+            offs = []
+            ons = []
+        if event[2]:
+            ons.append(event)
+        else:
+            offs.append(event)
+    yield from offs
+    yield from ons
+
+
+# Read the note events of a MIDI file in time order, merging
+# all tracks. Channel 10 (index 9) is skipped by default,
+# since its note numbers stand for percussion instruments.
+
+# Input: (1) the path of a standard MIDI file. (2) The
+# channels (0-15) to ignore.
+
+# Output: a generator of (time, pitch, on), time in beats.
+
+def read_midi (path, skip_channels=(9,)):
+    
+    # Locate the tracks; only their offsets are kept.
+    tracks = []
+    with open(path, 'rb') as midi_file:
+        header = midi_file.read(8)
+        if len(header) < 8 or header[:4] != b'MThd':
+            raise ValueError('Not a standard MIDI file: ' + str(path))
+        length = struct.unpack('>I', header[4:])[0]
+        header = midi_file.read(length)
+        if length < 6 or len(header) < 6:
+            raise ValueError('Truncated MIDI file: ' + str(path)
+                             + ' ends at offset ' + str(midi_file.tell()))
+        division = struct.unpack('>HHH', header[:6])[2]
+        if division & 0x8000:
+            raise ValueError('SMPTE time division is not supported')
+        while True:
+            header = midi_file.read(8)
+            if len(header) < 8:
+                break
+            chunk, length = struct.unpack('>4sI', header)
+            start = midi_file.tell()
+            if chunk == b'MTrk':
+                tracks.append(_tick_order(_read_track(
+                    path, start, start+length, skip_channels)))
+            midi_file.seek(start+length)
+    
+    # Merge the tracks lazily; at equal times, note-offs
+    # come before note-ons, in every track and across tracks.
+    for tick, pitch, on in heapq.merge(
+            *tracks, key=lambda event: (event[0], event[2])):
+        yield tick/division, pitch, on
+
+
+# Cut note events into slices of simultaneously sounding
+# pitches. With "step" None, a slice is taken at every onset,
+# containing the pitches sounding right after it. Otherwise,
+# the time axis is cut into windows of "step" beats, and each
+# slice contains every pitch sounding within its window;
+# windows without pitches are skipped.
+
+# Input: (1) note events as yielded by read_midi, in time
+# order. (2) The window length in beats, or None.
+
+# Output: a generator of (time, pitches), where time is the
+# onset or the window start and the pitches are ascending.
+
+def slice_notes (events, step=None):
+    
+    active = {}
+    window = None
+    window_pitches = set()
+    group_time = None
+    group_onset = False
+    for time, pitch, on in events:
+        
+        # All events at one time are handled before the
+        # onset slice at that time is taken.
+        if step is None:
+            if time != group_time:
+                if group_onset:
+                    yield group_time, sorted(active)
+                group_time = time
+                group_onset = False
+            group_onset = group_onset or on
+        
+        # Close every window ending before this event.
+        else:
+            while window is not None and time >= (window+1)*step:
+                if window_pitches:
+                    yield window*step, sorted(window_pitches)
+                window += 1
+                window_pitches = set(active)
+                if not active:
+                    window = None
+            if window is None:
+                window = int(time//step)
+                window_pitches = set(active)
+        
+        if on:
+            active[pitch] = active.get(pitch, 0) + 1
+            if step is not None:
+                window_pitches.add(pitch)
+        elif pitch in active:
+            active[pitch] -= 1
+            if active[pitch] == 0:
+                del active[pitch]
+                # A note ending as a window starts is not in it.
+                if step is not None and time == window*step:
+                    window_pitches.discard(pitch)
+    
+    if step is None:
+        if group_onset:
+            yield group_time, sorted(active)
+    elif window_pitches:
+        yield window*step, sorted(window_pitches)
+
+
+# Analyze each slice with the set-class functions.
+
+# Input: slices as yielded by slice_notes.
+
+# Output: a generator of (time, pitches, the output of
+# normal_prime_form, the interval-class vector, the output of
+# detect_complexity with normalization), one per non-empty slice.
+
+def analyze_slices (slices):
+    
+    for time, pitches in slices:
+        if not pitches:
+            continue
+        pc_set = PCSet(pitches)
+        yield (time, pitches, normal_prime_form(pc_set),
+               ic_vector(pc_set)[1], detect_complexity(pc_set, True))
+
+
+# Run the whole pipeline on a MIDI file.
+
+def analyze_midi (path, step=None, skip_channels=(9,)):
+    
+    return analyze_slices(slice_notes(
+        read_midi(path, skip_channels), step))
@@ -0,0 +1,231 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# This module includes the nearest-reference-scale search.
+
+
+                ### Nearest-reference-scale search ###
+
+# Find the k referential structures nearest to a tested set.
+# As in distance_vl_gm, the tested set may be transposed and
+# reordered (cyclically) but not inverted; unlike it, every
+# transposition is checked, so the distances are exact minima.
+
+# The candidates of each cardinality are kept in a registry,
+# built on first use from (1) the scales in ref_dict, (2) the
+# scales added with register_scale and (3) every set class
+# (prime form and, if different, its inversion). For each
+# candidate, its sum class and step intervals are precomputed
+# for two lower bounds of its distance to the tested set:
+# - Sum class: the displacements of a voice leading add up to
+#   the difference of the sum classes (mod 12). Transposing
+#   the tested set by t changes its sum class by t times the
+#   cardinality, so the bound is the distance from that
+#   difference to the nearest multiple of gcd(cardinality, 12).
+# - Step intervals: if two adjacent voices move by d and e,
+#   the step between them changes by e-d (mod 12); each
+#   displacement counts in two steps, so the voice-leading
+#   distance is at least half the smallest total change of
+#   steps over all alignments. This bound ignores transposition.
+# Candidates are checked in order of their bounds, and the
+# search stops once a bound exceeds the k-th best distance.
+
+from math import gcd
+
+from .distance import ref_dict
+from .instrument import instrumented
+from .pcset import PCSet, pc_mask
+from .table import set_class_table
+
+# cardinality -> list of [name, [forms], set class or not],
+# where each form is (sorted pcs, sum class, step intervals).
+_scale_registry = None
+
+
+# Return the step intervals of an ascending pc set, from each
+# member to the next (cyclically).
+
+def _steps (pc_set):
+
+    cdt = len(pc_set)
+    return tuple((pc_set[(i+1)%cdt]-pc_set[i])%12 for i in range(cdt))
+
+
+def _registry_form (pc_set):
+
+    mask = pc_mask(pc_set)
+    pc_set = [pc for pc in range(12) if mask >> pc & 1]
+    return pc_set, sum(pc_set)%12, _steps(pc_set)
+
+
+def _add_to_registry (registry, name, forms, set_class=False):
+
+    cdt = len(forms[0][0])
+    registry.setdefault(cdt, []).append([name, forms, set_class])
+
+
+# Return the registry, building it on first use.
+
+def scale_registry ():
+
+    global _scale_registry
+    if _scale_registry is None:
+        registry = {}
+        for name, ref_info in ref_dict.items():
+            _add_to_registry(registry, name, [_registry_form(ref_info[0])])
+        
+        primes = []
+        for entry in set_class_table():
+            if entry is not None and entry.prime not in primes:
+                primes.append(entry.prime)
+        primes.sort(key=lambda prime: (len(prime), prime))
+        for prime in primes:
+            forms = [_registry_form(prime)]
+            prime_set = PCSet(prime)
+            inversion = prime_set.invert()
+            if all(prime_set.transpose(t) != inversion for t in range(12)):
+                forms.append(_registry_form(inversion))
+            _add_to_registry(registry, str(list(prime)), forms, True)
+        _scale_registry = registry
+    
+    return _scale_registry
+
+
+# Add a named scale to ref_dict (so that distance_vl_gm can use
+# it) and to the registry. Input: (1) the name; (2) the scale
+# in pitch-class or MIDI-pitch numbers.
+
+def register_scale (name, pitch_set):
+
+    form = _registry_form(pitch_set)
+    ref_dict[name] = [list(form[0]), form[1]]
+    registry = scale_registry()
+    for candidates in registry.values():
+        for candidate in candidates:
+            if candidate[0] == name and not candidate[2]:
+                candidates.remove(candidate)
+                break
+    _add_to_registry(registry, name, [form])
+    
+    # Keep the order of a newly built registry: the scales in
+    # the order of ref_dict, then the set classes.
+    order = {scale: index for index, scale in enumerate(ref_dict)}
+    registry[len(form[0])].sort(key=lambda candidate: (
+        candidate[2], 0 if candidate[2] else order[candidate[0]]))
+
+
+# The exact distance between a tested set, given as its 12
+# ascending transpositions, and one form of a candidate.
+
+def _form_distance (transposed, ref, euclidean):
+
+    cdt = len(ref)
+    best = None
+    for pc_set in transposed:
+        for count in range(cdt):
+            distance = 0
+            for i in range(cdt):
+                gap = (ref[i]-pc_set[i-count])%12
+                if gap > 6:
+                    gap = 12-gap
+                if euclidean:
+                    distance += gap*gap
+                else:
+                    distance += gap
+            if best is None or distance < best:
+                best = distance
+    
+    if euclidean:
+        return best**0.5
+    return best
+
+
+# Lower bound from the step intervals of both sets.
+
+def _steps_bound (steps, ref_steps, euclidean):
+
+    cdt = len(steps)
+    best = None
+    for shift in range(cdt):
+        total = 0
+        for i in range(cdt):
+            change = (ref_steps[i]-steps[i-shift])%12
+            if change > 6:
+                change = 12-change
+            if euclidean:
+                total += change*change
+            else:
+                total += change
+        if best is None or total < best:
+            best = total
+    
+    if euclidean:
+        return best**0.5/2
+    return best/2
+
+
+# Find the k nearest referential structures to a tested set.
+
+# Input: (1) a pitch set in pitch-class or MIDI-pitch numbers
+# (or a PCSet); it allows repetition of pitches or pitch
+# classes. (2) The number of results. (3) 'vl' for the
+# voice-leading distance, 'euclidean' for the Euclidean one.
+# (4) Whether set classes are candidates, besides the scales.
+
+# Output: up to k (name, reference, distance), nearest first;
+# ties keep the registry order (ref_dict, registered scales,
+# set classes). A set class is named after its prime form.
+
+@instrumented
+def nearest_scales (pitch_set, k=1, metric='vl', set_classes=True):
+
+    if metric not in ('vl', 'euclidean'):
+        raise ValueError("metric must be 'vl' or 'euclidean'")
+    euclidean = metric == 'euclidean'
+    
+    mask = pc_mask(pitch_set)
+    pc_set = [pc for pc in range(12) if mask >> pc & 1]
+    cdt = len(pc_set)
+    candidates = scale_registry().get(cdt, [])
+    if not set_classes:
+        candidates = [candidate for candidate in candidates
+                      if not candidate[2]]
+    if cdt == 0 or k < 1 or not candidates:
+        return []
+    
+    transposed = [sorted((pc+t)%12 for pc in pc_set) for t in range(12)]
+    steps = _steps(pc_set)
+    sum_class = sum(pc_set)%12
+    period = gcd(cdt, 12)
+    
+    # The better of both bounds for every candidate.
+    bounds = []
+    for index, (name, forms, set_class) in enumerate(candidates):
+        bound = None
+        for ref, ref_sum, ref_steps in forms:
+            offset = (ref_sum-sum_class)%period
+            form_bound = min(offset, period-offset)
+            if euclidean:
+                form_bound = form_bound/cdt**0.5
+            form_bound = max(
+                form_bound, _steps_bound(steps, ref_steps, euclidean))
+            if bound is None or form_bound < bound:
+                bound = form_bound
+        bounds.append((bound, index))
+    bounds.sort()
+    
+    # Check the candidates in order of their bounds.
+    best = []
+    for bound, index in bounds:
+        if len(best) == k and bound > best[-1][0] + 1e-9:
+            break
+        distance = min(_form_distance(transposed, form[0], euclidean)
+                       for form in candidates[index][1])
+        best.append((distance, index))
+        best.sort()
+        del best[k:]
+    
+    return [(candidates[index][0], list(candidates[index][1][0][0]),
+             round(distance, 3)) for distance, index in best]
+
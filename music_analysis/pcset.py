@@ -0,0 +1,156 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# This module includes the pitch-class-set type.
+
+
+                    ### Pitch-class-set type ###
+
+# A compact, immutable and hashable pitch-class set, stored
+# as a 12-bit mask (bit n set <=> pitch class n present).
+# All analysis functions accept it wherever a pitch set is
+# expected. Iterating over it yields the pitch classes in
+# ascending order.
+
+# Transposition and inversion are bit rotations; union,
+# intersection, difference and symmetric difference are the
+# operators |, &, - and ^.
+
+class PCSet:
+    
+    __slots__ = ('mask',)
+    
+    # Input: a pitch set in pitch-class or MIDI-pitch numbers,
+    # or another PCSet; repetition is allowed.
+    def __init__ (self, pitch_set=()):
+        object.__setattr__(self, 'mask', pc_mask(pitch_set))
+    
+    @classmethod
+    def from_mask (cls, mask):
+        pc_set = object.__new__(cls)
+        object.__setattr__(pc_set, 'mask', mask & 0xFFF)
+        return pc_set
+    
+    def __setattr__ (self, name, value):
+        raise AttributeError('PCSet is immutable')
+    
+    def __delattr__ (self, name):
+        raise AttributeError('PCSet is immutable')
+    
+    def __reduce__ (self):
+        return PCSet.from_mask, (self.mask,)
+    
+    def to_list (self):
+        mask = self.mask
+        return [pc for pc in range(12) if mask >> pc & 1]
+    
+    def __iter__ (self):
+        return iter(self.to_list())
+    
+    def __getitem__ (self, index):
+        return self.to_list()[index]
+    
+    def __len__ (self):
+        return bin(self.mask).count('1')
+    
+    def __contains__ (self, pitch):
+        return bool(self.mask >> (pitch%12) & 1)
+    
+    def __eq__ (self, other):
+        if isinstance(other, PCSet):
+            return self.mask == other.mask
+        return NotImplemented
+    
+    def __hash__ (self):
+        return hash(self.mask)
+    
+    def __repr__ (self):
+        return 'PCSet(' + str(self.to_list()) + ')'
+    
+    # Transpose by n semitones: rotate the mask left by n.
+    def transpose (self, n):
+        n = n%12
+        mask = self.mask
+        return PCSet.from_mask((mask << n) | (mask >> (12-n)))
+    
+    # Invert around n/2, mapping pc to (n-pc): reverse the
+    # bits (pc to 11-pc), then rotate left by n+1.
+    def invert (self, n=0):
+        return PCSet.from_mask(
+            _reversed_masks()[self.mask]).transpose(n+1)
+    
+    def complement (self):
+        return PCSet.from_mask(~self.mask)
+    
+    def __or__ (self, other):
+        return PCSet.from_mask(self.mask | other.mask)
+    
+    def __and__ (self, other):
+        return PCSet.from_mask(self.mask & other.mask)
+    
+    def __sub__ (self, other):
+        return PCSet.from_mask(self.mask & ~other.mask)
+    
+    def __xor__ (self, other):
+        return PCSet.from_mask(self.mask ^ other.mask)
+    
+    def issubset (self, other):
+        return self.mask & ~other.mask == 0
+    
+    def issuperset (self, other):
+        return other.mask & ~self.mask == 0
+
+
+# The bit of each pitch class, as Python integers, so that
+# NumPy integers of any width can be reduced without overflow.
+
+_pc_bits = tuple(1 << pc for pc in range(12))
+
+
+# Convert a pitch set in pitch-class or MIDI-pitch numbers
+# into its 12-bit pitch-class mask. Any sequence of integers
+# is read in place (a list, a tuple, an array, a memoryview, a
+# NumPy array or view) and left unchanged.
+
+def pc_mask (pitch_set):
+    
+    if isinstance(pitch_set, PCSet):
+        return pitch_set.mask
+    mask = 0
+    for pitch in pitch_set:
+        mask |= _pc_bits[pitch%12]
+    
+    return mask
+
+
+# The members of a sequence as Python numbers, for functions
+# that compute with the members themselves: a PCSet gives its
+# pitch classes; an array, memoryview or NumPy array is
+# converted (NumPy integers would wrap around in subtraction);
+# any other sequence is returned as it is, unchanged.
+
+def _python_numbers (sequence):
+    
+    if isinstance(sequence, PCSet):
+        return sequence.to_list()
+    if hasattr(sequence, 'tolist'):
+        return sequence.tolist()
+    
+    return sequence
+
+
+_reversed_mask_table = None
+
+
+# Return the bit-reversal table of all 12-bit masks,
+# building it on first use.
+
+def _reversed_masks ():
+    
+    global _reversed_mask_table
+    if _reversed_mask_table is None:
+        _reversed_mask_table = [
+            int(format(mask, '012b')[::-1], 2) for mask in range(4096)]
+    
+    return _reversed_mask_table
@@ -0,0 +1,155 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# This module includes the progression voice-leading calculator.
+
+
+            ### Voice leading through progressions ###
+
+# Voice a whole progression of chords so that the total voice
+# leading is smallest. Between pitch classes, the best voice
+# leading of each pair of chords may be chosen on its own, and
+# the total is the sum of the pairwise minima. In a register it
+# may not: each chord is realized by one voicing, shared by the
+# step into it and the step out of it, and its voices must stay
+# in a given range. A greedy chain of pairwise choices may then
+# drift out of the range or force a leap later on.
+
+# Every chord is voiced in close position: its members, from a
+# bass member upwards, within an octave. Its voicings are thus
+# given by a rotation (which member is the bass) and an octave,
+# and the voices of two chords are paired from the bass up. The
+# cost of a step adds up the semitones moved by every voice (or
+# is the square root of the sum of their squares). A Viterbi
+# pass over the voicings of every chord keeps, for each voicing,
+# the cheapest chain reaching it; the optimal chain is then
+# traced back from the cheapest last voicing.
+
+# All chords must have the same number of voices; a member
+# repeated in a chord is doubled (e.g. [0, 0, 4, 7] for a major
+# triad in four voices): the bass an octave above, any other
+# member in unison. When many progressions are voiced at
+# once, the cost matrix of each pair of chords is computed only
+# once.
+
+# NumPy is imported only when these functions are called.
+
+from collections import namedtuple
+
+from .instrument import instrumented
+
+ProgressionPath = namedtuple('ProgressionPath', [
+    'voicings', 'steps', 'total'])
+
+
+def _chord_voices (chord):
+
+    voices = sorted(pitch%12 for pitch in chord)
+    if not voices:
+        raise ValueError('A chord is empty')
+    return tuple(voices)
+
+
+# The close-position voicings of a chord within [low, high], by
+# ascending bass; output: an S x n array of MIDI pitches.
+
+def _voicings (np, voices, low, high):
+
+    n = len(voices)
+    shapes = set()
+    for i in range(n):
+        offsets = [(voices[(i+v)%n]-voices[i])%12 or 12 for v in range(1, n)]
+        shapes.add(tuple(sorted([0] + offsets)) + (voices[i],))
+    voicings = []
+    for bass in range(low, high+1):
+        for shape in shapes:
+            if bass%12 == shape[-1] and bass + shape[-2] <= high:
+                voicings.append([bass+offset for offset in shape[:-1]])
+    if not voicings:
+        raise ValueError('A chord cannot be voiced between '
+                         + str(low) + ' and ' + str(high))
+    voicings.sort()
+    return np.array(voicings)
+
+
+def _step_costs (np, first, second, euclidean):
+
+    moves = np.abs(first[:, None, :] - second[None, :, :])
+    if euclidean:
+        return np.sqrt((moves*moves).sum(axis=2))
+    return moves.sum(axis=2).astype(float)
+
+
+# Voice many progressions.
+
+# Input: (1) the progressions: each a sequence of chords, given
+# by their pitch classes or MIDI pitches (or PCSets). (2) The
+# lowest and (3) the highest MIDI pitch of any voice. (4) 'vl'
+# or 'euclidean'.
+
+# Output: a list of ProgressionPath, one per progression: (1)
+# the voicings, a tuple of MIDI pitches (bass first) per chord;
+# (2) the distance of every step, rounded to three decimals;
+# (3) their total, rounded likewise.
+
+@instrumented(size=len)
+def voice_leading_paths (progressions, low=48, high=84, metric='vl'):
+
+    import numpy as np
+    
+    if metric not in ('vl', 'euclidean'):
+        raise ValueError("metric must be 'vl' or 'euclidean'")
+    euclidean = metric == 'euclidean'
+    voicing_cache = {}
+    cost_cache = {}
+    paths = []
+    for progression in progressions:
+        chords = [_chord_voices(chord) for chord in progression]
+        if not chords:
+            paths.append(ProgressionPath([], [], 0.0))
+            continue
+        if len(set(len(chord) for chord in chords)) > 1:
+            raise ValueError('All chords must have the same number of voices')
+        for chord in chords:
+            if chord not in voicing_cache:
+                voicing_cache[chord] = _voicings(np, chord, low, high)
+        
+        # The Viterbi pass: the cheapest chain to each voicing,
+        # and the voicing before it.
+        score = np.zeros(len(voicing_cache[chords[0]]))
+        back = []
+        for k in range(1, len(chords)):
+            pair = chords[k-1], chords[k]
+            if pair not in cost_cache:
+                cost_cache[pair] = _step_costs(
+                    np, voicing_cache[pair[0]], voicing_cache[pair[1]],
+                    euclidean)
+            totals = score[:, None] + cost_cache[pair]
+            back.append(totals.argmin(axis=0))
+            score = totals.min(axis=0)
+        
+        # Trace the optimal chain back from its last voicing.
+        state = int(score.argmin())
+        states = [state]
+        for pointers in reversed(back):
+            state = int(pointers[state])
+            states.append(state)
+        states.reverse()
+        voicings = [tuple(voicing_cache[chord][state].tolist())
+                    for chord, state in zip(chords, states)]
+        steps = [round(float(cost_cache[chords[k-1], chords[k]][
+                     states[k-1], states[k]]), 3)
+                 for k in range(1, len(chords))]
+        paths.append(ProgressionPath(
+            voicings, steps, round(float(score.min()), 3)))
+    
+    return paths
+
+
+# Voice one progression; input and output as above.
+
+@instrumented(size=len)
+def voice_leading_path (progression, low=48, high=84, metric='vl'):
+
+    return voice_leading_paths([progression], low, high, metric)[0]
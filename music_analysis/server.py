@@ -0,0 +1,477 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# This module includes the analysis server and its client.
+
+
+                    ### Analysis server ###
+
+# Serve normal_prime_form, ic_vector, maximal_even,
+# detect_complexity and distance_vl_gm over TCP or a Unix
+# socket, one JSON object per line each way:
+#     -> {"id": 1, "function": "ic_vector", "args": [[0, 4, 7]]}
+#     <- {"id": 1, "result": [[0, 3, 7], [0, 0, 1, 1, 1, 0]],
+#         "latency": 0.0004}
+# Arguments are those of the functions. A failed request is
+# answered with "error" instead of "result"; this includes the
+# cases where distance_vl_gm prints a message and returns None.
+# detect_complexity with "counts_only" answers {"normal": [...],
+# "ambiguity_count": n, "contradiction_count": n}.
+# The request {"id": ..., "function": "stats"} is answered with
+# the server's counts and latency percentiles.
+
+# Requests from all connections go into one bounded queue. A
+# single task takes them out in micro-batches: it waits for one
+# request, then for "batch_delay" seconds more, and takes up to
+# "batch_size" requests. A batch runs in a worker thread,
+# looking the first three functions up in the set-class table
+# and computing identical requests only once. The answers are
+# handed to each connection's own writer task, so a client that
+# does not read its answers holds up no one else.
+
+# Backpressure: a connection stops reading when it has
+# "connection_limit" requests not yet answered and written, or
+# when the queue is full, so the clients are slowed down by the
+# transport.
+
+# Each response reports the time from reading the request to
+# writing the answer. The server keeps these latencies in its
+# own records, read by stats(); while instrumentation is on,
+# they are also recorded with instrument.record under
+# 'server.<function>', with the cardinality of the pitch set.
+
+# Responses on one connection come in the order of its
+# requests.
+
+# Usage:
+#     python -m music_analysis.server --port 8765
+#     python -m music_analysis.server --unix /tmp/analysis.sock
+# and, in Python (e.g. for tests, over the loopback):
+#     server = AnalysisServer()
+#     host, port = await server.start(port=0)
+#     client = await AnalysisClient.connect(host, port)
+#     await client.call('normal_prime_form', [0, 4, 7])
+
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from . import instrument
+from .complexity import ComplexityResult, detect_complexity
+from .distance import distance_vl_gm, ref_dict
+from .evenness import maximal_even
+from .pcset import pc_mask
+from .set_class import ic_vector, normal_prime_form
+from .table import set_class_table
+
+
+def _pitches (pitch_set):
+
+    return tuple(int(pitch) for pitch in pitch_set)
+
+
+def _reference_key (reference):
+
+    if reference is None or isinstance(reference, str):
+        return reference
+    return tuple(sorted(_pitches(reference)))
+
+
+# For each function: the function and the key of its arguments;
+# identical requests in a batch are computed once.
+SERVER_FUNCTIONS = {
+    'normal_prime_form': (
+        normal_prime_form, lambda pitch_set: pc_mask(pitch_set)),
+    'ic_vector': (
+        ic_vector, lambda pitch_set: pc_mask(pitch_set)),
+    'maximal_even': (
+        maximal_even, lambda pitch_set: pc_mask(pitch_set)),
+    'detect_complexity': (
+        detect_complexity,
+        lambda pitch_set, normalize, counts_only=False: (
+            (True, pc_mask(pitch_set)) if normalize == True
+            else (False, _pitches(pitch_set)))
+        + (('counts',) if counts_only else ())),
+    'distance_vl_gm': (
+        distance_vl_gm,
+        lambda pitch_set, perft_even, reference: (
+            pc_mask(pitch_set), perft_even == True,
+            None if perft_even == True else _reference_key(reference))),
+    }
+
+
+# Check the arguments of distance_vl_gm, raising what the
+# function would print instead.
+
+def _check_distance (pitch_set, perft_even, reference):
+
+    cdt = bin(pc_mask(pitch_set)).count('1')
+    if cdt == 1:
+        raise ValueError('Trivial case: single pitch class.')
+    if perft_even == True:
+        return
+    if reference is not None and not isinstance(reference, str):
+        size = len(reference)
+    elif reference in ref_dict:
+        size = len(ref_dict[reference][0])
+    else:
+        raise ValueError('Can not find the reference')
+    if size != cdt:
+        raise ValueError('Cardinality Error')
+
+
+def _call (name, args):
+
+    if name in ('normal_prime_form', 'ic_vector', 'maximal_even'):
+        entry = set_class_table()[pc_mask(args[0])]
+        if entry is not None:
+            if name == 'normal_prime_form':
+                return list(entry.normal), list(entry.prime)
+            if name == 'ic_vector':
+                return list(entry.prime), list(entry.vector)
+            return entry.maximal_even, entry.myhill
+    if name == 'distance_vl_gm':
+        _check_distance(*args)
+    result = SERVER_FUNCTIONS[name][0](*args)
+    if isinstance(result, ComplexityResult):
+        return {'normal': list(result.normal),
+                'ambiguity_count': result.ambiguity_count,
+                'contradiction_count': result.contradiction_count}
+    return result
+
+
+# Answer a batch of requests (id, function, arguments); a
+# function of None carries an error message as its arguments.
+
+# Output: the responses, in the order of the requests; None for
+# the stats requests, answered when written.
+
+def _run_batch (requests):
+
+    responses = []
+    done = {}
+    for request_id, name, args in requests:
+        if name is None:
+            responses.append({'id': request_id, 'error': args})
+            continue
+        if name == 'stats':
+            responses.append(None)
+            continue
+        try:
+            key = (name, SERVER_FUNCTIONS[name][1](*args))
+            if key not in done:
+                done[key] = _call(name, args)
+            responses.append({'id': request_id, 'result': done[key]})
+        except Exception as error:
+            responses.append({'id': request_id,
+                              'error': type(error).__name__ + ': '
+                              + str(error)})
+    
+    return responses
+
+
+# Read one request line; return (id, function, arguments).
+
+def _parse_request (line):
+
+    try:
+        request = json.loads(line)
+    except ValueError:
+        return None, None, 'cannot read the request'
+    if not isinstance(request, dict):
+        return None, None, 'the request must be a JSON object'
+    request_id = request.get('id')
+    name = request.get('function')
+    args = request.get('args', [])
+    if name != 'stats' and name not in SERVER_FUNCTIONS:
+        return request_id, None, 'unknown function: ' + repr(name)
+    if not isinstance(args, list):
+        return request_id, None, 'args must be a list'
+    
+    return request_id, name, args
+
+
+# The cardinality of a request's pitch set, or None.
+
+def _request_size (request):
+
+    if request[1] is None or not request[2]:
+        return None
+    try:
+        return bin(pc_mask(request[2][0])).count('1')
+    except (TypeError, ValueError):
+        return None
+
+
+# A connection: its writer, the answers waiting to be written,
+# the number of its requests not yet answered and written, the
+# semaphore limiting that number, and whether the client is
+# still sending.
+
+class _Connection:
+
+    __slots__ = ('writer', 'responses', 'unanswered', 'slots', 'reading')
+    
+    def __init__ (self, writer, limit):
+        self.writer = writer
+        self.responses = asyncio.Queue()
+        self.unanswered = 0
+        self.slots = asyncio.Semaphore(limit)
+        self.reading = True
+
+
+class AnalysisServer:
+
+    # Input: (1) the largest number of requests in a batch. (2)
+    # The time, in seconds, to wait for more requests after the
+    # first one of a batch. (3) The number of requests that may
+    # wait in the queue. (4) The number of requests of one
+    # connection that may be in flight.
+    def __init__ (self, batch_size=256, batch_delay=0.001,
+                  queue_size=4096, connection_limit=1024):
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.queue_size = queue_size
+        self.connection_limit = connection_limit
+        self._queue = None
+        self._server = None
+        self._batcher = None
+        self._executor = None
+        self._connections = {}
+        self._latency = {}
+        self._counts = {'requests': 0, 'batches': 0, 'errors': 0,
+                        'connections': 0}
+    
+    # Start listening on a TCP port (0 for any free port) or,
+    # if "path" is given, on a Unix socket.
+    
+    # Output: the address, (host, port) or the path.
+    async def start (self, host='127.0.0.1', port=8765, path=None):
+        set_class_table()
+        self._queue = asyncio.Queue(self.queue_size)
+        self._executor = ThreadPoolExecutor(1)
+        self._batcher = asyncio.ensure_future(self._run_batches())
+        if path is not None:
+            self._server = await asyncio.start_unix_server(
+                self._serve_connection, path)
+            return path
+        self._server = await asyncio.start_server(
+            self._serve_connection, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+    
+    async def serve_forever (self):
+        await self._server.serve_forever()
+    
+    async def close (self):
+        self._server.close()
+        for connection, sender in list(self._connections.items()):
+            connection.writer.close()
+            sender.cancel()
+        await self._server.wait_closed()
+        self._batcher.cancel()
+        try:
+            await self._batcher
+        except asyncio.CancelledError:
+            pass
+        self._executor.shutdown()
+    
+    # Output: the numbers of requests, batches, errors and
+    # connections, the mean batch size, the number of queued
+    # requests and the latency summary of each function (see
+    # instrument.latency_summary).
+    def stats (self):
+        stats = dict(self._counts)
+        if stats['batches']:
+            stats['mean_batch_size'] = stats['requests']/stats['batches']
+        else:
+            stats['mean_batch_size'] = 0.0
+        stats['queued'] = self._queue.qsize() if self._queue else 0
+        stats['latency'] = instrument.latency_summary(self._latency)
+        return stats
+    
+    async def _serve_connection (self, reader, writer):
+        self._counts['connections'] += 1
+        connection = _Connection(writer, self.connection_limit)
+        self._connections[connection] = asyncio.ensure_future(
+            self._send(connection))
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                received = perf_counter()
+                request = _parse_request(line)
+                # Waits while the connection has too many
+                # requests in flight, then while the queue is full.
+                await connection.slots.acquire()
+                if writer.is_closing():
+                    break
+                connection.unanswered += 1
+                await self._queue.put((connection, received, request))
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            self._counts['connections'] -= 1
+            connection.reading = False
+            connection.responses.put_nowait(None)
+    
+    # Write the answers of one connection as they come; close it
+    # once the client stopped sending and every request is
+    # answered, or when the client is gone.
+    async def _send (self, connection):
+        writer = connection.writer
+        try:
+            while connection.reading or connection.unanswered > 0:
+                item = await connection.responses.get()
+                if item is None:
+                    continue
+                response, received, request = item
+                latency = perf_counter() - received
+                response['latency'] = round(latency, 6)
+                if writer.is_closing():
+                    break
+                self._record(request, latency)
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+                connection.unanswered -= 1
+                connection.slots.release()
+        except ConnectionError:
+            pass
+        finally:
+            del self._connections[connection]
+            writer.close()
+            connection.slots.release()
+    
+    def _record (self, request, latency):
+        name = request[1] if request[1] is not None else 'invalid'
+        size = _request_size(request)
+        instrument.record(name, latency, size, self._latency)
+        if instrument.enabled:
+            instrument.record('server.' + name, latency, size)
+    
+    async def _run_batches (self):
+        while True:
+            batch = [await self._queue.get()]
+            if self.batch_delay > 0 and self._queue.qsize() < self.batch_size:
+                await asyncio.sleep(self.batch_delay)
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            
+            loop = asyncio.get_running_loop()
+            responses = await loop.run_in_executor(
+                self._executor, _run_batch, [item[2] for item in batch])
+            self._counts['requests'] += len(batch)
+            self._counts['batches'] += 1
+            for (connection, received, request), response in zip(
+                    batch, responses):
+                if response is None:
+                    response = {'id': request[0], 'result': self.stats()}
+                if 'error' in response:
+                    self._counts['errors'] += 1
+                connection.responses.put_nowait((response, received, request))
+
+
+# A client that may send many requests before the answers
+# arrive; the answers are matched to the requests by id.
+
+class AnalysisClient:
+
+    def __init__ (self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self._pending = {}
+        self._next_id = 0
+        self._receiver = asyncio.ensure_future(self._receive())
+    
+    # Connect to a server on a TCP port or a Unix socket.
+    @classmethod
+    async def connect (cls, host='127.0.0.1', port=8765, path=None):
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+    
+    async def _receive (self):
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                response = json.loads(line)
+                future = self._pending.pop(response.get('id'), None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(
+                        ConnectionError('The server closed the connection'))
+    
+    # Send a request and wait for its whole response.
+    async def request (self, function, *args):
+        request_id = self._next_id
+        self._next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self._writer.write(json.dumps(
+            {'id': request_id, 'function': function,
+             'args': list(args)}).encode() + b'\n')
+        await self._writer.drain()
+        return await future
+    
+    # Call a function on the server; return its result, or
+    # raise ValueError with the server's error message.
+    async def call (self, function, *args):
+        response = await self.request(function, *args)
+        if 'error' in response:
+            raise ValueError(response['error'])
+        return response['result']
+    
+    async def close (self):
+        self._writer.close()
+        await self._writer.wait_closed()
+        self._receiver.cancel()
+
+
+def main (argv=None):
+
+    parser = argparse.ArgumentParser(
+        prog='python -m music_analysis.server',
+        description='Serve the analysis functions as JSON lines.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', metavar='PATH',
+                        help='listen on a Unix socket instead')
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--batch-delay', type=float, default=1.0,
+                        help='milliseconds to wait for a batch to fill')
+    parser.add_argument('--queue-size', type=int, default=4096)
+    parser.add_argument('--connection-limit', type=int, default=1024,
+                        help='requests of one connection in flight')
+    args = parser.parse_args(argv)
+    
+    async def run ():
+        server = AnalysisServer(args.batch_size, args.batch_delay/1000,
+                                args.queue_size, args.connection_limit)
+        address = await server.start(args.host, args.port, args.unix)
+        print('Serving on ' + str(address), flush=True)
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+    
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,328 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# This module includes the normal-form and prime-form
+# generator and the interval-class-vector calculator.
+
+from . import instrument
+from .instrument import instrumented
+from .pcset import PCSet, _python_numbers, pc_mask
+from .table import set_class_table
+
+
+# Look a pitch set up in the set-class table. While recording
+# is on, the lookup is recorded as the phase "name.lookup"; the
+# table is built first, so that building it is not counted.
+
+def _table_entry (pitch_set, name):
+
+    table = set_class_table()
+    if not instrument.enabled:
+        return table[pc_mask(pitch_set)]
+    started = instrument.clock()
+    mask = pc_mask(pitch_set)
+    entry = table[mask]
+    instrument.record_phase(name + '.lookup', started, bin(mask).count('1'))
+    
+    return entry
+
+
+                ### Normal-form and prime-form generator ###
+
+# Calculate the normal and prime forms of a given set.
+
+# Input: a pitch set in pitch-class or MIDI-pitch
+# numbers; it allows repetition of pitches or pitch classes.
+# The input is not changed.
+
+# Output: normal and prime forms of the input set.
+
+@instrumented
+def normal_prime_form (pitch_set):
+
+    # Look the pitch classes up in the precomputed
+    # set-class table.
+    entry = _table_entry(pitch_set, 'normal_prime_form')
+    if entry is None:
+        return _normal_prime_form(pitch_set)
+    
+    return list(entry.normal), list(entry.prime)
+
+
+# The full procedure behind normal_prime_form, used to
+# build the set-class table. Input and output as above.
+
+def _normal_prime_form (pitch_set):
+
+    # Extract pitch classes, eliminate redundancy,
+    # and arrange the result in ascending order.
+    pc_set = PCSet(pitch_set).to_list()
+    
+    # If the pitch-class set has only one item,
+    # return the result and end the function.
+    if len(pc_set) == 1:
+        return [pc_set[0]], [0]
+    
+    # Find and store the most compact permutation(s).
+    cardinality = len(pc_set)
+    gap_list = []
+    n = 0
+    while n < cardinality:
+        gap_list.append(
+            (pc_set[n]-pc_set[n-1])%12)
+        n += 1
+    gap_max = max(gap_list)
+    index = []
+    for i, j in enumerate(gap_list):
+        if j == gap_max:
+            index.append(i)
+    tight = []
+    for i in index:
+        tight.append(pc_set[i:]+pc_set[:i])
+    
+    # Check each of above permutations. 
+    # If smaller intervals occur towards the upper
+    # extreme, reverse the order of the permutation.
+    for item in tight:
+        for i in range(cardinality-1):
+            head = (item[i+1]-item[i])%12
+            tail = (item[-(i+1)]-item[-(i+2)])%12
+            if head < tail:
+                break
+            elif tail < head:
+                item.reverse()
+                break
+            else:
+                continue
+    
+    # Among above permutations, compare their intervals at 
+    # corresponding positions. The first one(s) featuring
+    # a smaller interval win(s).
+    # If several permutations win, pick up the first one.
+    for m in range(cardinality-1):
+        gap_list = []
+        for n in range(len(tight)):
+            gap = min([
+                (tight[n][m+1]-tight[n][m])%12, (
+                    tight[n][m]-tight[n][m+1])%12])
+            gap_list.append(gap)
+        gap_min = min(gap_list)
+        if gap_list.count(gap_min) == 1:
+            normal = tight[gap_list.index(gap_min)]
+            break
+        elif gap_min == max(gap_list):
+            normal = tight
+            continue
+        else:
+            remain = []
+            for i, j in enumerate(gap_list):
+                if j == gap_min:
+                    remain.append(tight[i])
+            tight = remain
+    if type(normal[0]) == list:
+        normal = normal[0]
+    result_normal = []
+    
+    # Check if the winner is in descending order; if so,
+    # reverse it into ascent. The normal form is found.
+    for pc in normal:
+        result_normal.append(pc)
+    pci = (result_normal[1]-result_normal[0])%12
+    if pci > 6:
+        result_normal.reverse()
+    
+    # Transpose the winner, making it start with PC-0.
+    # If it is in descending order, reverse it around
+    # the axis PC=0. The prime form is found.
+    count = normal[0]
+    for i in range(len(normal)):
+        normal[i] = (normal[i]-count)%12
+    if normal[1] > 6:
+        for i in range(1,len(normal)):
+            normal[i] = (0-normal[i])%12
+    result_prime = normal
+    
+    return result_normal, result_prime
+
+
+
+                    ### Interval-class-vector calculator ###
+
+# Calculate the interval-class vector (IC content) of 
+# the given pitch/pitch-class set.
+
+# Input: a pitch set in pitch-class or MIDI-pitch
+# numbers; it allows repetition of pitches or pitch classes.
+
+# Output: (1) the prime form of the input set; and
+# (2) the interval-class vector of the input set.
+
+@instrumented
+def ic_vector (pitch_set):
+    
+    # Look up the prime form and the vector in the
+    # precomputed set-class table.
+    entry = _table_entry(pitch_set, 'ic_vector')
+    if entry is None:
+        return _ic_vector(normal_prime_form(pitch_set)[1])
+    
+    return list(entry.prime), list(entry.vector)
+
+
+# The calculation behind ic_vector, used to build the
+# set-class table. Input: a prime form. Output as above.
+
+def _ic_vector (prime):
+    
+    # Create a null vector for later use.
+    vector = [0,0,0,0,0,0]
+    count = len(prime)
+    
+    # Calculate and record the interval classes of 
+    # all intervals in the prime form.
+    for i in range(len(prime)-1):
+        for j in range(1, count):
+            upci = prime[-j]-prime[i]
+            if upci > 6:
+                upci = 12-upci
+            vector[upci-1] += 1
+        count -= 1
+    
+    return prime, vector
+
+
+
+            ### Normal and prime forms in any chromatic universe ###
+
+# The normal form is the most compact rotation of the set: the
+# one whose wrap-around step (from the last member back to the
+# first) is the largest. Among rotations of equal compactness,
+# the one whose steps, read upwards or downwards, are smallest
+# from the start wins; the earliest rotation wins a tie. This
+# is the rule of normal_prime_form, which weighs the candidates
+# pairwise, pass after pass.
+
+# Here the steps are a necklace. Writing a marker smaller than
+# every step after each largest step, the least rotation of the
+# marked necklace starts at the best candidate read upwards,
+# and that of the reversed necklace at the best one read
+# downwards. Both are found in linear time by the least-rotation
+# algorithm below; the earliest of the tied rotations follows
+# from the period of the necklace. The prime form adds up the
+# winning steps from 0.
+
+# Output: the index of the least rotation of a sequence (the
+# smallest such index, if several rotations are equal).
+
+def _least_rotation (sequence):
+
+    n = len(sequence)
+    i, j, k = 0, 1, 0
+    while i < n and j < n and k < n:
+        a = sequence[(i+k)%n]
+        b = sequence[(j+k)%n]
+        if a == b:
+            k += 1
+            continue
+        if a > b:
+            i += k+1
+        else:
+            j += k+1
+        if i == j:
+            j += 1
+        k = 0
+    
+    return min(i, j)
+
+
+# Output: the smallest p such that rotating a sequence by p
+# gives the same sequence.
+
+def _period (sequence):
+
+    n = len(sequence)
+    prefix = [0]*n
+    k = 0
+    for i in range(1, n):
+        while k > 0 and sequence[i] != sequence[k]:
+            k = prefix[k-1]
+        if sequence[i] == sequence[k]:
+            k += 1
+        prefix[i] = k
+    period = n - prefix[-1]
+    
+    return period if n % period == 0 else n
+
+
+# Mark the candidates in the steps read in "order": a marker
+# (-1) follows each largest step. Output: the marked sequence
+# and, for each entry, the index of the candidate it begins
+# (None for steps).
+
+def _marked_steps (steps, order, largest):
+
+    marked = []
+    starts = []
+    n = len(steps)
+    for j in order:
+        marked.append(steps[j])
+        starts.append(None)
+        if steps[j] == largest:
+            marked.append(-1)
+            starts.append((j+1)%n)
+    
+    return marked, starts
+
+
+# Calculate the normal and prime forms of a given set in
+# c-tone equal temperament, in linear time.
+
+# Input: (1) a set of pitch numbers in c-tone equal
+# temperament; it allows repetition of pitches or pitch
+# classes. An ascending set of distinct pitch classes is
+# treated in linear time; any other set is reduced and sorted
+# first. (2) The size c of the universe.
+
+# Output: normal and prime forms of the input set; for c = 12,
+# those of normal_prime_form.
+
+def normal_prime_form_edo (pitch_set, c=12):
+
+    pc_set = [pitch%c for pitch in _python_numbers(pitch_set)]
+    for i in range(1, len(pc_set)):
+        if pc_set[i] <= pc_set[i-1]:
+            pc_set = sorted(set(pc_set))
+            break
+    n = len(pc_set)
+    if n <= 1:
+        return list(pc_set), [0]*n
+    
+    # The steps up from each member; steps[i-1] precedes
+    # member i.
+    steps = [(pc_set[(i+1)%n]-pc_set[i])%c for i in range(n)]
+    largest = max(steps)
+    
+    # The best candidates read upwards and downwards.
+    marked, starts = _marked_steps(steps, range(n), largest)
+    up = starts[_least_rotation(marked)]
+    marked, starts = _marked_steps(steps, range(n-1, -1, -1), largest)
+    down = starts[_least_rotation(marked)]
+    up_steps = [steps[(up+k)%n] for k in range(n-1)]
+    down_steps = [steps[(down-2-k)%n] for k in range(n-1)]
+    
+    # Equal rotations lie a period apart; take the earliest.
+    period = _period(steps)
+    if up_steps < down_steps:
+        start, winner = up % period, up_steps
+    elif down_steps < up_steps:
+        start, winner = down % period, down_steps
+    else:
+        start, winner = min(up % period, down % period), up_steps
+    
+    normal = pc_set[start:] + pc_set[:start]
+    prime = [0]
+    for step in winner:
+        prime.append(prime[-1]+step)
+    
+    return normal, prime
@@ -0,0 +1,314 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# This module includes the set-class similarity calculator.
+
+
+                ### Set-class similarity calculator ###
+
+# Compare pc sets by their content rather than by voice
+# leading. Four measures are offered:
+# (1) 'cosine': the cosine of the angle between the two
+# interval-class vectors (1 for proportional vectors).
+# (2) 'angle': that angle itself, in degrees (0 for
+# proportional vectors); the only measure where smaller means
+# more similar.
+# (3) 'rel': Lewin's REL on interval-class vectors, the sum
+# over the six classes of sqrt(x_i*y_i), divided by the square
+# root of the product of the two totals (1 for equal vectors).
+# (4) 'embedding': the same formula over the embedding vectors
+# of the two sets, which count, for every set class of two or
+# more members, the subsets of the set belonging to it (Lewin's
+# REL on subset embeddings); the totals are 2^n - n - 1.
+
+# Each measure is a dot product of two feature vectors
+# (normalized, or square-rooted and normalized), so it is
+# computed for many sets at once as a matrix product. A set with
+# no interval (fewer than two members) has a zero vector and is
+# given 0 (an angle of 90 degrees) against every set.
+
+# Input of every function: sets as (1) a 1-D array of 12-bit
+# masks, or a 2-D array of pitch-class or MIDI-pitch numbers,
+# one set per row, padded with "fill"; (2) the padding value of
+# a 2-D array. set_class_ids() gives the 224 T/TnI classes in
+# that layout, so that they may be compared with a corpus.
+
+# Many-to-many results are computed between distinct masks only
+# (at most 4096 of them), then spread to the rows and columns.
+# similarity_chunks gives blocks of at most "chunk_size" rows
+# and columns, so that the whole matrix is never held at once.
+# most_similar ranks the distinct column masks of every distinct
+# row mask; since sets of one mask have one value, only the
+# first k+1 columns of each mask can be among the k best. NumPy
+# is imported only when these functions are called.
+
+from .instrument import instrumented
+from .pcset import pc_mask
+
+MEASURES = ('cosine', 'angle', 'rel', 'embedding')
+
+_embedding_table = None
+
+
+# Return the 4096 x C array of embedding counts (C set classes
+# of two or more members, by ascending prime id), building it on
+# first use.
+
+def _embedding_counts ():
+
+    global _embedding_table
+    if _embedding_table is None:
+        import numpy as np
+        
+        from .batch import _batch_tables
+        
+        # Mark the class of every mask, then add up the marks of
+        # all its subsets, one bit at a time.
+        prime_ids = _batch_tables()[1].astype(np.int64)
+        masks = np.arange(4096)
+        cdt = ((masks[:, None] >> np.arange(12)) & 1).sum(axis=1)
+        classes = np.unique(prime_ids[cdt >= 2])
+        counts = np.zeros((4096, len(classes)), dtype=np.int32)
+        marked = np.flatnonzero(cdt >= 2)
+        counts[marked, np.searchsorted(classes, prime_ids[marked])] = 1
+        for bit in range(12):
+            upper = np.flatnonzero(masks & (1 << bit))
+            counts[upper] += counts[upper ^ (1 << bit)]
+        _embedding_table = counts
+    
+    return _embedding_table
+
+
+# Output: the prime-form ids (masks) of the 224 set classes,
+# ascending, the empty set (0) first.
+
+def set_class_ids ():
+
+    import numpy as np
+    
+    from .batch import _batch_tables
+    
+    return np.unique(_batch_tables()[1].astype(np.int64))
+
+
+def _check_measure (measure):
+
+    if measure not in MEASURES:
+        raise ValueError('measure must be one of ' + ', '.join(MEASURES))
+
+
+# The feature rows of the given masks: their dot products are
+# the cosines (for 'cosine' and 'angle') or the REL values.
+
+def _features (np, masks, measure):
+
+    from .batch import _batch_tables
+    
+    if measure == 'embedding':
+        values = _embedding_counts()[masks].astype(np.float64)
+    else:
+        values = _batch_tables()[0][masks].astype(np.float64)
+    if measure == 'cosine' or measure == 'angle':
+        norms = np.linalg.norm(values, axis=1)
+    else:
+        norms = np.sqrt(values.sum(axis=1))
+        values = np.sqrt(values)
+    
+    return np.divide(values, norms[:, None], out=np.zeros_like(values),
+                     where=norms[:, None] > 0)
+
+
+# Round off the error of the matrix product, which depends on
+# the shape of the product, so that equal values tie.
+
+def _finish (np, products, measure):
+
+    products = np.clip(products.round(12), 0.0, 1.0)
+    if measure == 'angle':
+        return np.degrees(np.arccos(products))
+    return products
+
+
+# The similarity of one set to many sets.
+
+# Input: (1) a pitch set in pitch-class or MIDI-pitch numbers
+# (or a PCSet). (2) The other sets, as described above. (3) The
+# measure. (4) The padding value of a 2-D array.
+
+# Output: an array of values, one per set.
+
+@instrumented(size=len)
+def set_similarity (pitch_set, masks, measure='cosine', fill=-1):
+
+    import numpy as np
+    
+    from .batch import batch_masks
+    
+    _check_measure(measure)
+    masks = np.asarray(batch_masks(masks, fill), dtype=np.int64)
+    query = _features(np, np.array([pc_mask(pitch_set)]), measure)[0]
+    
+    return _finish(np, _features(np, masks, measure) @ query, measure)
+
+
+def _prepare (np, rows, columns, measure, fill, chunk_size):
+
+    from .batch import batch_masks
+    
+    _check_measure(measure)
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be positive')
+    rows = np.asarray(batch_masks(rows, fill), dtype=np.int64)
+    if columns is None:
+        columns = rows
+    else:
+        columns = np.asarray(batch_masks(columns, fill), dtype=np.int64)
+    column_masks, column_index = np.unique(columns, return_inverse=True)
+    
+    return rows, column_masks, column_index.ravel()
+
+
+# The similarities between many sets and many sets, a block at
+# a time.
+
+# Input: (1) the row sets and (2) the column sets, as described
+# above; if the columns are None, the rows are compared with
+# themselves. (3) The measure. (4) The padding value of 2-D
+# arrays. (5) The largest number of rows and of columns in a
+# block.
+
+# Output: a generator of (first row, first column, block): every
+# block is an array of up to chunk_size rows by up to chunk_size
+# columns, the blocks of a row chunk going from left to right.
+
+def similarity_chunks (rows, columns=None, measure='cosine', fill=-1,
+                       chunk_size=4096):
+
+    import numpy as np
+    
+    rows, column_masks, column_index = _prepare(
+        np, rows, columns, measure, fill, chunk_size)
+    column_features = _features(np, column_masks, measure).T
+    
+    for start in range(0, len(rows), chunk_size):
+        row_masks, row_index = np.unique(rows[start:start+chunk_size],
+                                         return_inverse=True)
+        distinct = _finish(
+            np, _features(np, row_masks, measure) @ column_features, measure)
+        for first in range(0, len(column_index), chunk_size):
+            yield start, first, distinct[
+                row_index.ravel()[:, None],
+                column_index[first:first+chunk_size]]
+
+
+# The whole matrix of similarities; input as above.
+
+# Output: an array of as many rows and columns as sets.
+
+@instrumented(size=len)
+def similarity_matrix (rows, columns=None, measure='cosine', fill=-1,
+                       chunk_size=4096):
+
+    import numpy as np
+    
+    from .batch import batch_masks
+    
+    rows = np.asarray(batch_masks(rows, fill), dtype=np.int64)
+    if columns is not None:
+        columns = np.asarray(batch_masks(columns, fill), dtype=np.int64)
+    size = len(rows) if columns is None else len(columns)
+    matrix = np.zeros((len(rows), size))
+    for start, first, block in similarity_chunks(
+            rows, columns, measure, fill, chunk_size):
+        matrix[start:start+block.shape[0], first:first+block.shape[1]] = block
+    
+    return matrix
+
+
+# The "width" best columns for one distinct row mask, given its
+# values against the distinct column masks: the masks are ranked,
+# and the first "width" columns of every mask ranked no lower
+# than the mask that completes "width" columns are sorted by
+# value, then by column.
+
+def _best_columns (np, values, measure, counts, positions, starts, width):
+
+    keys = values if measure == 'angle' else -values
+    # Every mask has a column, so only the masks no worse than
+    # the width-th best mask can be needed.
+    kth = min(width, len(keys)) - 1
+    near = np.flatnonzero(keys <= keys[np.argpartition(keys, kth)[kth]])
+    order = near[np.argsort(keys[near], kind='stable')]
+    last = np.searchsorted(np.cumsum(counts[order]), width)
+    chosen = order[keys[order] <= keys[order[last]]]
+    taken = np.minimum(counts[chosen], width)
+    offsets = np.arange(taken.sum()) - np.repeat(np.cumsum(taken)-taken,
+                                                 taken)
+    masks = np.repeat(chosen, taken)
+    candidates = positions[np.repeat(starts[chosen], taken) + offsets]
+    best = np.lexsort((candidates, keys[masks]))[:width]
+    
+    return candidates[best], values[masks[best]]
+
+
+# Find, for every row set, the k most similar column sets (the
+# smallest angles, for 'angle'); input as above. When the rows
+# are compared with themselves, a row is not matched with
+# itself. Ties go to the earlier column.
+
+# Output: (1) an array of column indices and (2) an array of
+# their values, both of as many rows as sets and k columns (or
+# fewer, if there are fewer columns), the most similar first.
+
+@instrumented(size=len)
+def most_similar (rows, columns=None, k=10, measure='cosine', fill=-1,
+                  chunk_size=4096):
+
+    import numpy as np
+    
+    self_match = columns is None
+    rows, column_masks, column_index = _prepare(
+        np, rows, columns, measure, fill, chunk_size)
+    count = max(min(k, len(column_index) - self_match), 0)
+    if count == 0:
+        return (np.zeros((len(rows), 0), dtype=np.int64),
+                np.zeros((len(rows), 0)))
+    
+    # The columns of every distinct column mask, in order.
+    positions = np.argsort(column_index, kind='stable')
+    counts = np.bincount(column_index, minlength=len(column_masks))
+    starts = np.cumsum(counts) - counts
+    
+    # The best columns of every distinct row mask, one more when
+    # the row itself may be among them.
+    width = count + self_match
+    row_masks, row_index = np.unique(rows, return_inverse=True)
+    row_index = row_index.ravel()
+    best = np.zeros((len(row_masks), width), dtype=np.int64)
+    best_values = np.zeros((len(row_masks), width))
+    column_features = _features(np, column_masks, measure).T
+    for start in range(0, len(row_masks), chunk_size):
+        block = _finish(np, _features(
+            np, row_masks[start:start+chunk_size], measure)
+            @ column_features, measure)
+        for offset, values in enumerate(block):
+            best[start+offset], best_values[start+offset] = _best_columns(
+                np, values, measure, counts, positions, starts, width)
+    
+    # Spread them to the rows, leaving out the row itself (or
+    # else the extra column).
+    indices = np.zeros((len(rows), count), dtype=np.int64)
+    values = np.zeros((len(rows), count))
+    for start in range(0, len(rows), chunk_size):
+        chunk = row_index[start:start+chunk_size]
+        columns = best[chunk]
+        keep = np.ones(columns.shape, dtype=bool)
+        if self_match:
+            keep = columns != np.arange(start, start+len(chunk))[:, None]
+            keep &= np.cumsum(keep, axis=1) <= count
+        indices[start:start+len(chunk)] = columns[keep].reshape(-1, count)
+        values[start:start+len(chunk)] = best_values[chunk][keep].reshape(
+            -1, count)
+    
+    return indices, values
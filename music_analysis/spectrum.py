@@ -0,0 +1,226 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# This module includes the interval-spectrum calculator.
+
+
+                ### Interval-spectrum calculator ###
+
+# The spectrum of a set holds, for every generic interval k
+# (1 to n-1) and every starting member i, the chromatic width
+# from member i to member i+k (counted cyclically), together
+# with the smallest and largest width of each generic interval.
+# It is computed once per set; maximal evenness, Myhill's
+# property, ambiguity and contradiction, and Rothenberg's
+# propriety and stability are all read from it.
+
+# The widths are kept in one flat byte string, generic interval
+# by generic interval: the width of (k, i) is at (k-1)*n + i.
+# row(k-1) gives the same list as interval_matrix(...)[k-1].
+# Widths are counted in semitones, or in steps of a c-tone
+# universe if c is given (in an array of 16-bit integers
+# instead of bytes when c exceeds 256).
+
+# Rothenberg calls a set proper if no generic interval is ever
+# wider than a larger generic interval (no contradiction), and
+# strictly proper if, moreover, no width is shared by two
+# generic intervals (no ambiguity). Its stability is the share
+# of the n*(n-1) intervals whose width occurs in one generic
+# interval only.
+
+from array import array
+
+from .instrument import instrumented
+from .pcset import _python_numbers
+
+
+class IntervalSpectrum:
+
+    __slots__ = ('pc_set', 'cdt', 'widths', 'low', 'high')
+    
+    # Input: (1) a pitch-class set in the order to be analyzed,
+    # expected to be ascending (e.g. a normal or prime form);
+    # the input is not changed. (2) The size c of the universe.
+    def __init__ (self, pitch_set, c=12):
+        pc_set = tuple(_python_numbers(pitch_set))
+        cdt = len(pc_set)
+        doubled = pc_set + pc_set
+        widths = []
+        low = []
+        high = []
+        for k in range(1, cdt):
+            row = [(doubled[i+k]-doubled[i])%c for i in range(cdt)]
+            widths += row
+            low.append(min(row))
+            high.append(max(row))
+        self.pc_set = pc_set
+        self.cdt = cdt
+        pack = bytes if c <= 256 else (lambda values: array('H', values))
+        self.widths = pack(widths)
+        self.low = pack(low)
+        self.high = pack(high)
+    
+    def __repr__ (self):
+        return 'IntervalSpectrum(' + str(list(self.pc_set)) + ')'
+    
+    # The widths of the generic interval index+1, by starting
+    # member.
+    def row (self, index):
+        cdt = self.cdt
+        return list(self.widths[index*cdt:(index+1)*cdt])
+    
+    # The whole spectrum, as interval_matrix returns it.
+    def rows (self):
+        return [self.row(index) for index in range(self.cdt-1)]
+    
+    # The starting members of the generic interval index+1
+    # that have the given width.
+    def positions (self, index, width):
+        row = self.row(index)
+        return [i for i in range(self.cdt) if row[i] == width]
+    
+    # Output: whether the set is maximally even and whether it
+    # fulfills Myhill's property, as maximal_even returns them.
+    def maximal_even (self):
+        maximal_even = True
+        myhill = True
+        for index in range(self.cdt-1):
+            spread = self.high[index] - self.low[index]
+            if spread == 0:
+                myhill = False
+            elif spread > 1:
+                return False, False
+        return maximal_even, myhill
+    
+    # Output: the numbers of ambiguities and contradictions,
+    # counted as detect_complexity counts them.
+    def complexity_counts (self):
+        ambiguity = 0
+        contradiction = 0
+        for index in range(self.cdt-2):
+            pre_max = self.high[index]
+            post_min = self.low[index+1]
+            if pre_max < post_min:
+                continue
+            for width in self.row(index):
+                if width > post_min:
+                    contradiction += 1
+                elif width == post_min:
+                    ambiguity += 1
+            for width in self.row(index+1):
+                if width < pre_max:
+                    contradiction += 1
+                elif width == pre_max:
+                    ambiguity += 1
+        return ambiguity, contradiction
+    
+    # Output: whether the set is proper and whether it is
+    # strictly proper, in Rothenberg's sense.
+    def propriety (self):
+        proper = True
+        strict = True
+        for index in range(self.cdt-2):
+            if self.high[index] > self.low[index+1]:
+                return False, False
+            if self.high[index] == self.low[index+1]:
+                strict = False
+        return proper, strict
+    
+    # Output: Rothenberg's stability, from 0 to 1 (1 for sets
+    # of fewer than two members).
+    def stability (self):
+        cdt = self.cdt
+        if cdt < 2:
+            return 1.0
+        classes = {}
+        for index in range(cdt-1):
+            for width in set(self.row(index)):
+                classes[width] = classes.get(width, 0) + 1
+        ambiguous = sum(1 for width in self.widths if classes[width] > 1)
+        return 1 - ambiguous/(cdt*(cdt-1))
+
+
+# Calculate the spectrum measures of many sets with NumPy.
+# Every measure depends on the pitch-class content only (not
+# on which member comes first), so the sets are taken in
+# ascending order.
+
+# Input: (1) either a 1-D array of 12-bit masks, or a 2-D
+# array of pitch-class or MIDI-pitch numbers, one set per row,
+# padded with "fill"; (2) the padding value of a 2-D array.
+
+# Output: a dict of arrays, one value per set: 'maximal_even',
+# 'myhill', 'proper' and 'strictly_proper' (booleans),
+# 'ambiguity' and 'contradiction' (counts), and 'stability'.
+# The empty set gives False, 0 and a stability of 1.
+
+@instrumented(size=len)
+def spectrum_batch (masks, fill=-1):
+
+    import numpy as np
+    
+    from .batch import batch_masks
+    
+    masks = np.asarray(batch_masks(masks, fill), dtype=np.int64)
+    size = len(masks)
+    result = {
+        'maximal_even': np.zeros(size, dtype=bool),
+        'myhill': np.zeros(size, dtype=bool),
+        'proper': np.zeros(size, dtype=bool),
+        'strictly_proper': np.zeros(size, dtype=bool),
+        'ambiguity': np.zeros(size, dtype=np.int64),
+        'contradiction': np.zeros(size, dtype=np.int64),
+        'stability': np.ones(size),
+        }
+    bits = (masks[:, None] >> np.arange(12)) & 1
+    cardinalities = bits.sum(axis=1)
+    
+    for cdt in range(1, 13):
+        indices = np.flatnonzero(cardinalities == cdt)
+        if len(indices) == 0:
+            continue
+        if cdt == 1:
+            result['maximal_even'][indices] = True
+            result['myhill'][indices] = True
+            result['proper'][indices] = True
+            result['strictly_proper'][indices] = True
+            continue
+        
+        # Ascending pcs (M x n) and widths (M x n-1 x n).
+        pcs = np.nonzero(bits[indices])[1].reshape(-1, cdt)
+        widths = np.stack([(np.roll(pcs, -k, axis=1) - pcs) % 12
+                           for k in range(1, cdt)], axis=1)
+        low = widths.min(axis=2)
+        high = widths.max(axis=2)
+        spread = high - low
+        result['maximal_even'][indices] = (spread <= 1).all(axis=1)
+        result['myhill'][indices] = (spread == 1).all(axis=1)
+        result['proper'][indices] = (high[:, :-1] <= low[:, 1:]).all(axis=1)
+        result['strictly_proper'][indices] = (
+            high[:, :-1] < low[:, 1:]).all(axis=1)
+        
+        # Widths beyond the other generic interval's extreme
+        # are contradictions, widths equal to it ambiguities.
+        ambiguity = np.zeros(len(indices), dtype=np.int64)
+        contradiction = np.zeros(len(indices), dtype=np.int64)
+        for index in range(cdt-2):
+            pre = widths[:, index]
+            post = widths[:, index+1]
+            pre_max = high[:, index, None]
+            post_min = low[:, index+1, None]
+            contradiction += (pre > post_min).sum(axis=1)
+            contradiction += (post < pre_max).sum(axis=1)
+            ambiguity += (pre == post_min).sum(axis=1)
+            ambiguity += (post == pre_max).sum(axis=1)
+        result['ambiguity'][indices] = ambiguity
+        result['contradiction'][indices] = contradiction
+        
+        # Widths found in more than one generic interval.
+        present = widths[:, :, :, None] == np.arange(12)
+        classes = present.any(axis=2).sum(axis=1)
+        counts = present.sum(axis=(1, 2))
+        ambiguous = (counts * (classes > 1)).sum(axis=1)
+        result['stability'][indices] = 1 - ambiguous/(cdt*(cdt-1))
+    
+    return result
@@ -0,0 +1,331 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# This module includes the binary slice store.
+
+
+                    ### Binary slice store ###
+
+# Store corpus slices with their analysis in a directory of
+# raw column files, which can be memory-mapped (with mmap or as
+# NumPy memmaps) and used without any parsing. Each column holds
+# one little-endian value per slice:
+#     mask           uint16   12-bit pitch-class mask
+#     offset         uint64   position in the source (by
+#                             default, the slice's number)
+#     time           float64  time in beats
+#     prime          uint16   prime-form id (mask of the prime
+#                             form; 0 for the empty set)
+#     vector         6 uint8  interval-class vector
+#     flags          uint8    1 = maximally even, 2 = Myhill
+#     ambiguity      uint8    number of ambiguities and
+#     contradiction  uint8    of contradictions (normal form)
+# A JSON header (header.json) records the columns and the number
+# of slices written. New slices are appended to every column
+# before the header is updated, so an interrupted write leaves
+# the store as it was.
+
+# Usage:
+#     with SliceWriter('corpus.slices') as writer:
+#         writer.extend(slice_notes(read_midi('piece.mid')))
+#     store = SliceReader('corpus.slices')
+#     store.where_prime([0, 3, 7])
+
+import json
+import mmap
+import os
+import sys
+from array import array
+
+from .pcset import pc_mask
+from .table import set_class_table
+
+FORMAT = 'music-analysis-slices'
+VERSION = 1
+
+# name -> (array type code, NumPy dtype, values per slice)
+COLUMNS = {
+    'mask': ('H', '<u2', 1),
+    'offset': ('Q', '<u8', 1),
+    'time': ('d', '<f8', 1),
+    'prime': ('H', '<u2', 1),
+    'vector': ('B', 'u1', 6),
+    'flags': ('B', 'u1', 1),
+    'ambiguity': ('B', 'u1', 1),
+    'contradiction': ('B', 'u1', 1),
+    }
+
+
+# The helpers below read and write a directory of column files
+# with its header; catalogue.py keeps its columns in the same
+# way.
+
+def _read_header (path, format=FORMAT, version=VERSION,
+                  description='slice store'):
+
+    with open(os.path.join(path, 'header.json')) as header_file:
+        header = json.load(header_file)
+    if header.get('format') != format:
+        raise ValueError('Not a ' + description + ': ' + str(path))
+    if header.get('version') != version:
+        raise ValueError('Unsupported ' + description + ' version: '
+                         + str(header.get('version')))
+    return header
+
+
+# Replace the header at once, so that a reader sees the old
+# header or the new one.
+
+def _write_header (path, header):
+
+    temporary = os.path.join(path, 'header.json.tmp')
+    with open(temporary, 'w') as header_file:
+        json.dump(header, header_file)
+    os.replace(temporary, os.path.join(path, 'header.json'))
+
+
+def _store_header (rows):
+
+    return {'format': FORMAT, 'version': VERSION, 'rows': rows,
+            'columns': {name: [dtype, width] for name, (code, dtype, width)
+                        in COLUMNS.items()}}
+
+
+# Append the buffered values (arrays by column name) to the
+# column files, little-endian, and empty the buffers; with
+# "sync", wait until they are on disk.
+
+def _append_columns (path, buffers, sync=False):
+
+    for name, buffer in buffers.items():
+        if sys.byteorder == 'big':
+            buffer.byteswap()
+        with open(os.path.join(path, name + '.bin'), 'ab') as column_file:
+            buffer.tofile(column_file)
+            if sync:
+                column_file.flush()
+                os.fsync(column_file.fileno())
+        del buffer[:]
+
+
+# Map the column files of "reader" (with its path, rows and
+# numpy attributes) onto its attributes, as described for
+# SliceReader below. The columns are {name: (array type code,
+# NumPy dtype, values per row)}; those named in "matrices" are
+# rows x width memmaps.
+
+# Output: the mmap objects, for _unmap_columns.
+
+def _map_columns (reader, columns, matrices, mode='r'):
+
+    maps = []
+    for name, (code, dtype, width) in columns.items():
+        column_path = os.path.join(reader.path, name + '.bin')
+        shape = (reader.rows, width) if name in matrices else (reader.rows,)
+        if reader.numpy:
+            import numpy as np
+            if reader.rows == 0:
+                column = np.zeros(shape, dtype=dtype)
+            else:
+                column = np.memmap(column_path, dtype=dtype, mode=mode,
+                                   shape=shape)
+        else:
+            size = reader.rows * width * array(code).itemsize
+            if size == 0:
+                column = memoryview(array(code))
+            else:
+                with open(column_path, 'rb') as column_file:
+                    mapped = mmap.mmap(column_file.fileno(), size,
+                                       access=mmap.ACCESS_READ)
+                maps.append(mapped)
+                column = memoryview(mapped).cast(code)
+        setattr(reader, name, column)
+    
+    return maps
+
+
+def _unmap_columns (reader, columns, maps):
+
+    for name in columns:
+        column = getattr(reader, name)
+        if isinstance(column, memoryview):
+            column.release()
+    for mapped in maps:
+        mapped.close()
+
+
+# The analysis columns of every mask: (prime id, vector,
+# flags, ambiguity, contradiction).
+
+_store_rows = None
+
+
+def _analysis_rows ():
+
+    global _store_rows
+    if _store_rows is None:
+        rows = []
+        for entry in set_class_table():
+            if entry is None:
+                rows.append((0, (0,)*6, 0, 0, 0))
+                continue
+            rows.append((pc_mask(entry.prime), entry.vector,
+                         entry.maximal_even + 2*entry.myhill,
+                         entry.ambiguity, entry.contradiction))
+        _store_rows = rows
+    
+    return _store_rows
+
+
+class SliceWriter:
+
+    # Input: (1) the directory of the store; it is created if
+    # missing, and appended to otherwise. (2) The number of
+    # slices kept in memory between writes.
+    def __init__ (self, path, buffer_rows=65536):
+        self.path = path
+        self.buffer_rows = buffer_rows
+        if os.path.exists(os.path.join(path, 'header.json')):
+            self.rows = _read_header(path)['rows']
+        else:
+            os.makedirs(path, exist_ok=True)
+            self.rows = 0
+            _write_header(path, _store_header(0))
+        # Cut off what an interrupted write may have left.
+        for name, (code, dtype, width) in COLUMNS.items():
+            column_path = os.path.join(path, name + '.bin')
+            with open(column_path, 'ab') as column_file:
+                column_file.truncate(
+                    self.rows * width * array(code).itemsize)
+        self._buffers = {name: array(code)
+                         for name, (code, dtype, width) in COLUMNS.items()}
+        self._pending = 0
+    
+    # Add one slice.
+    
+    # Input: (1) a pitch set in pitch-class or MIDI-pitch
+    # numbers (or a PCSet, or a mask if "is_mask"). (2) Its time.
+    # (3) Its offset; by default, its number in the store.
+    def write (self, pitch_set, time=0.0, offset=None, is_mask=False):
+        mask = pitch_set if is_mask else pc_mask(pitch_set)
+        prime, vector, flags, ambiguity, contradiction = (
+            _analysis_rows()[mask])
+        buffers = self._buffers
+        buffers['mask'].append(mask)
+        buffers['offset'].append(
+            self.rows + self._pending if offset is None else offset)
+        buffers['time'].append(time)
+        buffers['prime'].append(prime)
+        buffers['vector'].extend(vector)
+        buffers['flags'].append(flags)
+        buffers['ambiguity'].append(ambiguity)
+        buffers['contradiction'].append(contradiction)
+        self._pending += 1
+        if self._pending >= self.buffer_rows:
+            self.flush()
+    
+    # Add slices as yielded by slice_notes: (time, pitches).
+    def extend (self, slices):
+        for time, pitches in slices:
+            self.write(pitches, time)
+    
+    # Append the buffered slices to the files, then record them
+    # in the header.
+    def flush (self):
+        if self._pending == 0:
+            return
+        _append_columns(self.path, self._buffers, sync=True)
+        self.rows += self._pending
+        self._pending = 0
+        _write_header(self.path, _store_header(self.rows))
+    
+    def close (self):
+        self.flush()
+    
+    def __enter__ (self):
+        return self
+    
+    def __exit__ (self, *exc_info):
+        self.close()
+    
+    def __len__ (self):
+        return self.rows + self._pending
+
+
+# Map a store for reading. Each column is an attribute: a
+# NumPy memmap (with "numpy" True; writable with mode 'r+'), or
+# otherwise a read-only memoryview of the mapped file, in the
+# machine's byte order (so on little-endian machines only). The
+# vector column has 6 values per slice: N x 6 as a memmap,
+# flat as a memoryview.
+
+class SliceReader:
+
+    def __init__ (self, path, numpy=True, mode='r'):
+        header = _read_header(path)
+        self.path = path
+        self.rows = header['rows']
+        self.numpy = numpy
+        self._maps = _map_columns(self, COLUMNS, ('vector',), mode)
+    
+    def __len__ (self):
+        return self.rows
+    
+    def close (self):
+        _unmap_columns(self, COLUMNS, self._maps)
+        self._maps = []
+    
+    def __enter__ (self):
+        return self
+    
+    def __exit__ (self, *exc_info):
+        self.close()
+    
+    # The numbers of the slices of the same set class as a
+    # given set: a NumPy array, or a list with "numpy" False.
+    def where_prime (self, pitch_set):
+        entry = set_class_table()[pc_mask(pitch_set)]
+        prime = 0 if entry is None else pc_mask(entry.prime)
+        if not self.numpy:
+            return [row for row, value in enumerate(self.prime)
+                    if value == prime]
+        import numpy as np
+        return np.flatnonzero(self.prime == prime)
+    
+    # The numbers of the slices containing all pitch classes of
+    # a given set: a NumPy array, or a list with "numpy" False.
+    def where_contains (self, pitch_set):
+        query = pc_mask(pitch_set)
+        if not self.numpy:
+            return [row for row, mask in enumerate(self.mask)
+                    if mask & query == query]
+        import numpy as np
+        return np.flatnonzero((self.mask & query) == query)
+
+
+# Recompute the analysis columns of a store from its masks, in
+# place and in blocks (e.g. after the analysis has changed).
+
+def reanalyze_store (path, block_rows=2**20):
+
+    import numpy as np
+    
+    rows = _analysis_rows()
+    prime = np.array([row[0] for row in rows], dtype='<u2')
+    vector = np.array([row[1] for row in rows], dtype='u1')
+    flags = np.array([row[2] for row in rows], dtype='u1')
+    ambiguity = np.array([row[3] for row in rows], dtype='u1')
+    contradiction = np.array([row[4] for row in rows], dtype='u1')
+    with SliceReader(path, mode='r+') as store:
+        for start in range(0, len(store), block_rows):
+            masks = np.asarray(store.mask[start:start+block_rows])
+            store.prime[start:start+block_rows] = prime[masks]
+            store.vector[start:start+block_rows] = vector[masks]
+            store.flags[start:start+block_rows] = flags[masks]
+            store.ambiguity[start:start+block_rows] = ambiguity[masks]
+            store.contradiction[start:start+block_rows] = contradiction[masks]
+        for name in COLUMNS:
+            column = getattr(store, name)
+            if hasattr(column, 'flush'):
+                column.flush()
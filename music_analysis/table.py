@@ -0,0 +1,85 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# This module includes the set-class lookup table.
+
+
+                    ### Set-class lookup table ###
+
+# There are only 4096 pitch-class subsets in the total
+# chromatic, so everything the analysis functions derive from
+# a set's pitch-class content is computed once for every
+# subset and stored in a table indexed by a 12-bit mask
+# (bit n set <=> pitch class n present).
+
+# Each entry stores: (1) the normal form; (2) the prime form;
+# (3) the transposition level t and (4) whether inversion is
+# involved, so that the normal form is T(t) or T(t)I of the
+# prime form; (5) the interval-class vector; (6) maximal
+# evenness and (7) Myhill's property; (8) the number of
+# ambiguities and (9) contradictions in the normal form.
+
+from collections import namedtuple
+
+from . import instrument
+from .pcset import pc_mask
+
+SetClassEntry = namedtuple('SetClassEntry', [
+    'normal', 'prime', 'transposition', 'inversion', 'vector',
+    'maximal_even', 'myhill', 'ambiguity', 'contradiction'])
+
+_set_class_table = None
+
+
+# Build the table. Entry 0 (the empty set) is None.
+
+def build_set_class_table ():
+    
+    from .set_class import _ic_vector, _normal_prime_form
+    from .spectrum import IntervalSpectrum
+    
+    table = [None]
+    for mask in range(1, 4096):
+        pc_set = [pc for pc in range(12) if mask >> pc & 1]
+        normal, prime = _normal_prime_form(pc_set)
+        
+        # Find the transposition level, checking T(t)
+        # before T(t)I for symmetrical sets.
+        inversion = False
+        t = normal[0]
+        if pc_mask([p+t for p in prime]) != mask:
+            inversion = True
+            t = normal[-1]
+        
+        # Evenness and complexity are read from one spectrum;
+        # neither depends on transposition or inversion.
+        spectrum = IntervalSpectrum(normal)
+        table.append(SetClassEntry(
+            tuple(normal), tuple(prime), t, inversion,
+            tuple(_ic_vector(prime)[1]), *spectrum.maximal_even(),
+            *spectrum.complexity_counts()))
+    
+    return table
+
+
+# Return the table, building it on first use.
+
+def set_class_table ():
+    
+    global _set_class_table
+    if _set_class_table is None:
+        started = instrument.clock() if instrument.enabled else None
+        _set_class_table = build_set_class_table()
+        if started is not None:
+            instrument.record_phase('set_class_table.build', started)
+    
+    return _set_class_table
+
+
+# Return the table entry of a given pitch set in pitch-class
+# or MIDI-pitch numbers; None for the empty set.
+
+def set_class_entry (pitch_set):
+    
+    return set_class_table()[pc_mask(pitch_set)]
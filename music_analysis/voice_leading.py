@@ -0,0 +1,271 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# This module includes the exact voice-leading calculator.
+
+
+                ### Exact voice-leading calculator ###
+
+# distance_vl_gm only tries the two or three transpositions
+# whose sum classes are closest to the reference's. The
+# functions below find the true minimum over every
+# transposition (or, against the perfectly even scale, over
+# the continuum of transpositions) and every ordering.
+
+# Sets of equal cardinality are compared, as in optimal_order,
+# by one-to-one voice leadings that keep the cyclic order of
+# the voices. Sets of unequal cardinality are compared by voice
+# leadings in which notes may be doubled: every member of
+# either set belongs to at least one voice. A minimal voice
+# leading of this kind can be taken free of voice crossings,
+# so it is a path through the grid of (tested member,
+# referential member) pairs that moves to the next member of
+# one set, the other or both at each step. It is found by
+# dynamic programming, once for every pair of starting members.
+
+# The voice-leading distance adds up the semitones moved by
+# every voice; the Euclidean distance is the square root of
+# the sum of their squares.
+
+# NumPy is imported only when these functions are called.
+
+from .instrument import instrumented
+from .pcset import pc_mask
+
+
+def _pc_list (pitch_set):
+
+    mask = pc_mask(pitch_set)
+    return [pc for pc in range(12) if mask >> pc & 1]
+
+
+# Distances of one-to-one voice leadings: the tested set is
+# given as all its transposed and rotated orderings (K x n),
+# the targets as an M x n array. Output: M distances.
+
+def _bijection_distances (np, orderings, targets, euclidean):
+
+    gaps = (targets[None, :, :] - orderings[:, None, :]) % 12
+    gaps = np.minimum(gaps, 12 - gaps)
+    if euclidean:
+        gaps = gaps * gaps
+    return gaps.sum(axis=2).min(axis=0)
+
+
+# Distances of voice leadings with doubling between a tested
+# set (n members) and an M x m array of targets, over the
+# given transpositions. Output: M distances.
+
+def _doubling_distances (np, pc_set, targets, transpositions, euclidean):
+
+    n = len(pc_set)
+    m = targets.shape[1]
+    
+    # Axes: transposition, starting member of the tested set,
+    # starting member of the target, target.
+    shift = np.asarray(transpositions)[:, None, None, None]
+    tested = [np.array([pc_set[(i+p)%n] for p in range(n)])[
+        None, :, None, None] for i in range(n)]
+    target = [np.stack([targets[:, (j+q)%m] for q in range(m)])[
+        None, None, :, :] for j in range(m)]
+    
+    # Cost of the voice (i, j): tested member i (after its
+    # starting member), transposed, to target member j.
+    def cost (i, j):
+        gap = (target[j] - tested[i] - shift) % 12
+        gap = np.minimum(gap, 12 - gap)
+        if euclidean:
+            return gap * gap
+        return gap
+    
+    # Each cell holds the cheapest path from the starting
+    # pair (0, 0) to the pair (i, j); two rows are kept.
+    above = None
+    for i in range(n):
+        row = []
+        for j in range(m):
+            if i == 0 and j == 0:
+                best = 0
+            elif i == 0:
+                best = row[j-1]
+            elif j == 0:
+                best = above[0]
+            else:
+                best = np.minimum(
+                    np.minimum(above[j], row[j-1]), above[j-1])
+            row.append(best + cost(i, j))
+        above = row
+    
+    return above[m-1].reshape(-1, targets.shape[0]).min(axis=0)
+
+
+# Group targets by cardinality, for repeated use with
+# _grouped_distances. Output: {cardinality: (indices of the
+# targets, array of their ascending pcs)}.
+
+def _group_targets (np, targets):
+    
+    groups = {}
+    for index, target in enumerate(targets):
+        target = _pc_list(target)
+        if not target:
+            raise ValueError('Target ' + str(index) + ' is empty')
+        groups.setdefault(len(target), ([], []))
+        groups[len(target)][0].append(index)
+        groups[len(target)][1].append(target)
+    
+    return {m: (np.array(indices), np.array(group))
+            for m, (indices, group) in groups.items()}
+
+
+# Squared (Euclidean) or plain distances from a tested pc set
+# to grouped targets; "size" is the number of targets.
+
+def _grouped_distances (np, pc_set, groups, size, transpositions,
+                        euclidean):
+    
+    n = len(pc_set)
+    orderings = np.array([
+        [(pc_set[(i+count)%n]+t)%12 for i in range(n)]
+        for t in transpositions for count in range(n)])
+    distances = np.zeros(size)
+    for m, (indices, group) in groups.items():
+        
+        # Work in chunks to bound the size of the arrays.
+        if m == n:
+            chunk = max(1, 2**20 // (len(orderings)*n))
+        else:
+            chunk = max(1, 2**18 // (len(transpositions)*n*m))
+        for start in range(0, len(group), chunk):
+            part = group[start:start+chunk]
+            if m == n:
+                result = _bijection_distances(
+                    np, orderings, part, euclidean)
+            else:
+                result = _doubling_distances(
+                    np, pc_set, part, transpositions, euclidean)
+            distances[indices[start:start+chunk]] = result
+    
+    return distances
+
+
+# Exact distances from one tested set to many targets.
+
+# Input: (1) a pitch set in pitch-class or MIDI-pitch numbers
+# (or a PCSet); it allows repetition of pitches or pitch
+# classes. (2) The targets: a sequence of such pitch sets, of
+# any cardinalities. (3) 'vl' for the voice-leading distance,
+# 'euclidean' for the Euclidean one. (4) Whether the tested set
+# may be transposed; if not, its pitch classes stay fixed.
+
+# Output: a NumPy array of the distances, one per target.
+
+@instrumented
+def voice_leading_distances (pitch_set, targets, metric='vl',
+                             transpose=True):
+    
+    import numpy as np
+    
+    if metric not in ('vl', 'euclidean'):
+        raise ValueError("metric must be 'vl' or 'euclidean'")
+    euclidean = metric == 'euclidean'
+    pc_set = _pc_list(pitch_set)
+    if not pc_set:
+        raise ValueError('The tested set is empty')
+    if transpose:
+        transpositions = list(range(12))
+    else:
+        transpositions = [0]
+    
+    targets = list(targets)
+    distances = _grouped_distances(
+        np, pc_set, _group_targets(np, targets), len(targets),
+        transpositions, euclidean)
+    
+    if euclidean:
+        return np.sqrt(distances)
+    return distances
+
+
+# Exact distance between a tested set and one target.
+
+# Input: as for voice_leading_distances, with a single target.
+
+# Output: the distance, rounded to three decimals.
+
+@instrumented
+def voice_leading_distance (pitch_set, target, metric='vl',
+                            transpose=True):
+    
+    distance = voice_leading_distances(
+        pitch_set, [target], metric, transpose)[0]
+    
+    return round(float(distance), 3)
+
+
+# Exact distance between a tested set and the perfectly even
+# scale of its cardinality, over the continuum of transpositions.
+
+# Pairing the members of the tested set, in ascending order,
+# with the members of the even scale transposed by s, each
+# voice moves by a_i - e_i - s, taken the short way round.
+# Between the values of s where some voice turns from moving
+# one way to the other (at a tritone), every displacement is
+# linear in s, so the total is minimized at the median (for
+# the voice-leading distance) or the mean (for the Euclidean
+# distance) of the displacements plus s, clamped to the
+# interval. Transposing the scale by one of its steps (12/n)
+# rotates the pairing, so s in [0, 12) covers every ordering.
+
+# Input: (1) a pitch set in pitch-class or MIDI-pitch numbers
+# (or a PCSet); it allows repetition of pitches or pitch
+# classes. (2) 'vl' or 'euclidean'.
+
+# Output: (1) the distance, rounded to three decimals. (2) The
+# transposition s of the even scale [0, 12/n, 24/n, ...]
+# realizing it.
+
+@instrumented
+def even_distance (pitch_set, metric='vl'):
+    
+    if metric not in ('vl', 'euclidean'):
+        raise ValueError("metric must be 'vl' or 'euclidean'")
+    pc_set = _pc_list(pitch_set)
+    n = len(pc_set)
+    if n == 0:
+        raise ValueError('The tested set is empty')
+    even = [12*i/n for i in range(n)]
+    
+    def displacements (s):
+        moves = []
+        for i in range(n):
+            move = (pc_set[i]-even[i]-s)%12
+            if move > 6:
+                move -= 12
+            moves.append(move)
+        return moves
+    
+    def total (s):
+        if metric == 'vl':
+            return sum(abs(move) for move in displacements(s))
+        return sum(move*move for move in displacements(s))**0.5
+    
+    # The values of s where some voice moves by a tritone.
+    cuts = sorted(set((pc_set[i]-even[i]+6)%12 for i in range(n)))
+    best = None
+    for k in range(len(cuts)):
+        low = cuts[k]
+        high = cuts[k+1] if k+1 < len(cuts) else cuts[0]+12
+        middle = (low+high)/2
+        offsets = sorted(move+middle for move in displacements(middle))
+        if metric == 'vl':
+            s = offsets[(n-1)//2]
+        else:
+            s = sum(offsets)/n
+        s = min(max(s, low), high)
+        distance = total(s%12)
+        if best is None or distance < best[0]:
+            best = (distance, s%12)
+    
+    return round(best[0], 3), round(best[1], 4)
@@ -0,0 +1,125 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# This module includes the sliding-window analyzer.
+
+
+                    ### Sliding-window analyzer ###
+
+# Slide a window of a fixed number of events over a melodic
+# stream (one pitch per event) or a harmonic one (a chord of
+# pitches per event). Instead of analyzing every window from
+# scratch, the analyzer keeps the number of sounding notes of
+# each pitch class and the 12-bit mask of the pitch classes
+# present: an event entering or leaving the window changes a
+# few counts, and a bit of the mask only when a count turns
+# from or to zero. The set-class table then gives the results
+# for the mask, and a window is reported only when its pitch-
+# class content differs from the last one reported.
+
+from collections import deque
+
+from .pcset import PCSet, _pc_bits
+from .table import set_class_table
+
+
+# Per-pitch-class counts and the running mask of a window.
+
+class PitchClassWindow:
+
+    __slots__ = ('counts', 'mask')
+    
+    def __init__ (self):
+        self.counts = [0]*12
+        self.mask = 0
+    
+    # Add a note; return True if its pitch class is new.
+    def add (self, pitch):
+        pc = pitch%12
+        self.counts[pc] += 1
+        if self.counts[pc] == 1:
+            self.mask |= _pc_bits[pc]
+            return True
+        return False
+    
+    # Remove a note; return True if its pitch class is gone.
+    def remove (self, pitch):
+        pc = pitch%12
+        self.counts[pc] -= 1
+        if self.counts[pc] == 0:
+            self.mask &= ~_pc_bits[pc]
+            return True
+        return False
+    
+    def pc_set (self):
+        return PCSet.from_mask(self.mask)
+
+
+def _event_pitches (event):
+
+    if isinstance(event, int):
+        return (event,)
+    try:
+        return tuple(event)
+    except TypeError:
+        return (event,)
+
+
+# Analyze every window of a stream.
+
+# Input: (1) the events: MIDI pitches or pitch classes, or
+# sequences of them (chords), in order. (2) The number of
+# events per window. (3) The number of events the window moves
+# at each step. (4) Whether only the windows whose pitch-class
+# content changed are reported.
+
+# Output: a generator of (start, entry), where start is the
+# index of the window's first event and entry is its
+# SetClassEntry (see table.py): normal and prime forms,
+# interval-class vector, evenness, and the numbers of
+# ambiguities and contradictions. Only full windows are
+# analyzed; windows without pitches are skipped.
+
+def slide_window (events, size, step=1, changes_only=True):
+
+    if size < 1 or step < 1:
+        raise ValueError('The window size and step must be positive')
+    table = set_class_table()
+    window = PitchClassWindow()
+    contents = deque()
+    last = None
+    for index, event in enumerate(events):
+        pitches = _event_pitches(event)
+        contents.append(pitches)
+        for pitch in pitches:
+            window.add(pitch)
+        if len(contents) > size:
+            for pitch in contents.popleft():
+                window.remove(pitch)
+        
+        start = index - size + 1
+        if start < 0 or start % step:
+            continue
+        mask = window.mask
+        if changes_only and mask == last:
+            continue
+        last = mask
+        entry = table[mask]
+        if entry is None:
+            continue
+        yield start, entry
+
+
+# Slide windows of several sizes over one stream.
+
+# Input: (1) the events, as for slide_window; they are read
+# once. (2) The window sizes. (3) As for slide_window.
+
+# Output: {size: list of the results of slide_window}.
+
+def window_sweep (events, sizes, step=1, changes_only=True):
+
+    events = list(events)
+    return {size: list(slide_window(events, size, step, changes_only))
+            for size in sizes}
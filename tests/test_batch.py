@@ -0,0 +1,47 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# Tests of the batch IC-vector and prime-form calculator.
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from music_analysis import (
+    PCSet, ic_vector, ic_vector_batch, normal_prime_form, pc_mask,
+    prime_form_batch)
+
+
+def test_batch_matches_single_functions ():
+
+    masks = np.arange(1, 4096)
+    vectors = ic_vector_batch(masks)
+    primes = prime_form_batch(masks)
+    for mask in range(1, 4096):
+        pc_set = PCSet.from_mask(mask).to_list()
+        assert list(vectors[mask-1]) == ic_vector(pc_set)[1]
+        assert primes[mask-1] == pc_mask(normal_prime_form(pc_set)[1])
+
+
+def test_padded_pitch_rows ():
+
+    rows = np.array([[60, 64, 67, -1], [0, 3, 7, 10], [-1, -1, -1, -1]])
+    assert list(prime_form_batch(rows)) == [
+        pc_mask([0, 3, 7]), pc_mask([0, 3, 5, 8]), 0]
+    assert list(prime_form_batch(rows, fill=10)[1:2]) == [pc_mask([0, 3, 7])]
+
+
+@pytest.mark.parametrize('empty', [[], np.array([]), np.zeros((0, 4))])
+def test_empty_input (empty):
+
+    assert ic_vector_batch(empty).shape == (0, 6)
+    assert prime_form_batch(empty).shape == (0,)
+
+
+def test_masks_out_of_range ():
+
+    with pytest.raises(ValueError):
+        ic_vector_batch([4096])
+    with pytest.raises(ValueError):
+        ic_vector_batch(np.zeros((2, 2, 2), dtype=int))
@@ -0,0 +1,37 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# Tests of the fast-path checks of the benchmark suite.
+
+import pytest
+
+from music_analysis import benchmark
+from music_analysis.spectrum import IntervalSpectrum
+
+
+def test_fast_paths_match_the_original_procedures ():
+
+    pytest.importorskip('numpy')
+    results = benchmark.verify_fast_paths(count=10)
+    assert results == {name: None for name in benchmark.VERIFICATIONS}
+
+
+def test_reference_procedures_are_the_original_ones ():
+
+    # The comprehensive case test of the original script.
+    test = [11, 0, 2, 3, 6, 7, 9]
+    assert benchmark._reference_normal_prime_form(test) == (
+        [6, 7, 9, 11, 0, 2, 3], [0, 1, 3, 4, 6, 8, 9])
+    assert test == [11, 0, 2, 3, 6, 7, 9]
+    assert benchmark._reference_ic_vector(test)[1] == [3, 3, 5, 4, 4, 2]
+    assert benchmark._reference_maximal_even(test) == (False, False)
+    complexity = benchmark._reference_detect_complexity(test)
+    assert complexity[1] == [True, 22] and complexity[3] == [False, 0]
+
+
+def test_a_broken_spectrum_is_caught (monkeypatch):
+
+    monkeypatch.setattr(IntervalSpectrum, 'rows', lambda self: [])
+    sets = [[0, 4, 7], [0, 2, 4, 5, 7, 9, 11]]
+    assert benchmark._check_tables(sets) == [0, 4, 7]
@@ -0,0 +1,158 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# Tests of the two-tier result cache.
+
+import gc
+import os
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from music_analysis import FUNCTION_VERSIONS, AnalysisCache
+from music_analysis import ComplexityResult, detect_complexity
+from music_analysis import distance_vl_gm, ic_vector, normal_prime_form
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _disk_hits (path, pitch_set=(0, 4, 7)):
+
+    with AnalysisCache(path=path) as cache:
+        assert cache.ic_vector(list(pitch_set)) == ic_vector(list(pitch_set))
+        return cache.stats()['disk_hits']
+
+
+def test_memory_hits_return_copies ():
+
+    cache = AnalysisCache(maxsize=2)
+    first = cache.normal_prime_form([60, 64, 67])
+    first[0].append(99)
+    assert cache.normal_prime_form([0, 4, 7]) == normal_prime_form([0, 4, 7])
+    cache.ic_vector([0, 1])
+    cache.ic_vector([0, 2])
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions']) == (1, 3, 1)
+
+
+def test_named_reference_keys ():
+
+    cache = AnalysisCache()
+    for reference in ('pentatonic', [0, 2, 4, 7, 9]):
+        assert (cache.distance_vl_gm([9, 11, 12, 4, 5], False, reference)
+                == distance_vl_gm([9, 11, 12, 4, 5], False, reference))
+    assert cache.stats()['misses'] == 2
+
+
+def test_input_kept_as_given ():
+
+    cache = AnalysisCache()
+    for pitch_set in ([0, 4, 7], (0, 4, 7), [60, 64, 67]):
+        result = cache.detect_complexity(pitch_set, False)
+        assert result == detect_complexity(pitch_set, False)
+        assert type(result[0]) is type(pitch_set)
+    assert cache.stats()['misses'] == 3
+    # The pc mask is enough once the set is normalized.
+    cache.detect_complexity((0, 4, 7), True)
+    assert cache.detect_complexity([60, 64, 67], True) == detect_complexity(
+        [60, 64, 67], True)
+    assert cache.stats()['hits'] == 1
+
+
+def test_counts_only_complexity (tmp_path):
+
+    path = str(tmp_path / 'results.sqlite')
+    scale = [0, 2, 4, 5, 7, 9, 11]
+    with AnalysisCache(path=path) as cache:
+        full = cache.detect_complexity(scale, True)
+        counts = cache.call('detect_complexity', scale, True, counts_only=True)
+        assert full == detect_complexity(scale, True)
+        assert isinstance(counts, ComplexityResult)
+        assert cache.detect_complexity(scale, True, True).as_tuple() == full
+        assert cache.stats()['misses'] == 2
+    with AnalysisCache(path=path) as cache:
+        counts = cache.detect_complexity(scale, True, counts_only=True)
+        assert cache.stats()['disk_hits'] == 1
+        assert counts.as_tuple() == full
+
+
+def test_persistence_across_close (tmp_path):
+
+    path = str(tmp_path / 'results.sqlite')
+    assert _disk_hits(path) == 0
+    assert _disk_hits(path) == 1
+
+
+def test_pending_written_when_collected (tmp_path):
+
+    path = str(tmp_path / 'results.sqlite')
+    cache = AnalysisCache(path=path, batch=1000)
+    cache.ic_vector([0, 4, 7])
+    del cache
+    gc.collect()
+    assert _disk_hits(path) == 1
+
+
+def test_pending_written_at_exit (tmp_path):
+
+    path = str(tmp_path / 'results.sqlite')
+    code = ('from music_analysis import AnalysisCache\n'
+            'cache = AnalysisCache(path=' + repr(path) + ', batch=1000)\n'
+            'cache.ic_vector([0, 4, 7])\n')
+    subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True)
+    assert _disk_hits(path) == 1
+
+
+def test_database_modules_imported_on_use (tmp_path):
+
+    path = str(tmp_path / 'results.sqlite')
+    code = ('import sys\n'
+            'from music_analysis import AnalysisCache\n'
+            'loaded = lambda: [name in sys.modules for name in '
+            '("sqlite3", "multiprocessing")]\n'
+            'cache = AnalysisCache()\n'
+            'cache.ic_vector([0, 4, 7])\n'
+            'print(*loaded())\n'
+            'AnalysisCache(path=' + repr(path) + ').ic_vector([0, 4, 7])\n'
+            'print(*loaded())\n')
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.split() == ['False', 'False', 'True', 'True']
+
+
+_worker_cache = None
+
+
+def _init_worker (path):
+
+    global _worker_cache
+    _worker_cache = AnalysisCache(path=path, batch=1000)
+
+
+def _work (pitch_set):
+
+    return _worker_cache.ic_vector(pitch_set)
+
+
+def test_pending_written_by_pool_workers (tmp_path):
+
+    path = str(tmp_path / 'results.sqlite')
+    sets = [[0, 4, 7], [0, 3, 7], [0, 1, 2]]
+    with ProcessPoolExecutor(2, initializer=_init_worker,
+                             initargs=(path,)) as pool:
+        assert list(pool.map(_work, sets)) == [ic_vector(s) for s in sets]
+    for pitch_set in sets:
+        assert _disk_hits(path, pitch_set) == 1
+
+
+def test_stale_versions (tmp_path, monkeypatch):
+
+    path = str(tmp_path / 'results.sqlite')
+    assert _disk_hits(path) == 0
+    monkeypatch.setitem(FUNCTION_VERSIONS, 'ic_vector', 2)
+    assert _disk_hits(path) == 0
+    assert _disk_hits(path) == 1
+    monkeypatch.setitem(FUNCTION_VERSIONS, 'ic_vector', 3)
+    with AnalysisCache(path=path) as cache:
+        assert cache.purge_stale() == 1
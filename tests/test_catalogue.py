@@ -0,0 +1,64 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# Tests of the set-class catalogue.
+
+from itertools import combinations
+
+import pytest
+
+from music_analysis import SetClassCatalogue, SliceWriter, ic_vector
+from music_analysis import maximal_even_edo
+from music_analysis import normal_prime_form_edo, set_class_catalogue
+from music_analysis import write_catalogue
+
+
+def _brute_force_primes (c, d):
+
+    primes = set(tuple(normal_prime_form_edo(list(subset), c)[1])
+                 for subset in combinations(range(c), d))
+    return sorted(primes, key=lambda prime: (c - prime[-1], prime))
+
+
+def test_catalogue_against_brute_force ():
+
+    for c in (7, 10, 12, 13, 19):
+        for d in range(1, (c if c <= 13 else 6) + 1):
+            entries = list(set_class_catalogue(c, d))
+            assert ([entry.prime for entry in entries]
+                    == _brute_force_primes(c, d)), (c, d)
+            for entry in entries:
+                assert (entry.maximal_even, entry.myhill) == tuple(
+                    maximal_even_edo(entry.prime, c))
+    for entry in set_class_catalogue(12, 4):
+        assert list(entry.vector) == ic_vector(list(entry.prime))[1]
+    with pytest.raises(ValueError):
+        list(set_class_catalogue(12, 0))
+
+
+@pytest.mark.parametrize('numpy', [True, False])
+def test_catalogue_round_trip (tmp_path, numpy):
+
+    path = str(tmp_path / '19-6.catalogue')
+    entries = list(set_class_catalogue(19, 6))
+    assert write_catalogue(path, 19, 6, buffer_rows=7) == len(entries)
+    with SetClassCatalogue(path, numpy=numpy) as catalogue:
+        assert len(catalogue) == len(entries)
+        for row, entry in enumerate(entries):
+            assert catalogue.entry(row) == entry
+            transposed = [(pitch+5) % 19 for pitch in entry.prime]
+            assert catalogue.find(transposed) == row
+        assert catalogue.find([0, 1, 2]) is None
+
+
+def test_empty_catalogue_and_wrong_directory (tmp_path):
+
+    path = str(tmp_path / 'empty.catalogue')
+    write_catalogue(path, 5, 5)
+    with SetClassCatalogue(path) as catalogue:
+        assert len(catalogue) == 1
+    store = str(tmp_path / 'corpus.slices')
+    SliceWriter(store).close()
+    with pytest.raises(ValueError, match='Not a set-class catalogue'):
+        SetClassCatalogue(store)
@@ -0,0 +1,102 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# Tests of the command-line interface and of the package's
+# import-time work.
+
+import io
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from music_analysis import detect_complexity, distance_vl_gm, ic_vector
+from music_analysis import maximal_even, normal_prime_form
+from music_analysis.cli import main
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run (capsys, *argv):
+
+    status = main(list(argv))
+    out, err = capsys.readouterr()
+    return status, out.splitlines(), err
+
+
+def test_fields (capsys):
+
+    status, lines, _ = _run(capsys, '--json', '60,64,67', '0 1 4 6')
+    assert status == 0
+    for line, pitch_set in zip(lines, ([60, 64, 67], [0, 1, 4, 6])):
+        result = json.loads(line)
+        normal, prime = normal_prime_form(pitch_set)
+        complexity = detect_complexity(pitch_set, True)
+        assert result == {
+            'set': pitch_set, 'normal': normal, 'prime': prime,
+            'vector': ic_vector(pitch_set)[1],
+            'maximal_even': maximal_even(pitch_set)[0],
+            'myhill': maximal_even(pitch_set)[1],
+            'ambiguity': complexity[1][1],
+            'contradiction': complexity[3][1]}
+    status, lines, _ = _run(capsys, '0,4,7')
+    assert lines == ['[0, 4, 7]\t[0, 4, 7]\t[0, 3, 7]\t[0, 0, 1, 1, 1, 0]'
+                     '\tFalse\tFalse\t0\t0']
+
+
+def test_reference (capsys):
+
+    _, lines, _ = _run(capsys, '--json', '--reference', 'diatonic',
+                       '0,2,4,5,7,9,11', '0,4,7', '5')
+    results = [json.loads(line) for line in lines]
+    expected = distance_vl_gm([0, 2, 4, 5, 7, 9, 11], False, 'diatonic')
+    assert [results[0]['distance_vl'], results[0]['distance_gm']] == list(
+        expected[2:])
+    # Undefined distances are None, with nothing printed.
+    assert results[1]['distance_vl'] is None
+    assert results[2]['distance_gm'] is None
+    _, lines, _ = _run(capsys, '--json', '--reference', 'even', '0,4,8')
+    assert json.loads(lines[0])['distance_vl'] == distance_vl_gm(
+        [0, 4, 8], True, None)[2]
+
+
+def test_negative_numbers (capsys):
+
+    status, lines, err = _run(capsys, '--json', '-1,0', '-5 2', '-1', '3,-2')
+    assert status == 0 and err == ''
+    assert [json.loads(line)['set'] for line in lines] == [
+        [-1, 0], [-5, 2], [-1], [3, -2]]
+    assert json.loads(lines[0])['prime'] == [0, 1]
+
+
+def test_standard_input_and_errors (capsys, monkeypatch):
+
+    monkeypatch.setattr(sys, 'stdin', io.StringIO('0,4,7\n\nC E G\n0 3 7\n'))
+    status, lines, err = _run(capsys)
+    assert status == 1
+    assert [line.split('\t')[0] for line in lines] == ['[0, 4, 7]',
+                                                       '[0, 3, 7]']
+    assert "set 3: cannot read 'C E G'" in err
+    with pytest.raises(SystemExit):
+        main(['--reference', 'nothing', '0,4,7'])
+
+
+def test_module_entry_point ():
+
+    result = subprocess.run(
+        [sys.executable, '-m', 'music_analysis', '--json', '-1,3,7'],
+        cwd=ROOT, capture_output=True, text=True, check=True)
+    assert json.loads(result.stdout)['normal'] == [3, 7, 11]
+
+
+def test_import_does_no_work ():
+
+    code = ('import sys, music_analysis\n'
+            'from music_analysis import table\n'
+            'print(table._set_class_table is None, "numpy" in sys.modules)')
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.split() == ['True', 'False']
@@ -0,0 +1,186 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# Tests of the corpus clustering tools.
+
+import json
+import os
+import random
+
+import numpy as np
+import pytest
+
+from music_analysis import build_distance_file, cluster_labels, k_medoids
+from music_analysis import linkage, open_distance_file
+from music_analysis import voice_leading_distance
+from music_analysis.clustering import condensed_index, distance_row
+
+
+def _random_corpus (count, seed):
+
+    rng = random.Random(seed)
+    return [rng.sample(range(48, 72), rng.randint(2, 6)) for _ in range(count)]
+
+
+# A distance file holding the given condensed matrix.
+
+def _distance_file (path, condensed, n):
+
+    np.asarray(condensed, dtype=np.float32).tofile(path)
+    with open(path + '.json', 'w') as header_file:
+        json.dump({'n': n, 'metric': 'vl', 'transpose': True,
+                   'dtype': 'float32', 'sets': '', 'rows': n-1},
+                  header_file)
+    return path
+
+
+# Agglomerative clustering as defined: merge the two closest
+# clusters, with the distance of two clusters taken from the
+# original matrix. Returns the heights and the partitions.
+
+def _naive_linkage (full, method):
+
+    clusters = [[i] for i in range(len(full))]
+    heights = []
+    partitions = [sorted(map(tuple, clusters))]
+    combine = {'single': np.min, 'complete': np.max,
+               'average': np.mean}[method]
+    while len(clusters) > 1:
+        best = None
+        for x in range(len(clusters)):
+            for y in range(x+1, len(clusters)):
+                distance = combine(full[np.ix_(clusters[x], clusters[y])])
+                if best is None or distance < best[0]:
+                    best = (distance, x, y)
+        distance, x, y = best
+        clusters[x] = sorted(clusters[x] + clusters.pop(y))
+        heights.append(distance)
+        partitions.append(sorted(map(tuple, clusters)))
+    return heights, partitions
+
+
+def _partition (labels):
+
+    groups = {}
+    for i, label in enumerate(labels):
+        groups.setdefault(int(label), []).append(i)
+    return sorted(map(tuple, groups.values()))
+
+
+def test_distance_file (tmp_path):
+
+    pitch_sets = _random_corpus(30, 0) + [[60, 64, 67], [0, 4, 7]]
+    n = len(pitch_sets)
+    for metric, transpose in (('vl', True), ('euclidean', False)):
+        path = str(tmp_path / (metric + '.distances'))
+        matrix = build_distance_file(pitch_sets, path, metric, transpose,
+                                     block_rows=7)
+        assert len(matrix) == n*(n-1)//2
+        for i in range(n):
+            row = distance_row(matrix, n, i)
+            assert row[i] == 0
+            for j in range(n):
+                if i != j:
+                    assert row[j] == matrix[condensed_index(n, i, j)]
+                    assert row[j] == pytest.approx(voice_leading_distance(
+                        pitch_sets[i], pitch_sets[j], metric, transpose),
+                        abs=0.001)
+    with pytest.raises(ValueError):
+        build_distance_file([[0, 4, 7], []], str(tmp_path / 'empty'))
+
+
+def test_distance_file_resumes (tmp_path):
+
+    pitch_sets = _random_corpus(20, 1)
+    path = str(tmp_path / 'corpus.distances')
+    expected = np.array(build_distance_file(pitch_sets, path, block_rows=5))
+
+    # An interrupted run: the rows after the fifth are unfinished.
+    with open(path + '.json') as header_file:
+        header = json.load(header_file)
+    header['rows'] = 5
+    with open(path + '.json', 'w') as header_file:
+        json.dump(header, header_file)
+    with pytest.raises(ValueError):
+        open_distance_file(path)
+    matrix = np.memmap(path, dtype=np.float32, mode='r+')
+    start = condensed_index(20, 5, 6)
+    matrix[start:] = -1
+    matrix.flush()
+    assert np.array_equal(build_distance_file(pitch_sets, path), expected)
+
+    # Other sets or options start again.
+    assert not np.array_equal(
+        build_distance_file(pitch_sets, path, transpose=False), expected)
+    assert np.array_equal(build_distance_file(pitch_sets, path), expected)
+
+
+@pytest.mark.parametrize('method', ['single', 'complete', 'average'])
+def test_linkage_against_the_definition (tmp_path, method):
+
+    rng = np.random.default_rng(2)
+    n = 25
+    full = rng.random((n, n)).astype(np.float32)
+    full = np.triu(full, 1) + np.triu(full, 1).T
+    condensed = full[np.triu_indices(n, 1)]
+    path = _distance_file(str(tmp_path / 'random.distances'), condensed, n)
+    result = linkage(path, method)
+    assert not os.path.exists(path + '.work')
+
+    heights, partitions = _naive_linkage(full.astype(np.float64), method)
+    assert result.shape == (n-1, 4)
+    assert result[:, 2] == pytest.approx(heights)
+    for k in range(1, n+1):
+        assert _partition(cluster_labels(result, k)) == partitions[n-k]
+    assert set(cluster_labels(result, 4).tolist()) == {0, 1, 2, 3}
+
+
+@pytest.mark.parametrize('method', ['single', 'complete', 'average'])
+def test_linkage_ties_as_in_scipy (tmp_path, method):
+
+    hierarchy = pytest.importorskip('scipy.cluster.hierarchy')
+    for seed in range(5):
+        pitch_sets = _random_corpus(40, seed)
+        path = str(tmp_path / 'corpus.distances')
+        matrix = build_distance_file(pitch_sets, path)
+        expected = hierarchy.linkage(np.array(matrix, dtype=np.float64),
+                                     method)
+        assert np.array_equal(linkage(path, method), expected)
+
+
+def test_linkage_errors (tmp_path):
+
+    path = str(tmp_path / 'corpus.distances')
+    build_distance_file(_random_corpus(5, 3), path)
+    with pytest.raises(ValueError):
+        linkage(path, 'ward')
+
+
+def test_k_medoids (tmp_path):
+
+    # Three groups of sets around a triad, a fourth chord and a
+    # whole-tone scale.
+    pitch_sets = ([[0, 4, 7], [0, 4, 8], [0, 3, 7], [1, 4, 7]]
+                  + [[0, 5, 10], [0, 5, 11], [1, 6, 11], [0, 5, 10, 3]]
+                  + [[0, 2, 4, 6, 8, 10], [0, 2, 4, 6, 8], [0, 2, 4, 6]])
+    n = len(pitch_sets)
+    path = str(tmp_path / 'corpus.distances')
+    matrix = build_distance_file(pitch_sets, path, transpose=False)
+    rows = np.array([distance_row(matrix, n, i) for i in range(n)])
+    for k in (1, 3, n):
+        medoids, labels, total = k_medoids(path, k, seed=4)
+        assert len(set(medoids)) == k
+        assert labels.tolist() == rows[medoids].argmin(axis=0).tolist()
+        assert total == pytest.approx(rows[medoids].min(axis=0).sum())
+        # Every medoid is the best centre of its cluster.
+        for c, medoid in enumerate(medoids):
+            members = np.flatnonzero(labels == c)
+            costs = rows[np.ix_(members, members)].sum(axis=1)
+            assert rows[medoid, members].sum() == costs.min()
+        assert k_medoids(path, k, seed=4)[0] == medoids
+    assert k_medoids(path, n)[2] == 0
+    with pytest.raises(ValueError):
+        k_medoids(path, 0)
+    with pytest.raises(ValueError):
+        k_medoids(path, n+1)
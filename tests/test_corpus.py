@@ -0,0 +1,71 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# Tests of the parallel corpus analyzer.
+
+import pathlib
+
+import pytest
+
+from music_analysis import analyze_corpus, analyze_midi, distance_vl_gm
+from music_analysis.corpus import _analyze_chunk
+
+from test_midi import _off, _on, _track, _write_midi
+
+
+SETS = [[0, 4, 7], [60, 63, 67], [], [0, 2, 4, 5, 7, 9, 11], [1]] * 7
+
+
+def test_sets_in_chunks ():
+
+    results, counts = analyze_corpus(SETS, workers=2, chunk_size=3)
+    assert results == _analyze_chunk(SETS, True, None)[0]
+    assert results[0][:2] == ([0, 4, 7], [0, 3, 7])
+    assert results[0][5:] == tuple(distance_vl_gm([0, 4, 7], True, None)[2:])
+    assert results[2] is None
+    assert counts['sets'] == 28
+    assert counts['set_classes'][(0, 3, 7)] == 14
+
+
+def test_generator_source_and_counts_only ():
+
+    results, counts = analyze_corpus(
+        (s for s in SETS), False, 'diatonic', workers=1, chunk_size=4,
+        keep_results=False)
+    assert results is None
+    assert counts['distance_vl'][0] == 7
+
+
+def test_unknown_reference ():
+
+    with pytest.raises(ValueError, match='no_such_scale'):
+        analyze_corpus(SETS, False, 'no_such_scale', workers=1)
+
+
+def _write_corpus (directory):
+
+    _write_midi(directory / 'b.mid', [_track([
+        (0, _on(60)), (0, _on(64)), (0, _on(67)), (0, _on(37, 9)),
+        (480, _off(60)), (0, _off(64)), (0, _off(67)), (0, _off(37, 9))])])
+    _write_midi(directory / 'a.MIDI', [_track([
+        (0, _on(62)), (480, _off(62)), (0, _on(65)), (480, _off(65))])])
+    (directory / 'notes.txt').write_text('not a MIDI file')
+
+
+@pytest.mark.parametrize('as_path', [False, True])
+def test_midi_directory (tmp_path, as_path):
+
+    _write_corpus(tmp_path)
+    source = tmp_path if as_path else str(tmp_path)
+    results, counts = analyze_corpus(source, workers=2, chunk_size=1)
+    assert [pathlib.Path(path).name for path, _ in results] == [
+        'a.MIDI', 'b.mid']
+    assert [time for time, _ in results[0][1]] == [0.0, 1.0]
+    assert results[1][1][0][1][0] == [0, 4, 7]
+    assert counts['sets'] == 3
+    
+    # The percussion channel is skipped unless asked otherwise.
+    results = analyze_corpus(source, workers=1, skip_channels=())[0]
+    expected = list(analyze_midi(tmp_path / 'b.mid', skip_channels=()))
+    assert results[1][1][0][1][0] == expected[0][2][0] == [0, 1, 4, 7]
@@ -0,0 +1,116 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# Tests of the inclusion and Z-relation index against queries
+# over the whole corpus.
+
+import random
+
+from music_analysis import CorpusIndex, PCSet, ic_vector, normal_prime_form
+
+
+def _pcs (pitch_set):
+
+    return frozenset(pitch % 12 for pitch in pitch_set)
+
+
+def _prime (pitch_set):
+
+    if not _pcs(pitch_set):
+        return ()
+    return tuple(normal_prime_form(list(pitch_set))[1])
+
+
+def _forms (pitch_set):
+
+    pcs = _pcs(pitch_set)
+    return [frozenset((sign*pc + t) % 12 for pc in pcs)
+            for t in range(12) for sign in (1, -1)]
+
+
+def _corpus (count, seed):
+
+    rng = random.Random(seed)
+    return [[rng.randrange(36, 96) for _ in range(rng.randint(0, 7))]
+            for _ in range(count)]
+
+
+# Every set class, by prime form, with its interval-class vector.
+_ALL_CLASSES = {}
+for _mask in range(1, 4096):
+    _set = [pc for pc in range(12) if _mask >> pc & 1]
+    _ALL_CLASSES[_prime(_set)] = tuple(ic_vector(_set)[1])
+
+
+def _z_related (prime, primes):
+
+    return sorted(list(other) for other in set(primes)
+                  if prime and other and other != prime
+                  and _ALL_CLASSES[other] == _ALL_CLASSES[prime])
+
+
+def test_queries_against_brute_force ():
+
+    corpus = _corpus(400, 0)
+    index = CorpusIndex(corpus[:200])
+    for pitch_set in corpus[200:]:
+        index.add(PCSet(pitch_set) if len(pitch_set) % 2 else pitch_set)
+    assert len(index) == 400
+    contents = [_pcs(pitch_set) for pitch_set in corpus]
+    primes = [_prime(pitch_set) for pitch_set in corpus]
+    queries = [[], [0, 4, 7], [0, 1, 4, 6], [0, 1, 3, 7]] + _corpus(80, 2)
+    for query in queries:
+        pcs = _pcs(query)
+        numbers = range(len(corpus))
+        assert index.slices(query) == [
+            i for i in numbers if contents[i] == pcs]
+        assert index.slices_of_class(query) == [
+            i for i in numbers if primes[i] == _prime(query)]
+        assert index.containing(query) == [
+            i for i in numbers
+            if any(form <= contents[i] for form in _forms(query))]
+        for proper in (False, True):
+            assert index.supersets(query, proper) == [
+                i for i in numbers if pcs <= contents[i]
+                and not (proper and pcs == contents[i])]
+            assert index.subsets(query, proper) == [
+                i for i in numbers if contents[i] <= pcs
+                and not (proper and pcs == contents[i])]
+        prime = _prime(query)
+        assert sorted(index.z_related(query)) == _z_related(prime, primes)
+        assert sorted(index.z_related(query, False)) == _z_related(
+            prime, _ALL_CLASSES)
+
+
+def test_set_classes_and_z_groups ():
+
+    corpus = _corpus(300, 3) + [[0, 1, 4, 6], [0, 1, 3, 7], [0, 4, 7]]
+    index = CorpusIndex(corpus)
+    counts = {}
+    for pitch_set in corpus:
+        prime = _prime(pitch_set)
+        counts[prime] = counts.get(prime, 0) + 1
+    assert index.set_classes() == counts
+    assert list(index.set_classes()) == list(counts)
+
+    groups = {}
+    for prime in counts:
+        if prime:
+            groups.setdefault(_ALL_CLASSES[prime], []).append(list(prime))
+    assert index.z_groups() == sorted(
+        [sorted(group) for group in groups.values() if len(group) > 1],
+        key=lambda group: (len(group[0]), group))
+    assert [[0, 1, 3, 7], [0, 1, 4, 6]] in index.z_groups()
+
+
+def test_empty_index ():
+
+    index = CorpusIndex()
+    assert len(index) == 0
+    assert index.slices([0, 4, 7]) == index.containing([0, 4, 7]) == []
+    assert index.set_classes() == {} and index.z_groups() == []
+    assert index.z_related([0, 1, 4, 6]) == []
+    assert index.z_related([0, 1, 4, 6], in_corpus=False) == [[0, 1, 3, 7]]
+    assert index.add([60, 64, 67]) == 0
+    assert index.slices_of_class([2, 5, 9]) == [0]
@@ -0,0 +1,75 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# Tests of the DFT calculator.
+
+import importlib
+
+import numpy as np
+import pytest
+
+from music_analysis import dft, dft_batch, dft_evenness_batch
+from music_analysis import dft_lower_bounds, dft_prefilter, dft_evenness
+from music_analysis import normal_prime_form, set_class_dft_table
+from music_analysis import voice_leading_distance
+
+# The module, which the function dft hides in the package.
+dft_module = importlib.import_module('music_analysis.dft')
+
+_MASKS = np.arange(4096)
+
+
+def _pcs (mask):
+
+    return [pc for pc in range(12) if mask >> pc & 1]
+
+
+def test_against_numpy_fft ():
+
+    magnitudes, phases = dft_batch(_MASKS)
+    bits = ((_MASKS[:, None] >> np.arange(12)) & 1).astype(float)
+    expected = np.fft.fft(bits, axis=1)[:, :7]
+    assert np.allclose(magnitudes, np.abs(expected))
+    for mask in range(0, 4096, 37):
+        single = dft(_pcs(mask))
+        assert np.allclose(single[0], magnitudes[mask])
+        assert np.allclose(single[1], phases[mask])
+    assert np.allclose(dft_evenness_batch(_MASKS),
+                       [dft_evenness(_pcs(mask)) for mask in range(4096)])
+
+
+def test_set_class_table_is_built_once (monkeypatch):
+
+    monkeypatch.setattr(dft_module, '_set_class_dft_table', None)
+    calls = []
+    original = dft_module.dft
+    monkeypatch.setattr(dft_module, 'dft',
+                        lambda pitch_set: calls.append(1) or original(
+                            pitch_set))
+    table = set_class_dft_table()
+    assert len(calls) == len(table) == 223
+    assert set_class_dft_table() is table
+    assert len(calls) == 223
+    for mask in range(1, 4096, 11):
+        prime = tuple(normal_prime_form(_pcs(mask))[1])
+        assert np.allclose(table[prime][0], original(_pcs(mask))[0])
+
+
+def test_lower_bounds ():
+
+    rng = np.random.default_rng(0)
+    for metric in ('vl', 'euclidean'):
+        for mask in rng.integers(1, 4096, 20).tolist():
+            others = rng.integers(1, 4096, 200)
+            bounds = dft_lower_bounds(_pcs(mask), others, metric)
+            for other, bound in zip(others.tolist(), bounds):
+                if bin(other).count('1') != bin(mask).count('1'):
+                    assert bound == np.inf
+                    continue
+                assert bound <= voice_leading_distance(
+                    _pcs(mask), _pcs(other), metric) + 0.001
+            kept = dft_prefilter(_pcs(mask), others, 2, metric)
+            assert all(bounds[i] <= 2 + 1e-9 for i in kept)
+    with pytest.raises(ValueError):
+        dft_lower_bounds([0, 4, 7], [1], 'manhattan')
@@ -0,0 +1,91 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# Tests of the maximal-evenness engine for any universe.
+
+import random
+from itertools import combinations
+from math import gcd
+
+import pytest
+
+from music_analysis import enumerate_maximal_even, j_function, maximal_even
+from music_analysis import maximal_even_edo, maximal_even_sets
+from music_analysis import normal_prime_form
+
+
+# The definition: every generic interval spans one or two
+# adjacent specific intervals (maximal evenness), exactly two
+# for Myhill's property.
+
+def _brute_force (pc_set, c):
+
+    d = len(pc_set)
+    sizes = [set((pc_set[(i+k) % d] - pc_set[i]) % c for i in range(d))
+             for k in range(1, d)]
+    even = all(max(size) - min(size) <= 1 for size in sizes)
+    return even, even and all(len(size) == 2 for size in sizes)
+
+
+def test_against_the_definition ():
+
+    for c in range(1, 14):
+        for d in range(1, c+1):
+            for pc_set in combinations(range(c), d):
+                assert maximal_even_edo(list(pc_set), c) == _brute_force(
+                    pc_set, c), (c, pc_set)
+
+
+def test_unsorted_and_repeated_pitches ():
+
+    rng = random.Random(0)
+    for _ in range(500):
+        c = rng.randint(5, 31)
+        pitch_set = [rng.randrange(-40, 100) for _ in range(rng.randint(1, 9))]
+        pcs = sorted(set(pitch % c for pitch in pitch_set))
+        assert maximal_even_edo(pitch_set, c) == _brute_force(pcs, c)
+        assert maximal_even_edo(tuple(pitch_set), c) == _brute_force(pcs, c)
+    assert maximal_even_edo([], 12) == (False, False)
+
+
+def test_equals_maximal_even ():
+
+    for mask in range(1, 4096):
+        pc_set = [pc for pc in range(12) if mask >> pc & 1]
+        assert tuple(maximal_even_edo(pc_set)) == tuple(maximal_even(pc_set))
+
+
+def test_maximal_even_sets ():
+
+    assert j_function(12, 7) == [0, 1, 3, 5, 6, 8, 10]
+    assert j_function(12, 5, 3) == [0, 3, 5, 7, 10]
+    for c in range(1, 14):
+        for d in range(1, c+1):
+            sets = maximal_even_sets(c, d)
+            assert len(sets) == c // gcd(c, d)
+            assert sorted(map(tuple, sets)) == sorted(
+                pc_set for pc_set in combinations(range(c), d)
+                if _brute_force(pc_set, c)[0])
+            # In order of their parameter m.
+            firsts = [next(m for m in range(c) if j_function(c, d, m) == s)
+                      for s in sets]
+            assert firsts == sorted(firsts)
+    for c, d in ((12, 0), (12, 13), (5, -1)):
+        with pytest.raises(ValueError):
+            j_function(c, d)
+
+
+def test_enumerate ():
+
+    found = list(enumerate_maximal_even(range(5, 9)))
+    assert [(c, d) for c, d, _ in found] == [
+        (c, d) for c in range(5, 9) for d in range(1, c+1)]
+    assert all(me_set == j_function(c, d) for c, d, me_set in found)
+    found = list(enumerate_maximal_even([6, 12], [0, 4, 7, 13], True))
+    assert found == ([(6, 4, s) for s in maximal_even_sets(6, 4)]
+                     + [(12, 4, s) for s in maximal_even_sets(12, 4)]
+                     + [(12, 7, s) for s in maximal_even_sets(12, 7)])
+    # For c = 12, the set with m = 0 is the prime form.
+    for _, _, me_set in enumerate_maximal_even([12]):
+        assert normal_prime_form(me_set)[1] == me_set
@@ -0,0 +1,93 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# Tests that the analysis functions take any integer sequence
+# read-only: tuples, arrays, memoryviews and NumPy arrays and
+# views, read-only ones included, are left as they were.
+
+import contextlib
+import io
+import random
+from array import array
+
+import numpy as np
+
+from music_analysis import PCSet, detect_complexity, distance_vl_gm
+from music_analysis import ic_vector, interval_matrix, maximal_even
+from music_analysis import maximal_even_edo, nearest_scales
+from music_analysis import normal_prime_form, optimal_order, pc_mask
+from music_analysis import voice_leading_distance
+
+
+# Every way of passing a set: a list, a tuple, arrays, a
+# memoryview, and NumPy arrays and strided views of several
+# widths, the NumPy ones read-only.
+
+def _forms (pitch_set):
+
+    forms = [list(pitch_set), tuple(pitch_set), array('b', pitch_set),
+             array('H', pitch_set), memoryview(array('h', pitch_set))]
+    numpy_forms = [np.array(pitch_set, dtype=np.uint8),
+                   np.array(pitch_set, dtype=np.int16),
+                   np.array(pitch_set, dtype=np.int64),
+                   np.repeat(np.array(pitch_set, dtype=np.uint16), 3)[::3],
+                   np.array(pitch_set, dtype=np.int32)[::-1][::-1]]
+    for form in numpy_forms:
+        form.flags.writeable = False
+    return forms + numpy_forms
+
+
+def _analyses (pitch_set, pcs, ref):
+
+    return (normal_prime_form(pitch_set), ic_vector(pitch_set),
+            maximal_even(pitch_set), maximal_even_edo(pitch_set),
+            maximal_even_edo(pitch_set, 19), interval_matrix(pcs),
+            detect_complexity(pitch_set, True), pc_mask(pitch_set),
+            PCSet(pitch_set), optimal_order(pcs, ref, True),
+            distance_vl_gm(pitch_set, True, None),
+            distance_vl_gm(pitch_set, False, ref),
+            voice_leading_distance(pitch_set, ref),
+            nearest_scales(pitch_set, 2))
+
+
+def test_results_and_inputs_unchanged ():
+
+    rng = random.Random(0)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(150):
+            pitch_set = [rng.randrange(0, 120)
+                         for _ in range(rng.randint(1, 9))]
+            # Descending pcs, where unsigned differences would wrap.
+            pcs = sorted(set(pitch % 12 for pitch in pitch_set),
+                         reverse=rng.random() < 0.5)
+            ref = rng.sample(range(12), len(pcs))
+            expected = _analyses(list(pitch_set), list(pcs), list(ref))
+            for form, pc_form, ref_form in zip(
+                    _forms(pitch_set), _forms(pcs), _forms(ref)):
+                assert _analyses(form, pc_form, ref_form) == expected
+                assert list(form) == pitch_set
+                assert list(pc_form) == pcs
+                assert list(ref_form) == ref
+
+
+def test_unsigned_numbers_do_not_wrap ():
+
+    pcs = np.array([11, 0, 4, 7], dtype=np.uint8)
+    pcs.flags.writeable = False
+    assert interval_matrix(pcs) == interval_matrix([11, 0, 4, 7])
+    assert maximal_even_edo(pcs) == maximal_even_edo([0, 4, 7, 11])
+    assert normal_prime_form(np.array([71, 60], dtype=np.uint8)) == (
+        [11, 0], [0, 1])
+    assert pc_mask(np.array([11, 23, 255], dtype=np.uint8)) == 1 << 11 | 1 << 3
+
+
+def test_unknown_reference_name ():
+
+    pitch_set = (0, 2, 4, 5, 7, 9, 11)
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        assert distance_vl_gm(pitch_set, False, 'no such scale') is None
+        assert distance_vl_gm(pitch_set, False, None) is None
+    assert output.getvalue() == 'Can not find the reference\n' * 2
+    assert pitch_set == (0, 2, 4, 5, 7, 9, 11)
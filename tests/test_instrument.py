@@ -0,0 +1,74 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# Tests of the opt-in instrumentation.
+
+import json
+
+import pytest
+
+from music_analysis import disable_instrumentation, enable_instrumentation
+from music_analysis import ic_vector, instrumentation_json
+from music_analysis import instrumentation_snapshot, normal_prime_form
+from music_analysis import reset_instrumentation
+from music_analysis import table
+from music_analysis.instrument import latency_summary, record
+
+
+@pytest.fixture
+def recording ():
+
+    reset_instrumentation()
+    enable_instrumentation()
+    yield
+    disable_instrumentation()
+    reset_instrumentation()
+
+
+def test_phases_of_real_calls (recording, monkeypatch):
+
+    # Build the table while recording, as a first call would.
+    monkeypatch.setattr(table, '_set_class_table', None)
+    for pitch_set in ([60, 64, 67], [0, 1, 4, 6], [0, 3, 7, 10]):
+        normal_prime_form(pitch_set)
+    ic_vector([0, 4, 7])
+    summary = latency_summary()
+    assert summary['normal_prime_form']['calls'] == 3
+    assert summary['normal_prime_form']['cardinality'] == {3: 1, 4: 2}
+    assert summary['normal_prime_form.lookup']['calls'] == 3
+    assert summary['ic_vector.lookup']['calls'] == 1
+    assert summary['set_class_table.build']['calls'] == 1
+    # Only the phases that run per call are recorded per call.
+    assert sorted(summary) == [
+        'ic_vector', 'ic_vector.lookup', 'normal_prime_form',
+        'normal_prime_form.lookup', 'set_class_table.build']
+
+
+def test_nothing_recorded_when_off ():
+
+    reset_instrumentation()
+    normal_prime_form([0, 4, 7])
+    ic_vector([0, 4, 7])
+    assert latency_summary() == {}
+
+
+def test_snapshot_and_own_records (recording):
+
+    normal_prime_form([0, 4, 7])
+    snapshot = instrumentation_snapshot()
+    assert snapshot['enabled'] is True
+    assert set(snapshot['functions']) == {'normal_prime_form'}
+    assert set(snapshot['phases']) == {'normal_prime_form.lookup'}
+    assert json.loads(instrumentation_json()) == json.loads(
+        json.dumps(snapshot))
+
+    records = {}
+    for seconds in (0.001, 0.002, 0.004):
+        record('own', seconds, 3, records)
+    summary = latency_summary(records)['own']
+    assert summary['calls'] == 3
+    assert summary['min_seconds'] == 0.001
+    assert summary['max_seconds'] == 0.004
+    assert 0.001 <= summary['p50_seconds'] <= 0.004
+    assert 'own' not in latency_summary()
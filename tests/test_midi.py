@@ -0,0 +1,104 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# Tests of the streaming MIDI reader, slicer and slice analyzer.
+
+import struct
+
+import pytest
+
+from music_analysis import analyze_midi, read_midi, slice_notes
+
+
+def _varlen (value):
+
+    data = [value & 0x7F]
+    value >>= 7
+    while value:
+        data.append(0x80 | (value & 0x7F))
+        value >>= 7
+    return bytes(reversed(data))
+
+
+# Events: (delta ticks, raw bytes of the event).
+def _track (events):
+
+    data = b''.join(_varlen(delta) + raw for delta, raw in events)
+    data += b'\x00\xff\x2f\x00'
+    return b'MTrk' + struct.pack('>I', len(data)) + data
+
+
+def _write_midi (path, tracks, division=480):
+
+    header = b'MThd' + struct.pack('>IHHH', 6, 1, len(tracks), division)
+    path.write_bytes(header + b''.join(tracks))
+    return path
+
+
+def _on (pitch, channel=0):
+
+    return bytes([0x90 | channel, pitch, 64])
+
+
+def _off (pitch, channel=0):
+
+    return bytes([0x80 | channel, pitch, 0])
+
+
+def test_read_and_slice (tmp_path):
+
+    path = _write_midi(tmp_path / 'triad.mid', [_track([
+        (0, _on(60)), (0, _on(64)), (0, _on(67)),
+        (480, _off(60)), (0, _off(64)), (0, _off(67)),
+        (0, _on(62)), (0, b'\x40\x00'), (480, _off(62))])])
+    events = list(read_midi(path))
+    assert events[0] == (0.0, 60, True)
+    assert events[-1] == (2.0, 62, False)
+    assert list(slice_notes(events)) == [(0.0, [60, 64, 67]), (1.0, [62])]
+    results = list(analyze_midi(path))
+    assert results[0][2] == ([0, 4, 7], [0, 3, 7])
+
+
+def test_same_tick_offs_before_ons (tmp_path):
+
+    # The repeated C is re-struck in the same track with its
+    # note-on written before the note-off of the previous one;
+    # the second track ends its E at the same tick.
+    path = _write_midi(tmp_path / 'repeat.mid', [
+        _track([(0, _on(60)), (480, _on(60)), (0, _off(60)),
+                (480, _off(60))]),
+        _track([(0, _on(64)), (480, _off(64))])])
+    events = list(read_midi(path))
+    assert [on for time, pitch, on in events if time == 1.0] == [
+        False, False, True]
+    assert list(slice_notes(events)) == [(0.0, [60, 64]), (1.0, [60])]
+
+
+def test_skip_channels (tmp_path):
+
+    path = _write_midi(tmp_path / 'drums.mid', [_track([
+        (0, _on(36, 9)), (0, _on(60)), (480, _off(36, 9)), (0, _off(60))])])
+    assert [pitch for _, pitch, _ in read_midi(path)] == [60, 60]
+    assert len(list(read_midi(path, skip_channels=()))) == 4
+
+
+def test_truncated_file (tmp_path):
+
+    whole = _track([(0, _on(60)), (480, _off(60))])
+    path = tmp_path / 'truncated.mid'
+    _write_midi(path, [whole])
+    path.write_bytes(path.read_bytes()[:-6])
+    with pytest.raises(ValueError, match='truncated.mid'):
+        list(read_midi(path))
+    path.write_bytes(b'MThd\x00\x00')
+    with pytest.raises(ValueError, match='truncated.mid'):
+        list(read_midi(path))
+
+
+def test_not_a_midi_file (tmp_path):
+
+    path = tmp_path / 'text.mid'
+    path.write_bytes(b'hello, world')
+    with pytest.raises(ValueError, match='Not a standard MIDI file'):
+        list(read_midi(path))
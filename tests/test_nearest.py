@@ -0,0 +1,93 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# Tests of the nearest-reference-scale search.
+
+import random
+
+import pytest
+
+from music_analysis import nearest_scales, register_scale, scale_registry
+from music_analysis import voice_leading_distance
+from music_analysis import nearest
+from music_analysis.distance import ref_dict
+
+
+@pytest.fixture
+def fresh_registry (monkeypatch):
+
+    saved = dict(ref_dict)
+    monkeypatch.setattr(nearest, '_scale_registry', None)
+    yield
+    ref_dict.clear()
+    ref_dict.update(saved)
+
+
+# Every candidate of the set's cardinality, by exact distance,
+# ties in registry order.
+
+def _brute_force (pitch_set, k, metric, set_classes):
+
+    cdt = len(set(pitch % 12 for pitch in pitch_set))
+    found = []
+    for index, (name, forms, set_class) in enumerate(
+            scale_registry().get(cdt, [])):
+        if set_class and not set_classes:
+            continue
+        distance = min(voice_leading_distance(pitch_set, form[0], metric)
+                       for form in forms)
+        found.append((distance, index, name, list(forms[0][0])))
+    found.sort()
+    return [(name, ref, distance) for distance, _, name, ref in found[:k]]
+
+
+def test_against_brute_force ():
+
+    rng = random.Random(0)
+    for trial in range(60):
+        pitch_set = rng.sample(range(12), rng.randint(2, 9))
+        metric = ('vl', 'euclidean')[trial % 2]
+        set_classes = trial % 3 != 0
+        k = rng.randint(1, 6)
+        assert (nearest_scales(pitch_set, k, metric, set_classes)
+                == _brute_force(pitch_set, k, metric, set_classes))
+
+
+def test_registered_scales_win_ties (fresh_registry):
+
+    # Registered after the registry is built ...
+    scale_registry()
+    register_scale('triad', [60, 64, 67])
+    late = nearest_scales([0, 4, 7], k=2)
+    assert late == [('triad', [0, 4, 7], 0), ('[0, 3, 7]', [0, 3, 7], 0)]
+    built = [candidate[0] for candidate in scale_registry()[3]]
+
+    # ... or before: the registry is the same.
+    nearest._scale_registry = None
+    assert nearest_scales([0, 4, 7], k=2) == late
+    assert [candidate[0] for candidate in scale_registry()[3]] == built
+
+
+def test_registering_again_keeps_the_place (fresh_registry):
+
+    register_scale('mine', [0, 2, 4, 7, 9])
+    register_scale('pentatonic', [0, 2, 4, 7, 9])
+    names = [candidate[0] for candidate in scale_registry()[5]
+             if not candidate[2]]
+    nearest._scale_registry = None
+    assert [candidate[0] for candidate in scale_registry()[5]
+            if not candidate[2]] == names
+    assert names.index('pentatonic') < names.index('mine')
+    # A scale given a new cardinality leaves its old list.
+    register_scale('mine', [0, 4, 7])
+    assert 'mine' not in [candidate[0] for candidate in scale_registry()[5]]
+    assert nearest_scales([0, 4, 7], k=1) == [('mine', [0, 4, 7], 0)]
+
+
+def test_errors_and_empty_input ():
+
+    with pytest.raises(ValueError):
+        nearest_scales([0, 4, 7], metric='manhattan')
+    assert nearest_scales([]) == []
+    assert nearest_scales([0, 4, 7], k=0) == []
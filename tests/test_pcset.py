@@ -0,0 +1,91 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# Tests of the pitch-class-set type.
+
+import contextlib
+import io
+import pickle
+import random
+
+import pytest
+
+from music_analysis import PCSet, detect_complexity, distance_vl_gm
+from music_analysis import ic_vector, interval_matrix, maximal_even
+from music_analysis import normal_prime_form, optimal_order, pc_mask
+
+
+def _random_sets (count, seed=0):
+
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield [rng.randrange(0, 128) for _ in range(rng.randint(1, 12))]
+
+
+def test_members_and_masks ():
+
+    for pitch_set in _random_sets(200):
+        pcs = sorted(set(pitch % 12 for pitch in pitch_set))
+        pc_set = PCSet(pitch_set)
+        assert list(pc_set) == pcs == pc_set.to_list()
+        assert len(pc_set) == len(pcs)
+        assert pc_set.mask == sum(1 << pc for pc in pcs) == pc_mask(pitch_set)
+        assert PCSet(pc_set) == pc_set == PCSet.from_mask(pc_set.mask)
+        assert pc_set[0] == pcs[0] and pc_set[-1] == pcs[-1]
+        assert all(pitch in pc_set for pitch in pitch_set)
+        assert pc_mask(pc_set) == pc_set.mask
+    assert len(PCSet()) == 0
+    assert PCSet.from_mask(0x1FFF) == PCSet(range(12))
+
+
+def test_operations_against_python_sets ():
+
+    sets = list(_random_sets(100, 1))
+    for first, second in zip(sets, sets[1:]):
+        a, b = PCSet(first), PCSet(second)
+        x, y = set(a), set(b)
+        assert set(a | b) == x | y
+        assert set(a & b) == x & y
+        assert set(a - b) == x - y
+        assert set(a ^ b) == x ^ y
+        assert set(a.complement()) == set(range(12)) - x
+        assert a.issubset(a | b) and (a | b).issuperset(b)
+        assert a.issubset(b) == (x <= y)
+        for n in (0, 1, 5, 11, 13, -2):
+            assert set(a.transpose(n)) == {(pc + n) % 12 for pc in x}
+            assert set(a.invert(n)) == {(n - pc) % 12 for pc in x}
+
+
+def test_immutable_hashable_picklable ():
+
+    pc_set = PCSet([0, 4, 7])
+    with pytest.raises(AttributeError):
+        pc_set.mask = 0
+    with pytest.raises(AttributeError):
+        del pc_set.mask
+    assert {pc_set: 1}[PCSet([60, 64, 67])] == 1
+    assert pickle.loads(pickle.dumps(pc_set)) == pc_set
+    assert repr(pc_set) == 'PCSet([0, 4, 7])'
+    assert pc_set != [0, 4, 7]
+
+
+def test_accepted_by_the_analysis_functions ():
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for pitch_set in _random_sets(100, 2):
+            pcs = sorted(set(pitch % 12 for pitch in pitch_set))
+            pc_set = PCSet(pitch_set)
+            ref = sorted(random.Random(len(pcs)).sample(range(12), len(pcs)))
+            assert normal_prime_form(pc_set) == normal_prime_form(pcs)
+            assert ic_vector(pc_set) == ic_vector(pcs)
+            assert maximal_even(pc_set) == maximal_even(pcs)
+            assert interval_matrix(pc_set) == interval_matrix(pcs)
+            assert (detect_complexity(pc_set, True)
+                    == detect_complexity(pcs, True))
+            assert (optimal_order(pc_set, PCSet(ref), True)
+                    == optimal_order(pcs, ref, True))
+            assert (distance_vl_gm(pc_set, True, None)
+                    == distance_vl_gm(pcs, True, None))
+            assert (distance_vl_gm(pc_set, False, PCSet(ref))
+                    == distance_vl_gm(pcs, False, ref))
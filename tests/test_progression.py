@@ -0,0 +1,68 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# Tests of the progression voice-leading calculator.
+
+from itertools import product
+
+import numpy as np
+import pytest
+
+from music_analysis import voice_leading_path, voice_leading_paths
+from music_analysis.progression import _voicings
+
+
+def _is_close_voicing (voicing, chord):
+
+    return (list(voicing) == sorted(voicing)
+            and voicing[-1] - voicing[0] <= 12
+            and sorted(pitch%12 for pitch in voicing)
+            == sorted(pc%12 for pc in chord))
+
+
+def test_doubled_members_ascend ():
+
+    for chord in ([0, 0, 4, 7], [0, 4, 4, 7], [7, 11, 2, 2, 5], [0, 0]):
+        voicings = _voicings(np, tuple(sorted(chord)), 48, 72)
+        assert len(voicings)
+        for voicing in voicings.tolist():
+            assert _is_close_voicing(voicing, chord), voicing
+    assert [60, 64, 67, 72] in _voicings(np, (0, 0, 4, 7), 48, 72).tolist()
+
+
+def test_paths_against_brute_force ():
+
+    progressions = [
+        [[0, 0, 4, 7], [5, 9, 0, 0], [7, 11, 2, 7], [0, 4, 7, 0]],
+        [[2, 5, 9], [7, 11, 5], [0, 4, 7]],
+        [[0, 4, 7, 10], [5, 9, 0, 3], [0, 4, 7, 10]],
+        ]
+    for metric in ('vl', 'euclidean'):
+        paths = voice_leading_paths(progressions, 52, 76, metric)
+        for progression, path in zip(progressions, paths):
+            choices = [_voicings(np, tuple(sorted(pc%12 for pc in chord)),
+                                 52, 76).tolist() for chord in progression]
+            best = min(sum(
+                np.linalg.norm(np.subtract(second, first),
+                               1 if metric == 'vl' else 2)
+                for first, second in zip(chain, chain[1:]))
+                for chain in product(*choices))
+            assert path.total == round(best, 3)
+            assert sum(path.steps) == pytest.approx(path.total, abs=0.002)
+            for voicing, chord in zip(path.voicings, progression):
+                assert _is_close_voicing(voicing, chord)
+                assert 52 <= voicing[0] and voicing[-1] <= 76
+
+
+def test_errors ():
+
+    with pytest.raises(ValueError, match='same number of voices'):
+        voice_leading_path([[0, 4, 7], [0, 4, 7, 10]])
+    with pytest.raises(ValueError, match='cannot be voiced'):
+        voice_leading_path([[0, 4, 7]], 60, 64)
+    with pytest.raises(ValueError, match='empty'):
+        voice_leading_path([[]])
+    with pytest.raises(ValueError, match='metric'):
+        voice_leading_path([[0, 4, 7]], metric='manhattan')
+    assert voice_leading_path([]).voicings == []
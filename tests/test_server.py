@@ -0,0 +1,162 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# Tests of the batching analysis server.
+
+import asyncio
+import json
+
+import pytest
+
+from music_analysis import detect_complexity, distance_vl_gm, ic_vector
+from music_analysis import disable_instrumentation, enable_instrumentation
+from music_analysis import instrumentation_snapshot, maximal_even
+from music_analysis import normal_prime_form, reset_instrumentation
+from music_analysis.server import AnalysisClient, AnalysisServer
+
+
+def _serve (test, **options):
+
+    async def run ():
+        server = AnalysisServer(**options)
+        host, port = await server.start(port=0)
+        try:
+            await asyncio.wait_for(test(server, host, port), 20)
+        finally:
+            await server.close()
+
+    asyncio.run(run())
+
+
+def _local (function, *args):
+
+    return json.loads(json.dumps(function(*args)))
+
+
+def test_round_trips ():
+
+    async def test (server, host, port):
+        client = await AnalysisClient.connect(host, port)
+        calls = [
+            ('normal_prime_form', normal_prime_form, [60, 64, 67]),
+            ('ic_vector', ic_vector, [0, 1, 4, 6]),
+            ('maximal_even', maximal_even, [0, 2, 4, 7, 9]),
+            ('detect_complexity', detect_complexity, [0, 4, 7, 10], True),
+            ('detect_complexity', detect_complexity, [60, 64, 67], False),
+            ('detect_complexity', detect_complexity, [0, 2, 4, 6], True,
+             False),
+            ('distance_vl_gm', distance_vl_gm, [0, 4, 7], True, None),
+            ('distance_vl_gm', distance_vl_gm, [0, 3, 7], False, [0, 4, 7]),
+            ]
+        results = await asyncio.gather(*[
+            client.call(name, *args) for name, _, *args in calls])
+        for (name, function, *args), result in zip(calls, results):
+            assert result == _local(function, *args), name
+        scale = [0, 2, 4, 5, 7, 9, 11]
+        counts = await client.call('detect_complexity', scale, True, True)
+        assert counts == {'normal': [7, 9, 11, 0, 2, 4, 5],
+                          'ambiguity_count': 2, 'contradiction_count': 0}
+        await client.close()
+
+    _serve(test)
+
+
+def test_errors ():
+
+    async def test (server, host, port):
+        client = await AnalysisClient.connect(host, port)
+        with pytest.raises(ValueError, match='Trivial case'):
+            await client.call('distance_vl_gm', [0, 12], True, None)
+        with pytest.raises(ValueError, match='Cardinality Error'):
+            await client.call('distance_vl_gm', [0, 4, 7], False, [0, 4])
+        with pytest.raises(ValueError, match='Can not find'):
+            await client.call('distance_vl_gm', [0, 4, 7], False, 'nothing')
+        with pytest.raises(ValueError, match='unknown function'):
+            await client.call('os.system', 'true')
+        with pytest.raises(ValueError, match='TypeError'):
+            await client.call('ic_vector', [0, 4, 7], 1)
+        # The connection still answers after the errors.
+        assert await client.call('ic_vector', [0, 4, 7]) == _local(
+            ic_vector, [0, 4, 7])
+        await client.close()
+
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(b'not json\n[1, 2]\n{"id": 5, "function": "ic_vector",'
+                     b' "args": 7}\n')
+        answers = [json.loads(await reader.readline()) for _ in range(3)]
+        assert answers[0]['error'] == 'cannot read the request'
+        assert answers[1]['error'] == 'the request must be a JSON object'
+        assert answers[2]['id'] == 5
+        assert answers[2]['error'] == 'args must be a list'
+        writer.close()
+        await writer.wait_closed()
+
+    _serve(test)
+
+
+def test_stats_stay_in_the_server ():
+
+    async def test (server, host, port):
+        client = await AnalysisClient.connect(host, port)
+        for _ in range(3):
+            await client.call('ic_vector', [0, 4, 7])
+        await client.call('normal_prime_form', [0, 1, 2, 3])
+        stats = await client.call('stats')
+        assert stats['requests'] >= 4
+        assert stats['latency']['ic_vector']['calls'] == 3
+        assert stats['latency']['normal_prime_form']['calls'] == 1
+        await client.close()
+
+    _serve(test)
+    # Instrumentation is off: nothing is recorded globally.
+    phases = instrumentation_snapshot()['phases']
+    assert not [name for name in phases if name.startswith('server.')]
+
+
+def test_instrumentation_records_cardinality ():
+
+    async def test (server, host, port):
+        client = await AnalysisClient.connect(host, port)
+        await client.call('ic_vector', [60, 64, 67, 72])
+        await client.close()
+
+    reset_instrumentation()
+    enable_instrumentation()
+    try:
+        _serve(test)
+        phases = instrumentation_snapshot()['phases']
+    finally:
+        disable_instrumentation()
+        reset_instrumentation()
+    assert phases['server.ic_vector']['cardinality'] == {3: 1}
+
+
+def test_slow_client_does_not_block_others ():
+
+    async def test (server, host, port):
+        # A client that sends many requests with large ids and
+        # never reads the answers.
+        reader, writer = await asyncio.open_connection(host, port)
+        padding = 'x'*10000
+
+        async def flood ():
+            for k in range(2000):
+                writer.write(json.dumps(
+                    {'id': padding + str(k), 'function': 'ic_vector',
+                     'args': [[0, 4, 7]]}).encode() + b'\n')
+                await writer.drain()
+
+        flooding = asyncio.ensure_future(flood())
+        await asyncio.sleep(0.5)
+        client = await AnalysisClient.connect(host, port)
+        for _ in range(10):
+            result = await asyncio.wait_for(
+                client.call('ic_vector', [0, 3, 7]), 5)
+            assert result == _local(ic_vector, [0, 3, 7])
+        await client.close()
+        assert not flooding.done()
+        flooding.cancel()
+        writer.close()
+
+    _serve(test, queue_size=8, connection_limit=16)
@@ -0,0 +1,60 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# Tests of the table-backed normal_prime_form and ic_vector
+# against the original procedures.
+
+import random
+
+from music_analysis import ic_vector, normal_prime_form, set_class_table
+from music_analysis.benchmark import _reference_ic_vector
+from music_analysis.benchmark import _reference_normal_prime_form
+
+
+def _pcs (mask):
+
+    return [pc for pc in range(12) if mask >> pc & 1]
+
+
+def test_every_pc_set ():
+
+    for mask in range(1, 4096):
+        pc_set = _pcs(mask)
+        assert normal_prime_form(pc_set) == _reference_normal_prime_form(
+            pc_set)
+        assert ic_vector(pc_set) == _reference_ic_vector(pc_set)
+
+
+def test_midi_sets_with_repetitions ():
+
+    rng = random.Random(0)
+    for _ in range(500):
+        pitch_set = [rng.randrange(36, 96) for _ in range(rng.randint(1, 15))]
+        assert (normal_prime_form(pitch_set)
+                == _reference_normal_prime_form(pitch_set))
+        assert ic_vector(pitch_set) == _reference_ic_vector(pitch_set)
+
+
+def test_results_are_fresh_lists ():
+
+    first = normal_prime_form((60, 64, 67))
+    first[0].append(99)
+    first[1].append(99)
+    vector = ic_vector([0, 4, 7])
+    vector[1][0] = 99
+    assert normal_prime_form([60, 64, 67]) == ([0, 4, 7], [0, 3, 7])
+    assert ic_vector([0, 4, 7]) == ([0, 3, 7], [0, 0, 1, 1, 1, 0])
+
+
+def test_table_entries ():
+
+    table = set_class_table()
+    assert len(table) == 4096 and table[0] is None
+    for mask in range(1, 4096):
+        entry = table[mask]
+        # The set is T(t) or T(t)I of the prime form.
+        sign = -1 if entry.inversion else 1
+        assert sorted((entry.transposition + sign*pc) % 12
+                      for pc in entry.prime) == _pcs(mask)
+        assert sorted(entry.normal) == _pcs(mask)
@@ -0,0 +1,86 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# Tests of the normal and prime forms in any equal temperament.
+
+import random
+
+from music_analysis import normal_prime_form, normal_prime_form_edo
+
+
+# The normal form by brute force: of the ascending rotations with
+# the smallest span, read upwards or downwards, the one whose
+# steps are smallest from the start; ties go to the earliest
+# rotation. The prime form adds up the winning steps.
+
+def _brute_force (pitch_set, c):
+
+    pc_set = sorted(set(pitch%c for pitch in pitch_set))
+    n = len(pc_set)
+    if n <= 1:
+        return pc_set, [0]*n
+    rotations = [pc_set[s:] + pc_set[:s] for s in range(n)]
+    span = min((rotation[-1]-rotation[0])%c for rotation in rotations)
+    best = None
+    for s, rotation in enumerate(rotations):
+        if (rotation[-1]-rotation[0])%c != span:
+            continue
+        steps = [(rotation[k+1]-rotation[k])%c for k in range(n-1)]
+        for reading in (steps, steps[::-1]):
+            if best is None or (reading, s) < best:
+                best = reading, s
+    reading, s = best
+    prime = [0]
+    for step in reading:
+        prime.append(prime[-1]+step)
+
+    return rotations[s], prime
+
+
+def _random_sets (c, count, seed):
+
+    rng = random.Random(seed)
+    for _ in range(count):
+        size = rng.randint(1, min(c, 12))
+        yield [rng.randrange(c) + c*rng.randrange(3) for _ in range(size)]
+
+
+def test_twelve_tones ():
+
+    for mask in range(1, 4096):
+        pc_set = [pc for pc in range(12) if mask >> pc & 1]
+        assert normal_prime_form_edo(pc_set) == normal_prime_form(pc_set)
+    for pitch_set in _random_sets(12, 300, 1):
+        assert (normal_prime_form_edo(pitch_set)
+                == normal_prime_form(pitch_set))
+
+
+def test_other_universes_against_brute_force ():
+
+    for c in (5, 7, 19, 24, 31, 53, 72):
+        for pitch_set in _random_sets(c, 300, c):
+            assert (normal_prime_form_edo(pitch_set, c)
+                    == _brute_force(pitch_set, c)), (c, pitch_set)
+
+
+def test_symmetric_sets ():
+
+    # Sets that map onto themselves under transposition or
+    # inversion, where rotations tie.
+    for c, pitch_set in ((24, [0, 6, 12, 18]), (24, [0, 1, 12, 13]),
+                         (19, [0]), (31, [0, 5, 26]), (72, [0, 18, 36, 54])):
+        assert (normal_prime_form_edo(pitch_set, c)
+                == _brute_force(pitch_set, c))
+
+
+def test_prime_form_invariance ():
+
+    for c in (19, 24, 31):
+        for pitch_set in _random_sets(c, 100, c+1):
+            prime = normal_prime_form_edo(pitch_set, c)[1]
+            for n in (1, 5, c-1):
+                transposed = [(pitch+n)%c for pitch in pitch_set]
+                inverted = [(n-pitch)%c for pitch in pitch_set]
+                assert normal_prime_form_edo(transposed, c)[1] == prime
+                assert normal_prime_form_edo(inverted, c)[1] == prime
@@ -0,0 +1,78 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# Tests of the set-class similarity calculator.
+
+import numpy as np
+
+from music_analysis import MEASURES, ic_vector, most_similar, set_similarity
+from music_analysis import similarity_chunks, similarity_matrix
+
+
+def _pcs (mask):
+
+    return [pc for pc in range(12) if mask >> pc & 1]
+
+
+def _brute_most_similar (rows, columns, k, measure):
+
+    self_match = columns is None
+    matrix = np.array([set_similarity(
+        _pcs(mask), rows if self_match else columns, measure)
+        for mask in rows]).reshape(len(rows), -1)
+    indices = []
+    for row, values in enumerate(matrix):
+        keys = values if measure == 'angle' else -values
+        order = sorted(range(len(values)), key=lambda column: (
+            keys[column], column))
+        if self_match:
+            order.remove(row)
+        indices.append(order[:k])
+    return np.array(indices).reshape(len(rows), -1), matrix
+
+
+def test_most_similar_against_brute_force ():
+
+    rng = np.random.default_rng(7)
+    for trial in range(40):
+        # Few distinct masks, so that most values tie.
+        pool = rng.integers(0, 4096, size=5)
+        rows = rng.choice(pool, int(rng.integers(1, 30)))
+        columns = None if trial%2 else rng.choice(pool, 25)
+        measure = MEASURES[trial%4]
+        k = int(rng.integers(1, 12))
+        indices, values = most_similar(rows, columns, k, measure,
+                                       chunk_size=int(rng.integers(1, 6)))
+        expected, matrix = _brute_most_similar(rows, columns, k, measure)
+        assert indices.tolist() == expected.tolist()
+        assert np.allclose(values, np.take_along_axis(matrix, indices, 1))
+
+
+def test_blocks_are_bounded ():
+
+    rows = np.arange(0, 4096, 7)
+    columns = np.arange(4096)
+    blocks = list(similarity_chunks(rows, columns, 'rel', chunk_size=100))
+    assert max(block.shape[0] for _, _, block in blocks) <= 100
+    assert max(block.shape[1] for _, _, block in blocks) <= 100
+    matrix = similarity_matrix(rows, columns, 'rel', chunk_size=100)
+    assert matrix.shape == (len(rows), 4096)
+    for start, first, block in blocks:
+        assert np.array_equal(
+            matrix[start:start+block.shape[0], first:first+block.shape[1]],
+            block)
+    assert np.allclose(matrix[3], set_similarity(_pcs(rows[3]), columns,
+                                                 'rel'))
+
+
+def test_many_columns ():
+
+    columns = np.tile(np.arange(4096), 50)
+    indices, values = most_similar([0b10010001, 0b10001001], columns, k=3)
+    # The closest columns are the earliest sets with the interval
+    # content of a triad.
+    triads = [mask for mask in range(1, 4096)
+              if ic_vector(_pcs(mask))[1] == [0, 0, 1, 1, 1, 0]]
+    assert indices.tolist() == [triads[:3], triads[:3]]
+    assert np.allclose(values, 1.0)
@@ -0,0 +1,122 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# Tests of the binary slice store, read with and without NumPy.
+
+import os
+import random
+
+import pytest
+
+from music_analysis import SliceReader, SliceWriter, ic_vector
+from music_analysis import maximal_even, normal_prime_form, pc_mask
+from music_analysis import reanalyze_store, write_catalogue
+
+
+def _slices (count, seed):
+
+    rng = random.Random(seed)
+    return [(0.5*k, [rng.randrange(36, 96) for _ in range(rng.randint(0, 6))])
+            for k in range(count)]
+
+
+def _prime_mask (pitch_set):
+
+    if not pitch_set:
+        return 0
+    return pc_mask(normal_prime_form(pitch_set)[1])
+
+
+@pytest.mark.parametrize('numpy', [True, False])
+def test_round_trip (tmp_path, numpy):
+
+    path = str(tmp_path / 'corpus.slices')
+    slices = _slices(50, 0)
+    with SliceWriter(path, buffer_rows=16) as writer:
+        writer.extend(slices[:30])
+    with SliceWriter(path) as writer:
+        writer.extend(slices[30:])
+    with SliceReader(path, numpy=numpy) as store:
+        assert len(store) == 50
+        assert list(store.time) == [time for time, _ in slices]
+        assert list(store.offset) == list(range(50))
+        assert list(store.mask) == [pc_mask(pitches) for _, pitches in slices]
+        for row, (_, pitches) in enumerate(slices):
+            assert store.prime[row] == _prime_mask(pitches)
+            if not pitches:
+                continue
+            if numpy:
+                vector = store.vector[row].tolist()
+            else:
+                vector = store.vector[6*row:6*row+6].tolist()
+            assert vector == ic_vector(pitches)[1]
+            even, myhill = maximal_even(pitches)
+            assert store.flags[row] == even + 2*myhill
+
+
+@pytest.mark.parametrize('numpy', [True, False])
+def test_queries (tmp_path, numpy):
+
+    path = str(tmp_path / 'corpus.slices')
+    slices = _slices(300, 1)
+    with SliceWriter(path, buffer_rows=64) as writer:
+        writer.extend(slices)
+    contents = [set(pitch % 12 for pitch in pitches) for _, pitches in slices]
+    with SliceReader(path, numpy=numpy) as store:
+        for query in [[], [0, 4, 7], [2]] + [p for _, p in _slices(40, 2)]:
+            found = store.where_prime(query)
+            contains = store.where_contains(query)
+            if numpy:
+                found, contains = found.tolist(), contains.tolist()
+            else:
+                assert type(found) is list and type(contains) is list
+            assert found == [
+                row for row, (_, pitches) in enumerate(slices)
+                if _prime_mask(pitches) == _prime_mask(query)]
+            assert contains == [
+                row for row, pcs in enumerate(contents)
+                if set(pitch % 12 for pitch in query) <= pcs]
+
+
+@pytest.mark.parametrize('numpy', [True, False])
+def test_empty_store (tmp_path, numpy):
+
+    path = str(tmp_path / 'corpus.slices')
+    SliceWriter(path).close()
+    with SliceReader(path, numpy=numpy) as store:
+        assert len(store) == 0
+        assert list(store.where_prime([0, 4, 7])) == []
+        assert list(store.where_contains([0])) == []
+
+
+def test_interrupted_write_and_reanalysis (tmp_path):
+
+    path = str(tmp_path / 'corpus.slices')
+    slices = _slices(40, 3)
+    with SliceWriter(path) as writer:
+        writer.extend(slices[:20])
+    # Bytes left by an interrupted write are cut off.
+    with open(os.path.join(path, 'mask.bin'), 'ab') as column_file:
+        column_file.write(b'\xff\x0f\xff')
+    with SliceWriter(path) as writer:
+        writer.extend(slices[20:])
+    with SliceReader(path, mode='r+') as store:
+        assert list(store.mask) == [pc_mask(p) for _, p in slices]
+        store.prime[:] = 0
+        store.vector[:] = 0
+        store.prime.flush()
+        store.vector.flush()
+    reanalyze_store(path, block_rows=7)
+    with SliceReader(path, numpy=False) as store:
+        assert list(store.prime) == [_prime_mask(p) for _, p in slices]
+        assert store.vector[6:12].tolist() == (
+            ic_vector(slices[1][1])[1] if slices[1][1] else [0]*6)
+
+
+def test_wrong_directory (tmp_path):
+
+    path = str(tmp_path / 'empty.catalogue')
+    write_catalogue(path, 5, 5)
+    with pytest.raises(ValueError, match='Not a slice store'):
+        SliceReader(path)
@@ -0,0 +1,127 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# Tests of the exact voice-leading calculator.
+
+import random
+from itertools import product
+
+import numpy as np
+import pytest
+
+from music_analysis import even_distance, optimal_order
+from music_analysis import voice_leading_distance, voice_leading_distances
+
+
+def _gap (a, b):
+
+    return min((a-b) % 12, (b-a) % 12)
+
+
+# Between sets of different sizes, the smallest voice leading in
+# which every member of either set belongs to a voice: a minimum
+# edge cover, by brute force over all sets of pairs. (Sets of one
+# size are joined one to one, as in optimal_order.)
+
+def _edge_cover (first, second, euclidean):
+
+    pairs = [(a, b) for a in first for b in second]
+    best = None
+    for chosen in product((False, True), repeat=len(pairs)):
+        used = [pair for pair, keep in zip(pairs, chosen) if keep]
+        if ({a for a, _ in used} != set(first)
+                or {b for _, b in used} != set(second)):
+            continue
+        if euclidean:
+            cost = sum(_gap(a, b)**2 for a, b in used)**0.5
+        else:
+            cost = sum(_gap(a, b) for a, b in used)
+        if best is None or cost < best:
+            best = cost
+    return best
+
+
+def _random_set (rng, low, high):
+
+    return sorted(rng.sample(range(12), rng.randint(low, high)))
+
+
+def test_equal_cardinality_against_optimal_order ():
+
+    rng = random.Random(0)
+    for _ in range(200):
+        pitch_set = _random_set(rng, 1, 8)
+        target = sorted(rng.sample(range(12), len(pitch_set)))
+        # optimal_order tries every cyclic order of the tested set.
+        assert voice_leading_distance(
+            pitch_set, target, transpose=False) == optimal_order(
+                pitch_set, target, False)[1]
+        assert voice_leading_distance(pitch_set, target) == min(
+            optimal_order([(pc+t) % 12 for pc in pitch_set], target,
+                          False)[1] for t in range(12))
+        assert voice_leading_distance(
+            pitch_set, target, 'euclidean', False) <= optimal_order(
+                pitch_set, target, True)[2]
+
+
+def test_unequal_cardinality_against_brute_force ():
+
+    rng = random.Random(1)
+    for trial in range(120):
+        pitch_set = _random_set(rng, 1, 4)
+        target = _random_set(rng, 1, 4)
+        if len(target) == len(pitch_set):
+            continue
+        euclidean = trial % 2 == 1
+        metric = 'euclidean' if euclidean else 'vl'
+        assert voice_leading_distance(
+            pitch_set, target, metric, False) == round(
+                _edge_cover(pitch_set, target, euclidean), 3)
+        assert voice_leading_distance(pitch_set, target, metric) == min(
+            round(_edge_cover([(pc+t) % 12 for pc in pitch_set], target,
+                              euclidean), 3) for t in range(12))
+
+
+def test_many_targets ():
+
+    rng = random.Random(2)
+    pitch_set = [60, 64, 67, 71]
+    targets = [_random_set(rng, 1, 7) for _ in range(50)]
+    for metric in ('vl', 'euclidean'):
+        distances = voice_leading_distances(pitch_set, targets, metric)
+        assert distances.shape == (50,)
+        assert np.round(distances, 3).tolist() == [
+            voice_leading_distance(pitch_set, target, metric)
+            for target in targets]
+
+
+def test_even_distance_against_a_grid ():
+
+    rng = random.Random(3)
+    shifts = np.arange(0, 12, 0.001)
+    for trial in range(30):
+        pitch_set = _random_set(rng, 1, 8)
+        metric = ('vl', 'euclidean')[trial % 2]
+        n = len(pitch_set)
+        moves = (np.array(pitch_set)[None, :]
+                 - 12*np.arange(n)[None, :]/n - shifts[:, None]) % 12
+        moves = np.minimum(moves, 12 - moves)
+        if metric == 'vl':
+            grid = moves.sum(axis=1)
+        else:
+            grid = np.sqrt((moves*moves).sum(axis=1))
+        distance, shift = even_distance(pitch_set, metric)
+        assert distance <= grid.min() + 0.001
+        assert distance >= grid.min() - 0.01
+        assert 0 <= shift < 12
+
+
+def test_errors ():
+
+    with pytest.raises(ValueError):
+        voice_leading_distance([], [0, 4, 7])
+    with pytest.raises(ValueError):
+        voice_leading_distance([0, 4, 7], [0, 4, 7], metric='manhattan')
+    with pytest.raises(ValueError):
+        even_distance([])
@@ -0,0 +1,110 @@
+# A Set of Basic Functions in Computational Music Analysis
+# Code written by Lizhou Wang (王力舟)
+# Music Theory Department, Jacobs School of Music, Indiana University
+
+# Tests of the sliding-window analyzer against windows analyzed
+# from scratch.
+
+import random
+from collections import Counter
+
+import pytest
+
+from music_analysis import PCSet, PitchClassWindow, ic_vector
+from music_analysis import normal_prime_form, set_class_table
+from music_analysis import slide_window, window_sweep
+
+
+def _stream (count, seed):
+
+    rng = random.Random(seed)
+    events = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.5:
+            events.append(rng.randrange(55, 80))
+        elif kind < 0.9:
+            chord = [rng.randrange(40, 90) for _ in range(rng.randint(1, 4))]
+            events.append(chord if kind < 0.7 else tuple(chord))
+        else:
+            events.append([])
+    return events
+
+
+def _pitches (event):
+
+    return [event] if isinstance(event, int) else list(event)
+
+
+def _brute_force (events, size, step, changes_only):
+
+    found = []
+    last = None
+    for start in range(0, len(events) - size + 1, step):
+        pitches = [pitch for event in events[start:start+size]
+                   for pitch in _pitches(event)]
+        mask = PCSet(pitches).mask
+        if changes_only and mask == last:
+            continue
+        last = mask
+        if pitches:
+            found.append((start, pitches))
+    return found
+
+
+def test_against_windows_from_scratch ():
+
+    table = set_class_table()
+    for seed in range(20):
+        events = _stream(150, seed)
+        for size in (1, 2, 5, 13):
+            for step in (1, 3):
+                for changes_only in (True, False):
+                    found = list(slide_window(iter(events), size, step,
+                                              changes_only))
+                    expected = _brute_force(events, size, step, changes_only)
+                    assert [start for start, _ in found] == [
+                        start for start, _ in expected]
+                    for (_, entry), (_, pitches) in zip(found, expected):
+                        assert entry is table[PCSet(pitches).mask]
+                        normal, prime = normal_prime_form(pitches)
+                        assert (list(entry.normal), list(entry.prime)) == (
+                            normal, prime)
+                        assert list(entry.vector) == ic_vector(pitches)[1]
+
+
+def test_window_sweep ():
+
+    events = _stream(100, 20)
+    sweep = window_sweep(iter(events), [1, 4, 8], step=2, changes_only=False)
+    assert sweep == {size: list(slide_window(events, size, 2, False))
+                     for size in (1, 4, 8)}
+    assert window_sweep(events, [200]) == {200: []}
+
+
+def test_pitch_class_window ():
+
+    rng = random.Random(5)
+    window = PitchClassWindow()
+    sounding = Counter()
+    for _ in range(2000):
+        notes = list(sounding.elements())
+        if notes and rng.random() < 0.5:
+            pitch = rng.choice(notes)
+            sounding[pitch] -= 1
+            pcs = {p % 12 for p in sounding.elements()}
+            assert window.remove(pitch) == (pitch % 12 not in pcs)
+        else:
+            pitch = rng.randrange(30, 100)
+            pcs = {p % 12 for p in sounding.elements()}
+            sounding[pitch] += 1
+            assert window.add(pitch) == (pitch % 12 not in pcs)
+        assert window.pc_set() == PCSet(sounding.elements())
+
+
+def test_errors ():
+
+    with pytest.raises(ValueError):
+        list(slide_window([60, 64], 0))
+    with pytest.raises(ValueError):
+        list(slide_window([60, 64], 2, step=0))